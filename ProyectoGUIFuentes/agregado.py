@@ -0,0 +1,225 @@
+"""
+Modelo agregado de MinPol (ProyectoAgregado.mzn) y su verificador
+
+El modelo agregado resuelve con un flujo f[i][j] por par de opiniones; las
+personas de un mismo origen solo se diferencian por el costo del nivel de
+resistencia. Para un flujo dado, el reparto de menor costo entre niveles
+asigna los niveles mas baratos a los destinos mas lejanos (desigualdad de
+reordenamiento), asi que:
+- todo plan x del modelo completo da un flujo con la misma polarizacion y
+  un costo menor o igual al repartirlo de nuevo
+- todo flujo factible del modelo agregado se reparte en un plan x factible
+  del modelo completo con la misma polarizacion
+Por eso ambos modelos tienen el mismo optimo. El verificador lo comprueba
+en cada instancia: reparte el flujo del optimo del motor nativo y revisa
+factibilidad, polarizacion y costo, y con MiniZinc disponible resuelve
+ademas los dos modelos y compara sus optimos.
+"""
+
+import glob
+import os
+import time
+
+from anytime import resolver_anytime
+from parser import leer_txt, dzn_texto
+from solver_nativo import RES_COST, EPS, resolver_nativo, distribucion_final
+from heuristica import es_factible, mejor_mediana
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUTA_MZN = os.path.join(BASE_DIR, "..", "Proyecto.mzn")
+RUTA_MZN_AGREGADO = os.path.join(BASE_DIR, "..", "ProyectoAgregado.mzn")
+
+
+def flujos(x, m):
+    """Suma los movimientos x[k][i][j] de los tres niveles en f[i][j]"""
+    return [[sum(x[k][i][j] for k in range(3)) for j in range(m)] for i in range(m)]
+
+
+def orden_destinos(datos, i):
+    """Destinos de la opinion i (base 0) ordenados por distancia decreciente"""
+    v = datos['v']
+    return sorted(range(datos['m']), key=lambda j: -abs(v[i] - v[j]))
+
+
+def desagregar(datos, f):
+    """
+    Reparte el flujo f[i][j] entre los niveles de resistencia con el menor
+    costo: en cada origen, los destinos mas lejanos reciben primero a las
+    personas de los niveles mas baratos
+
+    Retorna:
+        Matriz x[k][i][j] (base 0)
+
+    Lanza ValueError si algun origen mueve mas personas de las que tiene
+    """
+
+    m = datos['m']
+    s = datos['s']
+    x = [[[0] * m for _ in range(m)] for _ in range(3)]
+    for i in range(m):
+        restante = list(s[i])
+        k = 0
+        for j in orden_destinos(datos, i):
+            pendiente = f[i][j]
+            while pendiente > 0:
+                while k < 3 and restante[k] == 0:
+                    k += 1
+                if k == 3:
+                    raise ValueError(f"La opinion {i + 1} mueve mas personas de las que tiene")
+                usados = min(pendiente, restante[k])
+                x[k][i][j] += usados
+                restante[k] -= usados
+                pendiente -= usados
+    return x
+
+
+def costo_plan(datos, x):
+    """Costo total de un plan x[k][i][j]"""
+    m = datos['m']
+    v = datos['v']
+    return sum(abs(v[i] - v[j]) * RES_COST[k] * x[k][i][j]
+               for k in range(3) for i in range(m) for j in range(m))
+
+
+def costo_agregado(datos, f):
+    """
+    Costo del flujo f con la formula de ProyectoAgregado.mzn:
+    sum(t) (d[i, t] - d[i, t+1]) * R_i(F[i, t])
+    """
+
+    m = datos['m']
+    v = datos['v']
+    s = datos['s']
+    total = 0.0
+    for i in range(m):
+        orden = orden_destinos(datos, i)
+        d = [abs(v[i] - v[j]) for j in orden]
+        acumulado = 0
+        for t in range(m - 1):
+            acumulado += f[i][orden[t]]
+            if d[t] > d[t + 1]:
+                # R_i(F): costo de las F personas mas baratas de i
+                r, restante = 0.0, acumulado
+                for k in range(3):
+                    usados = min(restante, s[i][k])
+                    r += RES_COST[k] * usados
+                    restante -= usados
+                total += (d[t] - d[t + 1]) * r
+    return total
+
+
+def leer_flujos(stdout, m):
+    """Lee la matriz f de la salida de texto de ProyectoAgregado.mzn"""
+    lineas = [linea.strip() for linea in stdout.splitlines() if linea.strip()]
+    return [[int(x) for x in linea.split(',')] for linea in lineas[1:m + 1]]
+
+
+def verificar_instancia(datos, minizinc=False, timeout=60, ejecutable=None):
+    """
+    Comprueba que el modelo agregado tenga el mismo optimo que el completo
+
+    Parametros:
+        datos: diccionario con la instancia
+        minizinc: resolver ademas Proyecto.mzn y ProyectoAgregado.mzn
+        timeout: segundos maximos de MiniZinc por modelo
+        ejecutable: ejecutable de MiniZinc (por defecto MINIZINC)
+
+    Retorna:
+        Diccionario con las llaves ok, polarizacion (optimo nativo),
+        completo y agregado (polarizaciones de MiniZinc, o None) y detalle
+        (motivo de la falla, o None)
+    """
+
+    fila = {'ok': True, 'polarizacion': None, 'completo': None, 'agregado': None, 'detalle': None}
+
+    def fallar(motivo):
+        fila['ok'] = False
+        fila['detalle'] = motivo
+        return fila
+
+    optimo = resolver_nativo(datos)
+    if optimo['estado'] == 'OPTIMO':
+        fila['polarizacion'] = optimo['polarizacion']
+        x = optimo['x']
+        f = flujos(x, datos['m'])
+        repartido = desagregar(datos, f)
+        q = optimo['med_pos'] - 1
+        if not es_factible(datos, repartido, q):
+            return fallar("el reparto del flujo optimo no es factible")
+        if distribucion_final(datos, repartido) != optimo['p_prime']:
+            return fallar("el reparto cambia la distribucion final")
+        if costo_plan(datos, repartido) > costo_plan(datos, x) + 1e-6:
+            return fallar("el reparto cuesta mas que el plan original")
+        if abs(costo_agregado(datos, f) - costo_plan(datos, repartido)) > 1e-6:
+            return fallar("la formula de costo del modelo agregado no coincide con el reparto")
+
+    if minizinc:
+        texto = dzn_texto(datos)
+        completo = resolver_anytime(RUTA_MZN, timeout=timeout, texto_dzn=texto,
+                                    ejecutable=ejecutable)
+        agregado = resolver_anytime(RUTA_MZN_AGREGADO, timeout=timeout, texto_dzn=texto,
+                                    ejecutable=ejecutable)
+        for resultado in (completo, agregado):
+            if resultado['estado'] not in ('OPTIMO', 'INSATISFACIBLE'):
+                return fallar(f"MiniZinc no termino ({resultado['estado']})")
+        fila['completo'] = completo['polarizacion']
+        fila['agregado'] = agregado['polarizacion']
+        if completo['estado'] != agregado['estado']:
+            return fallar("un modelo es insatisfacible y el otro no")
+        if agregado['estado'] == 'OPTIMO':
+            if abs(completo['polarizacion'] - agregado['polarizacion']) > 1e-3 + EPS:
+                return fallar("los optimos de MiniZinc difieren")
+            # El flujo de MiniZinc tambien se debe poder repartir en un
+            # plan factible del modelo completo con la misma polarizacion
+            repartido = desagregar(datos, leer_flujos(agregado['stdout'], datos['m']))
+            mejor = mejor_mediana(datos, distribucion_final(datos, repartido))
+            if mejor is None or not es_factible(datos, repartido, mejor[1]) or \
+                    abs(mejor[0] - agregado['polarizacion']) > 1e-3 + EPS:
+                return fallar("el reparto del flujo de MiniZinc no es factible")
+            if fila['polarizacion'] is not None and \
+                    abs(agregado['polarizacion'] - fila['polarizacion']) > 1e-3 + EPS:
+                return fallar("el optimo de MiniZinc difiere del nativo")
+
+    return fila
+
+
+def verificar_suite(archivos, minizinc=False, timeout=60, ejecutable=None):
+    """
+    Verifica una lista de instancias
+
+    Retorna:
+        Lista de filas (las de verificar_instancia con archivo y tiempo)
+    """
+
+    filas = []
+    for archivo in archivos:
+        inicio = time.perf_counter()
+        fila = verificar_instancia(leer_txt(archivo), minizinc, timeout, ejecutable)
+        fila['archivo'] = archivo
+        fila['tiempo'] = time.perf_counter() - inicio
+        filas.append(fila)
+    return filas
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import argparse
+
+    argumentos = argparse.ArgumentParser(
+        description="Verifica que ProyectoAgregado.mzn tenga el mismo optimo que Proyecto.mzn")
+    argumentos.add_argument("carpeta", nargs="?", default=os.path.join(BASE_DIR, "..", "DatosProyecto"),
+                            help="carpeta con las instancias .txt")
+    argumentos.add_argument("--minizinc", action="store_true",
+                            help="resolver tambien los dos modelos con MiniZinc")
+    argumentos.add_argument("--timeout", type=float, default=60)
+    args = argumentos.parse_args()
+
+    filas = verificar_suite(sorted(glob.glob(os.path.join(args.carpeta, "*.txt"))),
+                            args.minizinc, args.timeout)
+    for fila in filas:
+        estado = "OK" if fila['ok'] else f"FALLA: {fila['detalle']}"
+        print(f"{os.path.basename(fila['archivo'])}: {estado}")
+    fallas = sum(1 for fila in filas if not fila['ok'])
+    print(f"\n{len(filas)} instancias, {fallas} fallas")
+    raise SystemExit(1 if fallas else 0)
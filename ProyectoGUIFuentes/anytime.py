@@ -0,0 +1,385 @@
+"""
+Ejecucion "anytime" del modelo MinPol con MiniZinc
+
+Lanza MiniZinc con soluciones intermedias y lee cada solucion a medida que
+llega. Se guarda la traza de la polarizacion contra el tiempo y, si la
+ejecucion se interrumpe por tiempo o por cancelacion, se retorna la mejor
+solucion encontrada junto con su gap respecto a una cota inferior.
+"""
+
+import math
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+from portafolio import (MINIZINC, MARCA_OPTIMO, MARCA_INSATISFACIBLE, terminar_proceso,
+                        argumentos_datos, leer_estadistica)
+from resultado import Resultado
+from compilacion import restringir_fzn
+from cotas import cotas_medianas
+
+
+# Separador que imprime MiniZinc al final de cada solucion
+MARCA_SOLUCION = "----------"
+
+
+def cota_global(datos):
+    """
+    Cota inferior de total_polarization para toda la instancia: la menor
+    de las cotas de cada posicion de la mediana (cotas.cotas_medianas)
+    """
+
+    cota = float(cotas_medianas(datos).min())
+    return cota if cota < math.inf else None
+
+
+class SeguimientoAnytime:
+    """
+    Procesa la salida de MiniZinc linea por linea y lleva la mejor
+    solucion, la traza (segundos, polarizacion) y el gap
+
+    Con salida_json=True cada solucion se lee como un objeto JSON
+    (--output-mode json) y se convierte en un Resultado
+    """
+
+    def __init__(self, cota=None, salida_json=False, arcos=None):
+        self.inicio = time.perf_counter()
+        self.cota = cota
+        self.salida_json = salida_json
+        self.arcos = arcos
+        self.traza = []
+        self.mejor = None
+        self.mejor_salida = ""
+        self.mejor_resultado = None
+        self.optimo = False
+        self.insatisfacible = False
+        self.estadisticas = {}
+        self.tiempo_lectura = 0.0
+        self._bloque = []
+
+    # --------------------------------------------------
+    def procesar_linea(self, linea):
+        """
+        Procesa una linea de stdout
+
+        Retorna:
+            La polarizacion de la solucion si la linea cierra una solucion
+            que mejora la mejor conocida, o None en otro caso
+        """
+
+        inicio = time.perf_counter()
+        try:
+            return self._procesar(linea)
+        finally:
+            self.tiempo_lectura += time.perf_counter() - inicio
+
+    # --------------------------------------------------
+    def _procesar(self, linea):
+        linea = linea.rstrip("\n")
+        if leer_estadistica(linea, self.estadisticas):
+            return None
+        marca = linea.strip()
+        if marca == MARCA_SOLUCION:
+            bloque, self._bloque = self._bloque, []
+            if not bloque:
+                return None
+            if self.salida_json:
+                resultado = Resultado.desde_json("\n".join(bloque), arcos=self.arcos)
+                polarizacion = resultado.polarizacion
+            else:
+                # La primera linea de cada solucion es round(total_polarization * 1000)
+                resultado = None
+                polarizacion = int(bloque[0].strip()) / 1000.0
+            if self.mejor is not None and polarizacion >= self.mejor:
+                return None
+            self.mejor = polarizacion
+            self.mejor_resultado = resultado
+            self.mejor_salida = "\n".join(bloque) + "\n"
+            self.traza.append((time.perf_counter() - self.inicio, polarizacion))
+            return polarizacion
+        if marca == MARCA_OPTIMO:
+            self.optimo = True
+        elif marca == MARCA_INSATISFACIBLE:
+            self.insatisfacible = True
+        elif not marca.startswith("====="):
+            self._bloque.append(linea)
+        return None
+
+    # --------------------------------------------------
+    def gap(self):
+        """
+        Gap relativo (mejor - cota) / mejor de la mejor solucion, 0 si se
+        probo la optimalidad, o None si aun no hay solucion o cota
+        """
+
+        if self.mejor is None:
+            return None
+        if self.optimo or self.mejor <= 0:
+            return 0.0
+        if self.cota is None:
+            return None
+        return max(0.0, (self.mejor - self.cota) / self.mejor)
+
+
+def formatear_traza(traza):
+    """Convierte la traza (segundos, polarizacion) en una tabla de texto"""
+    lineas = ["  tiempo (s)   polarizacion"]
+    for segundos, polarizacion in traza:
+        lineas.append(f"  {segundos:10.3f}   {polarizacion:.3f}")
+    return "\n".join(lineas)
+
+
+def resolver_anytime(ruta_mzn, ruta_dzn=None, timeout=60, cota=None, ejecutable=None,
+                     cancelar=None, al_linea=None, al_mejorar=None, salida_json=False,
+                     cota_superior=None, texto_dzn=None, cache_fzn=None, estadisticas=False,
+                     arcos=None, parametros=None):
+    """
+    Ejecuta MiniZinc con soluciones intermedias
+
+    Parametros:
+        ruta_mzn: ruta del modelo .mzn
+        ruta_dzn: ruta del archivo de datos .dzn (si no se da texto_dzn)
+        timeout: segundos maximos de ejecucion
+        cota: cota inferior de la polarizacion para calcular el gap
+        ejecutable: ejecutable de MiniZinc (por defecto MINIZINC)
+        cancelar: threading.Event opcional para detener la ejecucion
+        al_linea: funcion opcional que recibe cada linea de salida
+        al_mejorar: funcion opcional que recibe (segundos, polarizacion)
+                    cada vez que llega una solucion mejor
+        salida_json: usar --output-mode json y construir un Resultado
+        cota_superior: polarizacion de un plan factible conocido (por
+                       ejemplo, el heuristico); se agrega como restriccion
+                       para que el solver descarte lo peor. Con cache_fzn
+                       va en una copia del FlatZinc, fuera de la llave
+        texto_dzn: datos de la instancia en formato .dzn, en memoria
+        cache_fzn: CacheCompilacion opcional; el modelo se aplana aparte
+                   (o se toma ya aplanado de la cache) y MiniZinc solo
+                   ejecuta el backend sobre el FlatZinc
+        estadisticas: pedir a MiniZinc sus estadisticas (--statistics) del
+                      aplanado y del solver
+        arcos: lista de arcos de presolve con la que se generaron los datos
+               de ProyectoReducido.mzn o ProyectoParametrico.mzn (para leer
+               su salida JSON)
+        parametros: diccionario nombre -> valor (o lista de valores) de
+                    variables de salida del modelo que se fijan, como los
+                    datos de ProyectoParametrico.mzn; con cache_fzn se
+                    fijan en una copia del FlatZinc y no entran en la llave
+
+    Retorna:
+        Diccionario con las llaves:
+        - estado: 'OPTIMO', 'SOLUCION', 'INSATISFACIBLE', 'TIMEOUT',
+          'CANCELADO' o 'ERROR'
+        - interrupcion: None, 'TIMEOUT' o 'CANCELADO'
+        - polarizacion: mejor polarizacion encontrada (None si no hay)
+        - stdout: salida de la mejor solucion
+        - resultado: Resultado de la mejor solucion (solo con salida_json)
+        - traza: lista de (segundos, polarizacion)
+        - gap: gap relativo de la mejor solucion (None si no se conoce)
+        - tiempo: segundos empleados
+        - tiempo_compilacion: segundos aplanando el modelo (0 si el
+          FlatZinc vino de la cache, None sin cache_fzn)
+        - tiempo_solucion: segundos del backend (None sin cache_fzn o si
+          no se llego a lanzar)
+        - compilacion: 'CACHE', 'COMPILADO' o None sin cache_fzn
+        - tiempo_lectura_salida: segundos procesando la salida de MiniZinc
+        - estadisticas: diccionario con las estadisticas de MiniZinc
+          (flatTime, solveTime, nodes, failures, flatIntVars, ...; vacio
+          sin estadisticas=True)
+        - stderr: salida de errores de MiniZinc
+
+    Lanza FileNotFoundError si no se encuentra el ejecutable de MiniZinc
+    """
+
+    seguimiento = SeguimientoAnytime(cota, salida_json, arcos)
+    ejecutable = ejecutable or MINIZINC
+
+    restricciones = [(nombre, '=', valor) for nombre, valor in (parametros or {}).items()]
+    if cota_superior is not None:
+        restricciones.append(('total_polarization', '<=', cota_superior + 1e-6))
+
+    # Sin cache las restricciones van en un modelo adicional que MiniZinc
+    # une al principal; con cache, en una copia del FlatZinc ya aplanado
+    temporales = []
+    if restricciones and cache_fzn is None:
+        fd, ruta_restricciones = tempfile.mkstemp(prefix="minpol_restricciones_", suffix=".mzn")
+        with os.fdopen(fd, 'w') as f:
+            for nombre, operador, valor in restricciones:
+                if isinstance(valor, list):
+                    f.write(f"constraint array1d({nombre}) {operador} {valor};\n")
+                else:
+                    f.write(f"constraint {nombre} {operador} {valor};\n")
+        temporales.append(ruta_restricciones)
+
+    try:
+        if cache_fzn is None:
+            comando = [ejecutable, "--intermediate-solutions"]
+            if salida_json:
+                comando += ["--output-mode", "json"]
+            if estadisticas:
+                comando.append("--statistics")
+            with argumentos_datos(ruta_dzn, texto_dzn) as datos:
+                resultado = _ejecutar(comando + [ruta_mzn] + temporales + datos, seguimiento,
+                                      timeout, cancelar, al_linea, al_mejorar)
+            resultado.update(tiempo_compilacion=None, tiempo_solucion=None, compilacion=None)
+            return resultado
+
+        try:
+            compilado = cache_fzn.compilar(ruta_mzn, (), ruta_dzn, texto_dzn,
+                                           salida_json=salida_json, ejecutable=ejecutable,
+                                           timeout=timeout, cancelar=cancelar,
+                                           estadisticas=estadisticas)
+            ruta_fzn = compilado['fzn']
+            if restricciones:
+                ruta_fzn = restringir_fzn(ruta_fzn, restricciones)
+                temporales.append(ruta_fzn)
+        except RuntimeError as e:
+            return _sin_solucion(seguimiento, cancelar, timeout, str(e))
+
+        # Las estadisticas del aplanado (guardadas junto al FlatZinc si
+        # vino de la cache) se completan con las del solver
+        seguimiento.estadisticas.update(compilado['estadisticas'])
+        inicio_solucion = time.perf_counter()
+        comando = [ejecutable, "--intermediate-solutions", ruta_fzn,
+                   "--ozn-file", compilado['ozn']]
+        if estadisticas:
+            comando.append("--statistics")
+        resultado = _ejecutar(comando, seguimiento, timeout, cancelar, al_linea, al_mejorar)
+        resultado.update(tiempo_compilacion=compilado['tiempo'],
+                         tiempo_solucion=time.perf_counter() - inicio_solucion,
+                         compilacion='CACHE' if compilado['acierto'] else 'COMPILADO')
+        return resultado
+    finally:
+        for ruta in temporales:
+            os.remove(ruta)
+
+
+def _sin_solucion(seguimiento, cancelar, timeout, error):
+    """Resultado de una ejecucion que termino antes de lanzar el backend"""
+    tiempo = time.perf_counter() - seguimiento.inicio
+    if cancelar is not None and cancelar.is_set():
+        estado = 'CANCELADO'
+    elif tiempo > timeout:
+        estado = 'TIMEOUT'
+    else:
+        estado = 'ERROR'
+    return {
+        'estado': estado,
+        'interrupcion': estado if estado != 'ERROR' else None,
+        'polarizacion': None,
+        'stdout': "",
+        'resultado': None,
+        'traza': [],
+        'gap': None,
+        'tiempo': tiempo,
+        'tiempo_compilacion': tiempo,
+        'tiempo_solucion': None,
+        'compilacion': None,
+        'tiempo_lectura_salida': 0.0,
+        'estadisticas': seguimiento.estadisticas,
+        'stderr': error
+    }
+
+
+def _ejecutar(comando, seguimiento, timeout, cancelar, al_linea, al_mejorar):
+    """Lanza MiniZinc y sigue su salida hasta que termine o se interrumpa"""
+    proceso = subprocess.Popen(
+        comando,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+        start_new_session=(os.name == 'posix')
+    )
+
+    # Vigilar el tiempo maximo y la cancelacion mientras se lee la salida
+    interrupcion = []
+    def vigilar():
+        limite = seguimiento.inicio + timeout
+        while proceso.poll() is None:
+            if cancelar is not None and cancelar.is_set():
+                interrupcion.append('CANCELADO')
+            elif time.perf_counter() > limite:
+                interrupcion.append('TIMEOUT')
+            if interrupcion:
+                terminar_proceso(proceso)
+                return
+            time.sleep(0.05)
+    vigilante = threading.Thread(target=vigilar, daemon=True)
+    vigilante.start()
+
+    # Leer stderr en otro hilo para que no se llene su buffer
+    errores = []
+    def leer_errores():
+        for linea in proceso.stderr:
+            errores.append(linea)
+            if al_linea is not None:
+                al_linea("[stderr] " + linea.rstrip("\n"))
+    hilo_errores = threading.Thread(target=leer_errores, daemon=True)
+    hilo_errores.start()
+
+    for linea in proceso.stdout:
+        if al_linea is not None:
+            al_linea(linea.rstrip("\n"))
+        polarizacion = seguimiento.procesar_linea(linea)
+        if polarizacion is not None and al_mejorar is not None:
+            al_mejorar(seguimiento.traza[-1][0], polarizacion)
+    proceso.wait()
+    vigilante.join()
+    hilo_errores.join()
+
+    motivo = interrupcion[0] if interrupcion else None
+    if seguimiento.insatisfacible:
+        estado = 'INSATISFACIBLE'
+    elif seguimiento.optimo:
+        estado = 'OPTIMO'
+    elif seguimiento.mejor is not None:
+        estado = 'SOLUCION'
+    elif motivo is not None:
+        estado = motivo
+    else:
+        estado = 'ERROR'
+
+    if seguimiento.mejor_resultado is not None:
+        seguimiento.mejor_resultado.estado = estado
+
+    return {
+        'estado': estado,
+        'interrupcion': motivo,
+        'polarizacion': seguimiento.mejor,
+        'stdout': seguimiento.mejor_salida,
+        'resultado': seguimiento.mejor_resultado,
+        'traza': seguimiento.traza,
+        'gap': seguimiento.gap(),
+        'tiempo': time.perf_counter() - seguimiento.inicio,
+        'tiempo_lectura_salida': seguimiento.tiempo_lectura,
+        'estadisticas': seguimiento.estadisticas,
+        'stderr': "".join(errores)
+    }
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import sys
+    from parser import Instancia
+
+    if len(sys.argv) not in (3, 4):
+        print("Uso:")
+        print("  python anytime.py modelo.mzn instancia.txt [timeout]")
+        sys.exit(1)
+
+    with open(sys.argv[2]) as f:
+        instancia = Instancia.desde_texto(f.read())
+    timeout = float(sys.argv[3]) if len(sys.argv) == 4 else 60
+    resultado = resolver_anytime(
+        sys.argv[1], timeout=timeout, cota=cota_global(instancia.a_datos()),
+        texto_dzn=instancia.a_dzn(),
+        al_mejorar=lambda t, pol: print(f"[{t:8.3f}s] polarizacion {pol:.3f}")
+    )
+
+    print(resultado['stdout'], end="")
+    print(f"Estado: {resultado['estado']}")
+    if resultado['gap'] is not None:
+        print(f"Gap: {resultado['gap']:.2%}")
+    print(f"Tiempo: {resultado['tiempo']:.4f}s")
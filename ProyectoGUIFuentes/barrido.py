@@ -0,0 +1,178 @@
+"""
+Barrido parametrico de ct y maxMovs para una instancia de MinPol
+
+Calcula la polarizacion optima en una grilla de presupuestos (ct, maxMovs)
+y extrae la frontera de Pareto polarizacion vs. presupuesto. Se aprovecha
+que un presupuesto mayor nunca empeora la polarizacion:
+- El plan optimo de un presupuesto es factible para cualquier presupuesto
+  mayor, asi que se usa como solucion inicial del siguiente punto
+- Si dos puntos de una misma fila tienen la misma polarizacion, todos los
+  puntos intermedios tambien la tienen y no hace falta resolverlos
+Cada fila (un valor de maxMovs) se resuelve en un proceso distinto.
+"""
+
+import csv
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from solver_nativo import resolver_nativo, EPS
+
+
+def leer_rango(texto):
+    """
+    Convierte 'ini:fin:paso' (extremos incluidos) o una lista separada por
+    comas en la lista ordenada de valores
+    """
+
+    if ':' in texto:
+        ini, fin, paso = (float(x) for x in texto.split(':'))
+        if paso <= 0:
+            raise ValueError("El paso del rango debe ser positivo")
+        cantidad = int(math.floor((fin - ini) / paso + EPS)) + 1
+        return [round(ini + t * paso, 10) for t in range(cantidad)]
+    return sorted(float(x) for x in texto.split(','))
+
+
+def _polarizacion(resultado):
+    """Polarizacion de un resultado, o infinito si no hay solucion"""
+    return resultado['polarizacion'] if resultado['estado'] == 'OPTIMO' else math.inf
+
+
+def _inicial(resultado):
+    """Usa un resultado optimo como solucion inicial factible de otro punto"""
+    return resultado if resultado['estado'] == 'OPTIMO' else None
+
+
+def barrido_fila(datos, valores_ct, max_movs):
+    """
+    Resuelve todos los valores de ct (ordenados) para un maxMovs fijo
+    partiendo el intervalo a la mitad: si los extremos tienen la misma
+    polarizacion, los puntos intermedios se infieren sin resolverlos
+
+    Retorna:
+        Lista de filas (diccionarios con ct, maxMovs, polarizacion,
+        med_pos, resuelto, tiempo), una por cada valor de ct
+    """
+
+    puntos = [None] * len(valores_ct)
+
+    def resolver(t, inicial=None):
+        inicio = time.perf_counter()
+        resultado = resolver_nativo(dict(datos, ct=valores_ct[t], maxMovs=max_movs), inicial)
+        puntos[t] = (resultado, True, time.perf_counter() - inicio)
+
+    def bisectar(a, b):
+        if b - a <= 1:
+            return
+        if _polarizacion(puntos[a][0]) - _polarizacion(puntos[b][0]) <= EPS:
+            # Monotonia: todo punto intermedio tiene la misma polarizacion y
+            # el plan de a (presupuesto menor) es factible para todos
+            for t in range(a + 1, b):
+                puntos[t] = (puntos[a][0], False, 0.0)
+            return
+        medio = (a + b) // 2
+        resolver(medio, _inicial(puntos[a][0]))
+        bisectar(a, medio)
+        bisectar(medio, b)
+
+    resolver(0)
+    if len(valores_ct) > 1:
+        resolver(len(valores_ct) - 1, _inicial(puntos[0][0]))
+        bisectar(0, len(valores_ct) - 1)
+
+    filas = []
+    for ct, (resultado, resuelto, tiempo) in zip(valores_ct, puntos):
+        filas.append({
+            'ct': ct,
+            'maxMovs': max_movs,
+            'polarizacion': resultado.get('polarizacion'),
+            'med_pos': resultado.get('med_pos'),
+            'resuelto': resuelto,
+            'tiempo': tiempo
+        })
+    return filas
+
+
+def frontera_pareto(filas):
+    """
+    Marca en cada fila si pertenece a la frontera de Pareto: ningun otro
+    punto con ct y maxMovs menores o iguales logra una polarizacion menor
+    o igual
+
+    Retorna:
+        Las filas de la frontera, ordenadas por ct y maxMovs
+    """
+
+    for fila in filas:
+        pol = fila['polarizacion'] if fila['polarizacion'] is not None else math.inf
+        fila['pareto'] = pol < math.inf and not any(
+            otra is not fila and
+            otra['ct'] <= fila['ct'] and otra['maxMovs'] <= fila['maxMovs'] and
+            otra['polarizacion'] is not None and otra['polarizacion'] <= pol + EPS and
+            (otra['ct'], otra['maxMovs']) != (fila['ct'], fila['maxMovs'])
+            for otra in filas
+        )
+    return sorted((f for f in filas if f['pareto']), key=lambda f: (f['ct'], f['maxMovs']))
+
+
+def barrido(datos, valores_ct, valores_max_movs, procesos=None):
+    """
+    Calcula la polarizacion optima en la grilla valores_ct x valores_max_movs
+
+    Parametros:
+        datos: diccionario con la instancia (ct y maxMovs se ignoran)
+        valores_ct: valores de ct a evaluar
+        valores_max_movs: valores de maxMovs a evaluar
+        procesos: numero de procesos (por defecto, uno por nucleo)
+
+    Retorna:
+        Lista de filas con ct, maxMovs, polarizacion, med_pos, resuelto
+        (False si se infirio por monotonia), tiempo y pareto
+    """
+
+    valores_ct = sorted(valores_ct)
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as pool:
+        futuros = [pool.submit(barrido_fila, datos, valores_ct, max_movs)
+                   for max_movs in sorted(valores_max_movs)]
+        filas = [fila for futuro in futuros for fila in futuro.result()]
+    frontera_pareto(filas)
+    return filas
+
+
+def guardar_tabla(filas, salida):
+    """Guarda la grilla del barrido en un archivo CSV"""
+    columnas = ['ct', 'maxMovs', 'polarizacion', 'med_pos', 'resuelto', 'pareto', 'tiempo']
+    with open(salida, 'w', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=columnas)
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import argparse
+    from parser import leer_txt
+
+    argumentos = argparse.ArgumentParser(description="Barrido de ct y maxMovs para una instancia MinPol")
+    argumentos.add_argument("instancia", help="archivo .txt de la instancia")
+    argumentos.add_argument("--ct", required=True, help="rango 'ini:fin:paso' o lista '10,20,30'")
+    argumentos.add_argument("--maxmovs", required=True, help="rango 'ini:fin:paso' o lista '1,2,5'")
+    argumentos.add_argument("--procesos", type=int, default=None)
+    argumentos.add_argument("--salida", default="barrido.csv", help="archivo .csv con la grilla")
+    args = argumentos.parse_args()
+
+    inicio = time.perf_counter()
+    filas = barrido(leer_txt(args.instancia), leer_rango(args.ct), leer_rango(args.maxmovs),
+                    args.procesos)
+    guardar_tabla(filas, args.salida)
+
+    resueltos = sum(1 for fila in filas if fila['resuelto'])
+    print("Frontera de Pareto:")
+    print("  ct          maxMovs     polarizacion")
+    for fila in frontera_pareto(filas):
+        print(f"  {fila['ct']:<11g} {fila['maxMovs']:<11g} {fila['polarizacion']:.3f}")
+    print(f"\n{len(filas)} puntos ({resueltos} resueltos, {len(filas) - resueltos} inferidos) "
+          f"en {time.perf_counter() - inicio:.2f}s")
+    print(f"Grilla guardada en {args.salida}")
@@ -0,0 +1,278 @@
+"""
+Suite de rendimiento de MinPol
+
+Genera instancias con generador.py (siempre las mismas para una semilla),
+mide el tiempo de cada fase (lectura del .txt, lectura compacta,
+conversion a .dzn y solucion con cada motor) y guarda las mediciones en
+JSON. Si se indica una base guardada antes, compara contra ella y marca
+como regresion:
+- un tiempo que supera al de la base en mas de la tolerancia relativa
+  (y en mas de MINIMO_ABSOLUTO segundos, para ignorar el ruido)
+- una polarizacion peor o un estado que deja de ser OPTIMO
+Cada solucion corre en un proceso aparte con un limite de tiempo, asi que
+una configuracion lenta no detiene la suite.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import tempfile
+import time
+
+from generador import generar_instancia
+from lote import COLUMNAS, resolver_datos
+from parser import texto_txt, leer_txt, leer_txt_compacto, convertir_streaming
+
+
+# Configuraciones de cada suite: (n, m, densidad, holgura) y los motores
+# que tiene sentido medir a esa escala
+SUITES = {
+    'rapida': [
+        {'n': 50, 'm': 3, 'densidad': 0.5, 'holgura': 0.3, 'motores': ['heuristico', 'nativo']},
+        {'n': 200, 'm': 5, 'densidad': 0.2, 'holgura': 0.3, 'motores': ['heuristico', 'nativo']},
+        {'n': 200, 'm': 5, 'densidad': 0.8, 'holgura': 0.3, 'motores': ['heuristico', 'nativo']},
+        {'n': 200, 'm': 5, 'densidad': 0.5, 'holgura': 0.1, 'motores': ['heuristico', 'nativo']},
+        {'n': 1000, 'm': 3, 'densidad': 0.5, 'holgura': 0.3, 'motores': ['heuristico', 'nativo']},
+        {'n': 5000, 'm': 20, 'densidad': 0.5, 'holgura': 0.3, 'motores': ['heuristico']},
+    ],
+    'completa': [
+        {'n': 500, 'm': 5, 'densidad': 0.5, 'holgura': 0.3,
+         'motores': ['heuristico', 'nativo', 'minizinc']},
+        {'n': 1000, 'm': 5, 'densidad': 0.5, 'holgura': 0.3,
+         'motores': ['heuristico', 'nativo', 'minizinc']},
+        {'n': 200, 'm': 8, 'densidad': 0.5, 'holgura': 0.3,
+         'motores': ['heuristico', 'nativo', 'minizinc']},
+        {'n': 10000, 'm': 50, 'densidad': 0.5, 'holgura': 0.3, 'motores': ['heuristico', 'minizinc']},
+        {'n': 1000000, 'm': 1000, 'densidad': 0.5, 'holgura': 0.3, 'motores': ['heuristico']},
+    ]
+}
+
+# Tolerancia relativa de tiempo antes de marcar una regresion
+TOLERANCIA = 0.25
+
+# Diferencias de tiempo menores a esto (segundos) se consideran ruido
+MINIMO_ABSOLUTO = 0.005
+
+
+def nombre_config(config, semilla):
+    """Nombre estable de una instancia de la suite"""
+    return (f"n{config['n']}_m{config['m']}_d{config['densidad']}"
+            f"_h{config['holgura']}_s{semilla}")
+
+
+def _medir(funcion, repeticiones):
+    """Ejecuta funcion varias veces y retorna el menor tiempo (segundos)"""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempo = time.perf_counter() - inicio
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor
+
+
+def _resolver_hijo(conexion, datos, motor, limite):
+    """Resuelve en un proceso aparte y envia (estado, polarizacion, tiempo, error)"""
+    fila = dict.fromkeys(COLUMNAS)
+    try:
+        resolver_datos(fila, datos, motor, limite)
+        conexion.send((fila['estado'], fila['polarizacion'], fila['tiempo_solucion'],
+                       fila['error']))
+    except Exception as e:
+        conexion.send(('ERROR', None, None, f"{type(e).__name__}: {e}"))
+    conexion.close()
+
+
+def medir_solucion(datos, motor, limite):
+    """
+    Mide la solucion de una instancia con un motor en un proceso aparte
+
+    Retorna:
+        Tupla (estado, polarizacion, tiempo, error); si el motor no termina
+        en limite segundos el estado es 'LIMITE' y el tiempo es None; si el
+        proceso muere sin responder (falta de memoria, una senal) el estado
+        es 'ERROR' y error trae su codigo de salida
+    """
+
+    receptor, emisor = multiprocessing.Pipe(duplex=False)
+    proceso = multiprocessing.Process(target=_resolver_hijo, args=(emisor, datos, motor, limite))
+    proceso.start()
+    emisor.close()
+    # MiniZinc recibe limite como timeout; se deja un margen para que
+    # termine por su cuenta y entregue su mejor solucion
+    try:
+        if receptor.poll(limite + 5):
+            medicion = receptor.recv()
+        else:
+            medicion = ('LIMITE', None, None, None)
+    except EOFError:
+        # El hijo cerro la tuberia sin enviar nada: termino de forma anormal
+        proceso.join()
+        medicion = ('ERROR', None, None, f"El proceso termino con codigo {proceso.exitcode}")
+    proceso.terminate()
+    proceso.join()
+    return medicion
+
+
+def medir_instancia(datos, nombre, motores, limite=30, repeticiones=3, directorio=None):
+    """
+    Mide todas las fases de una instancia
+
+    Retorna:
+        Lista de mediciones (diccionarios con instancia, motor, fase,
+        tiempo, estado, polarizacion y error; motor es None en lectura y
+        conversion)
+    """
+
+    directorio = directorio or tempfile.gettempdir()
+    ruta_txt = os.path.join(directorio, f"{nombre}.txt")
+    ruta_dzn = os.path.join(directorio, f"{nombre}.dzn")
+    with open(ruta_txt, 'w') as f:
+        f.write(texto_txt(datos))
+
+    def medicion(motor, fase, tiempo, estado='OK', polarizacion=None, error=None):
+        return {'instancia': nombre, 'motor': motor, 'fase': fase, 'tiempo': tiempo,
+                'estado': estado, 'polarizacion': polarizacion, 'error': error}
+
+    mediciones = [
+        medicion(None, 'lectura', _medir(lambda: leer_txt(ruta_txt), repeticiones)),
+        medicion(None, 'lectura_compacta', _medir(lambda: leer_txt_compacto(ruta_txt), repeticiones)),
+        medicion(None, 'conversion', _medir(lambda: convertir_streaming(ruta_txt, ruta_dzn),
+                                            repeticiones))
+    ]
+    for motor in motores:
+        estado, polarizacion, tiempo, error = medir_solucion(datos, motor, limite)
+        mediciones.append(medicion(motor, 'solucion', tiempo, estado, polarizacion, error))
+
+    os.remove(ruta_txt)
+    if os.path.exists(ruta_dzn):
+        os.remove(ruta_dzn)
+    return mediciones
+
+
+def ejecutar_suite(suite='rapida', motores=None, semillas=(0,), limite=30, repeticiones=3,
+                   al_medir=None):
+    """
+    Ejecuta una suite completa
+
+    Parametros:
+        suite: nombre de la suite en SUITES
+        motores: restringir a estos motores (por defecto, los de cada
+                 configuracion)
+        semillas: semillas de las instancias de cada configuracion
+        limite: segundos maximos por solucion
+        repeticiones: repeticiones de lectura y conversion (se guarda la menor)
+        al_medir: funcion opcional que recibe cada medicion al terminar
+
+    Retorna:
+        Diccionario con suite, fecha, plataforma, python y mediciones
+    """
+
+    mediciones = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for config in SUITES[suite]:
+            elegidos = [motor for motor in config['motores'] if motores is None or motor in motores]
+            for semilla in semillas:
+                datos = generar_instancia(config['n'], config['m'], config['densidad'],
+                                          config['holgura'], semilla)
+                for medicion in medir_instancia(datos, nombre_config(config, semilla), elegidos,
+                                                limite, repeticiones, directorio):
+                    mediciones.append(medicion)
+                    if al_medir is not None:
+                        al_medir(medicion)
+    return {
+        'suite': suite,
+        'fecha': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'plataforma': platform.platform(),
+        'python': platform.python_version(),
+        'mediciones': mediciones
+    }
+
+
+def comparar(actual, base, tolerancia=TOLERANCIA, minimo=MINIMO_ABSOLUTO):
+    """
+    Compara dos ejecuciones de la suite
+
+    Retorna:
+        Tupla (regresiones, mejoras) con listas de mensajes; las
+        mediciones que no estan en ambas ejecuciones se ignoran
+    """
+
+    def llave(medicion):
+        return medicion['instancia'], medicion['motor'], medicion['fase']
+
+    anteriores = {llave(medicion): medicion for medicion in base['mediciones']}
+    regresiones, mejoras = [], []
+    for medicion in actual['mediciones']:
+        anterior = anteriores.get(llave(medicion))
+        if anterior is None:
+            continue
+        nombre = " / ".join(str(parte) for parte in llave(medicion) if parte is not None)
+
+        if anterior['estado'] == 'OPTIMO' and medicion['estado'] != 'OPTIMO':
+            regresiones.append(f"{nombre}: estado {anterior['estado']} -> {medicion['estado']}")
+            continue
+        if anterior['polarizacion'] is not None and medicion['polarizacion'] is not None:
+            if medicion['polarizacion'] > anterior['polarizacion'] + 1e-6:
+                regresiones.append(f"{nombre}: polarizacion {anterior['polarizacion']:.3f} -> "
+                                   f"{medicion['polarizacion']:.3f}")
+            elif medicion['polarizacion'] < anterior['polarizacion'] - 1e-6:
+                mejoras.append(f"{nombre}: polarizacion {anterior['polarizacion']:.3f} -> "
+                               f"{medicion['polarizacion']:.3f}")
+
+        if anterior['tiempo'] is None or medicion['tiempo'] is None:
+            continue
+        diferencia = medicion['tiempo'] - anterior['tiempo']
+        texto = (f"{nombre}: {anterior['tiempo'] * 1000:.1f} ms -> "
+                 f"{medicion['tiempo'] * 1000:.1f} ms")
+        if diferencia > minimo and medicion['tiempo'] > anterior['tiempo'] * (1 + tolerancia):
+            regresiones.append(texto)
+        elif -diferencia > minimo and medicion['tiempo'] < anterior['tiempo'] / (1 + tolerancia):
+            mejoras.append(texto)
+    return regresiones, mejoras
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Suite de rendimiento de MinPol")
+    argumentos.add_argument("--suite", choices=sorted(SUITES), default='rapida')
+    argumentos.add_argument("--motores", nargs="+", choices=['heuristico', 'nativo', 'minizinc'],
+                            default=None, help="medir solo estos motores")
+    argumentos.add_argument("--semillas", type=int, default=1,
+                            help="instancias por configuracion (semillas 0..k-1)")
+    argumentos.add_argument("--limite", type=float, default=30,
+                            help="segundos maximos por solucion")
+    argumentos.add_argument("--repeticiones", type=int, default=3,
+                            help="repeticiones de lectura y conversion")
+    argumentos.add_argument("--salida", default="benchmark.json",
+                            help="archivo JSON con las mediciones")
+    argumentos.add_argument("--base", default=None,
+                            help="JSON de una ejecucion anterior para detectar regresiones")
+    argumentos.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                            help="aumento relativo de tiempo tolerado (0.25 = 25%%)")
+    args = argumentos.parse_args()
+
+    def mostrar(medicion):
+        tiempo = "-" if medicion['tiempo'] is None else f"{medicion['tiempo'] * 1000:.1f} ms"
+        motor = f" {medicion['motor']}" if medicion['motor'] else ""
+        error = f" ({medicion['error']})" if medicion.get('error') else ""
+        print(f"{medicion['instancia']}{motor} {medicion['fase']}: {tiempo} {medicion['estado']}{error}")
+
+    resultado = ejecutar_suite(args.suite, args.motores, range(args.semillas), args.limite,
+                               args.repeticiones, mostrar)
+    with open(args.salida, 'w') as f:
+        json.dump(resultado, f, indent=2)
+    print(f"\nMediciones guardadas en {args.salida}")
+
+    if args.base:
+        with open(args.base, 'r') as f:
+            base = json.load(f)
+        regresiones, mejoras = comparar(resultado, base, args.tolerancia)
+        for texto in mejoras:
+            print(f"MEJORA     {texto}")
+        for texto in regresiones:
+            print(f"REGRESION  {texto}")
+        print(f"{len(regresiones)} regresiones y {len(mejoras)} mejoras contra {args.base}")
+        raise SystemExit(1 if regresiones else 0)
@@ -0,0 +1,267 @@
+"""
+Bitacora de lotes reanudables de MinPol
+
+Un lote largo (miles de instancias) que se cae a la mitad por un error de
+MiniZinc, falta de memoria o un reinicio no tiene que empezar de nuevo: la
+bitacora es un directorio con
+- eventos-<trabajador>.jsonl: un archivo de solo agregado por trabajador
+  con una linea JSON por evento (INICIO, TERMINADO o FALLO de un trabajo,
+  con su llave, intento, fecha y la fila del resultado). Cada trabajador
+  escribe solo en el suyo, asi que no hace falta bloquear archivos aunque
+  los trabajadores esten en otras maquinas con el directorio compartido
+- reclamos/<llave>.<generacion>: el archivo que marca un trabajo en
+  curso. Solo vale el de mayor generacion. Se crea con O_CREAT | O_EXCL,
+  asi que de dos trabajadores que intentan la misma generacion solo uno
+  lo logra, y nunca se borra ni se renombra el reclamo de otro. Su dueno
+  lo toca cada ARRIENDO / 3 segundos; un reclamo que no se toca en
+  ARRIENDO segundos es de un trabajador caido y otro lo toma creando la
+  generacion siguiente (si el dueno era un proceso de la misma maquina
+  que ya no existe, se toma de inmediato). Al terminar, el dueno borra su
+  reclamo y los de generaciones anteriores
+
+Al reanudar se leen todos los eventos: los trabajos TERMINADOS se saltan,
+los fallidos se reintentan con espera exponencial hasta max_intentos, y
+los que quedaron a medias se retoman cuando vence su reclamo. En el peor
+caso (un reclamo tomado justo cuando su dueno seguia vivo) un trabajo se
+resuelve dos veces, pero nunca se pierde.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Segundos sin latido tras los que un reclamo se considera abandonado
+ARRIENDO = 120
+
+# Espera antes del primer reintento de un trabajo fallido (se duplica en cada fallo)
+ESPERA_REINTENTO = 30
+
+# Intentos por trabajo, contando los que se interrumpieron
+MAX_INTENTOS = 3
+
+
+class Bitacora:
+    """Estado de los trabajos de un lote, reconstruido a partir de sus eventos"""
+
+    def __init__(self, directorio, arriendo=ARRIENDO, espera=ESPERA_REINTENTO, trabajador=None):
+        self.directorio = directorio
+        self.arriendo = arriendo
+        self.espera = espera
+        self.trabajador = trabajador or f"{socket.gethostname()}-{os.getpid()}"
+        self.dir_reclamos = os.path.join(directorio, "reclamos")
+        os.makedirs(self.dir_reclamos, exist_ok=True)
+        self.ruta = os.path.join(directorio, f"eventos-{self.trabajador}.jsonl")
+        # llave -> intentos, fallos, ultimo_fallo y fila
+        self.trabajos = {}
+        # Bytes ya leidos de cada archivo de eventos
+        self._leido = {}
+        # llave -> generacion de los reclamos de este trabajador
+        self.generaciones = {}
+        self.actualizar()
+
+    # --------------------------------------------------
+    def actualizar(self):
+        """Lee los eventos nuevos de todos los trabajadores"""
+        for nombre in sorted(os.listdir(self.directorio)):
+            if not (nombre.startswith("eventos-") and nombre.endswith(".jsonl")):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            with open(ruta, 'rb') as f:
+                f.seek(self._leido.get(ruta, 0))
+                bloque = f.read()
+            # Una linea sin salto final esta a medio escribir: se lee despues
+            completo = bloque[:bloque.rfind(b"\n") + 1]
+            self._leido[ruta] = self._leido.get(ruta, 0) + len(completo)
+            for linea in completo.splitlines():
+                try:
+                    self._aplicar(json.loads(linea))
+                except ValueError:
+                    # Linea truncada por una caida antes del salto de linea
+                    continue
+
+    # --------------------------------------------------
+    def _aplicar(self, evento):
+        """Actualiza el estado de un trabajo con un evento"""
+        trabajo = self.estado(evento['clave'])
+        if evento['evento'] == 'INICIO':
+            trabajo['intentos'] = max(trabajo['intentos'], evento['intento'])
+        elif evento['evento'] == 'FALLO':
+            trabajo['fallos'] += 1
+            trabajo['ultimo_fallo'] = max(trabajo['ultimo_fallo'] or 0, evento['fecha'])
+            if trabajo['fila'] is None or trabajo['fila']['estado'] == 'ERROR':
+                trabajo['fila'] = evento['fila']
+        elif evento['evento'] == 'TERMINADO' and not trabajo['terminado']:
+            # Si un trabajo se resolvio dos veces vale el primer resultado
+            trabajo['terminado'] = True
+            trabajo['fila'] = evento['fila']
+
+    # --------------------------------------------------
+    def estado(self, clave):
+        """Estado conocido de un trabajo (se crea vacio si no tiene eventos)"""
+        if clave not in self.trabajos:
+            self.trabajos[clave] = {'terminado': False, 'intentos': 0, 'fallos': 0,
+                                    'ultimo_fallo': None, 'fila': None}
+        return self.trabajos[clave]
+
+    # --------------------------------------------------
+    def pendiente(self, clave, max_intentos=MAX_INTENTOS):
+        """Indica si un trabajo todavia no termina y le quedan intentos"""
+        trabajo = self.estado(clave)
+        return not trabajo['terminado'] and trabajo['intentos'] < max_intentos
+
+    # --------------------------------------------------
+    def disponible(self, clave, max_intentos=MAX_INTENTOS):
+        """Indica si un trabajo pendiente ya cumplio la espera de su ultimo fallo"""
+        if not self.pendiente(clave, max_intentos):
+            return False
+        return time.time() >= self.proximo_intento(clave)
+
+    # --------------------------------------------------
+    def proximo_intento(self, clave):
+        """Instante (time.time()) desde el que un trabajo se puede reintentar; 0 si no ha fallado"""
+        trabajo = self.estado(clave)
+        if not trabajo['fallos']:
+            return 0.0
+        return trabajo['ultimo_fallo'] + self.espera * 2 ** (trabajo['fallos'] - 1)
+
+    # --------------------------------------------------
+    def _ruta_reclamo(self, clave, generacion):
+        """Ruta del archivo de reclamo de una generacion de un trabajo"""
+        return os.path.join(self.dir_reclamos, f"{clave}.{generacion}")
+
+    # --------------------------------------------------
+    def _reclamos(self, clave):
+        """Generaciones de reclamo que existen para un trabajo, de menor a mayor"""
+        generaciones = []
+        for nombre in os.listdir(self.dir_reclamos):
+            llave, _, generacion = nombre.rpartition(".")
+            if llave == clave and generacion.isdigit():
+                generaciones.append(int(generacion))
+        return sorted(generaciones)
+
+    # --------------------------------------------------
+    def _abandonado(self, ruta):
+        """Indica si un reclamo no tiene latido reciente o su dueno es un proceso local que ya termino"""
+        if time.time() - os.stat(ruta).st_mtime > self.arriendo:
+            return True
+        with open(ruta) as f:
+            maquina, _, pid = f.read().rpartition("-")
+        if maquina != socket.gethostname() or not pid.isdigit():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    # --------------------------------------------------
+    def reclamar(self, clave, max_intentos=MAX_INTENTOS):
+        """
+        Intenta tomar un trabajo para este trabajador
+
+        Retorna:
+            True si el reclamo quedo a nombre de este trabajador; False si
+            otro lo tiene (con latido reciente) o ya no esta disponible
+        """
+
+        generaciones = self._reclamos(clave)
+        generacion = 0
+        if generaciones:
+            try:
+                if not self._abandonado(self._ruta_reclamo(clave, generaciones[-1])):
+                    return False
+            except FileNotFoundError:
+                # Su dueno lo libero mientras tanto
+                pass
+            generacion = generaciones[-1] + 1
+
+        try:
+            fd = os.open(self._ruta_reclamo(clave, generacion),
+                         os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.trabajador)
+        self.generaciones[clave] = generacion
+
+        # Un trabajador con una lista vieja pudo crear una generacion menor
+        # despues de que otro tomara una mayor: gana la mayor
+        if self._reclamos(clave)[-1] > generacion:
+            self.liberar(clave)
+            return False
+
+        # Otro trabajador pudo terminarlo entre la lectura y el reclamo
+        self.actualizar()
+        if not self.disponible(clave, max_intentos):
+            self.liberar(clave)
+            return False
+        return True
+
+    # --------------------------------------------------
+    def liberar(self, clave):
+        """Borra el reclamo de este trabajador y los de generaciones anteriores"""
+        generacion = self.generaciones.pop(clave, None)
+        if generacion is None:
+            return
+        for anterior in self._reclamos(clave):
+            if anterior > generacion:
+                break
+            try:
+                os.remove(self._ruta_reclamo(clave, anterior))
+            except FileNotFoundError:
+                pass
+
+    # --------------------------------------------------
+    @contextmanager
+    def trabajando(self, clave):
+        """Mantiene vivo el reclamo de un trabajo mientras dura el bloque y luego lo libera"""
+        ruta = self._ruta_reclamo(clave, self.generaciones[clave])
+        detener = threading.Event()
+
+        def latir():
+            while not detener.wait(self.arriendo / 3):
+                try:
+                    os.utime(ruta)
+                except FileNotFoundError:
+                    return
+
+        latido = threading.Thread(target=latir, daemon=True)
+        latido.start()
+        try:
+            yield
+        finally:
+            detener.set()
+            latido.join()
+            self.liberar(clave)
+
+    # --------------------------------------------------
+    def registrar(self, evento, clave, **campos):
+        """
+        Agrega un evento al archivo de este trabajador y lo aplica al estado
+
+        Cada evento se escribe con un solo write y se sincroniza con el
+        disco, asi que sobrevive a un reinicio de la maquina
+        """
+
+        registro = {'evento': evento, 'clave': clave, 'trabajador': self.trabajador,
+                    'fecha': time.time(), **campos}
+        with open(self.ruta, 'a') as f:
+            f.write(json.dumps(registro) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._aplicar(registro)
+        # Lo propio ya esta aplicado: no volver a leerlo en actualizar
+        self._leido[self.ruta] = os.path.getsize(self.ruta)
+
+    # --------------------------------------------------
+    def iniciar(self, clave, archivo):
+        """Registra el comienzo de un intento y retorna su numero"""
+        intento = self.estado(clave)['intentos'] + 1
+        self.registrar('INICIO', clave, archivo=archivo, intento=intento)
+        return intento
@@ -0,0 +1,173 @@
+"""
+Cache en disco de resultados de MinPol
+
+Cada resultado se guarda en un archivo JSON cuyo nombre es el hash de la
+instancia ya parseada, del archivo del modelo (o motor) que la resolvio y
+de la configuracion del solver. Como el hash se calcula sobre los datos
+normalizados y no sobre los bytes del .txt, los espacios o escribir 1.0
+en lugar de 1 no cambian la llave.
+
+El tamano se limita por numero de entradas: cuando se supera el maximo se
+eliminan las menos usadas recientemente (la fecha de modificacion de cada
+archivo se actualiza en cada acierto) hasta dejar una holgura, asi que el
+directorio solo se recorre una vez cada varias escrituras.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUTA_CACHE = os.path.join(BASE_DIR, "..", ".cache_minpol")
+
+# Fraccion de max_entradas que se libera en cada desalojo
+HOLGURA_DESALOJO = 0.1
+
+
+def instancia_canonica(datos):
+    """
+    Retorna la instancia con tipos normalizados: enteros para n, m, p y s,
+    flotantes para v, ct y maxMovs
+    """
+
+    return {
+        'n': int(datos['n']),
+        'm': int(datos['m']),
+        'p': [int(x) for x in datos['p']],
+        'v': [float(x) for x in datos['v']],
+        's': [[int(x) for x in fila] for fila in datos['s']],
+        'ct': float(datos['ct']),
+        'maxMovs': float(datos['maxMovs'])
+    }
+
+
+def hash_archivo(ruta):
+    """Calcula el sha256 del contenido de un archivo"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 16), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def clave_cache(datos, ruta_modelo, config=None):
+    """
+    Calcula la llave de cache de una instancia
+
+    Parametros:
+        datos: diccionario con la instancia (como el de parser.leer_txt)
+        ruta_modelo: archivo del modelo o motor que la resuelve, o lista
+                     de archivos si el motor usa varios modulos; su
+                     contenido forma parte de la llave
+        config: diccionario opcional con la configuracion del solver
+
+    Retorna:
+        Hash sha256 en hexadecimal
+    """
+
+    contenido = {
+        'instancia': instancia_canonica(datos),
+        'modelo': ([hash_archivo(ruta) for ruta in ruta_modelo]
+                   if isinstance(ruta_modelo, (list, tuple)) else hash_archivo(ruta_modelo)),
+        'config': config or {}
+    }
+    texto = json.dumps(contenido, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def contar_archivos(directorio, extension):
+    """Cuenta los archivos de un directorio con esa extension (sin leer sus fechas)"""
+    return sum(1 for nombre in os.listdir(directorio) if nombre.endswith(extension))
+
+
+def entradas_por_uso(directorio, extension):
+    """Lista (fecha de modificacion, ruta) de los archivos con esa extension, del menos al mas usado"""
+    entradas = []
+    for entrada in os.scandir(directorio):
+        if entrada.name.endswith(extension):
+            try:
+                entradas.append((entrada.stat().st_mtime, entrada.path))
+            except FileNotFoundError:
+                continue
+    entradas.sort()
+    return entradas
+
+
+def limite_desalojo(max_entradas):
+    """Entradas que quedan despues de un desalojo"""
+    return max_entradas - int(max_entradas * HOLGURA_DESALOJO)
+
+
+class CacheResultados:
+    """Cache de resultados en disco con politica LRU y contadores de aciertos"""
+
+    def __init__(self, directorio=RUTA_CACHE, max_entradas=10000):
+        self.directorio = directorio
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(directorio, exist_ok=True)
+        # Entradas en el directorio, estimadas sin recorrerlo en cada escritura
+        self.entradas = contar_archivos(directorio, ".json")
+
+    # --------------------------------------------------
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + ".json")
+
+    # --------------------------------------------------
+    def obtener(self, clave):
+        """Retorna el resultado guardado con esa llave, o None si no existe"""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'r') as f:
+                resultado = json.load(f)
+            # Marcar la entrada como usada recientemente
+            os.utime(ruta)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.fallos += 1
+            return None
+
+        self.aciertos += 1
+        return resultado
+
+    # --------------------------------------------------
+    def guardar(self, clave, resultado):
+        """Guarda un resultado (serializable a JSON) y aplica la politica LRU"""
+        # Escribir en un temporal y renombrar para que ningun lector vea
+        # un archivo a medio escribir
+        ruta = self._ruta(clave)
+        nueva = not os.path.exists(ruta)
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(resultado, f)
+        os.replace(temporal, ruta)
+        if nueva:
+            self.entradas += 1
+        if self.entradas > self.max_entradas:
+            self._desalojar()
+
+    # --------------------------------------------------
+    def _desalojar(self):
+        """Elimina las entradas menos usadas hasta dejar la holgura bajo max_entradas"""
+        entradas = entradas_por_uso(self.directorio, ".json")
+        sobrantes = max(len(entradas) - limite_desalojo(self.max_entradas), 0)
+        for _, ruta in entradas[:sobrantes]:
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+        # Otros procesos pudieron escribir en el mismo directorio: el conteo
+        # se corrige con lo que se encontro
+        self.entradas = len(entradas) - sobrantes
+
+    # --------------------------------------------------
+    def estadisticas(self):
+        """Retorna los contadores de aciertos y fallos de esta sesion"""
+        total = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / total if total else 0.0
+        }
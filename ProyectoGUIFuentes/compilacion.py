@@ -0,0 +1,324 @@
+"""
+Cache de compilacion (FlatZinc) del modelo MinPol
+
+MiniZinc primero aplana el modelo con los datos (FlatZinc, .fzn) y luego
+se lo entrega al backend; en instancias pequenas el aplanado es la mayor
+parte del tiempo. Aqui el aplanado se hace aparte (minizinc -c) y el par
+.fzn/.ozn se guarda en disco con una llave formada por el hash del
+modelo (y de los modelos adicionales), el hash de los datos, el solver,
+el modo de salida y la version de MiniZinc. Si la misma combinacion
+vuelve a llegar se salta directo al backend.
+
+Lo que cambia en cada ejecucion no entra en la llave: restringir_fzn
+agrega a una copia del FlatZinc las restricciones sobre sus variables de
+salida, como la cota superior del plan heuristico (que depende del tiempo
+que tuvo la heuristica) o los datos de ProyectoParametrico.mzn (p, s, ct,
+maxMovs y arc_cap). Con ese modelo la llave depende solo de n, m, v y los
+arcos, y el FlatZinc se reutiliza al cambiar ct o p.
+"""
+
+import functools
+import hashlib
+import json
+import math
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+from cache import RUTA_CACHE, hash_archivo, contar_archivos, entradas_por_uso, limite_desalojo
+from portafolio import MINIZINC, argumentos_datos, terminar_proceso, leer_estadistica
+
+
+RUTA_CACHE_FZN = os.path.join(RUTA_CACHE, "fzn")
+
+# Declaraciones de variables de salida en un FlatZinc:
+#   var float: ct:: output_var;
+#   array [1..3] of var 0..10: p:: output_array([1..3]) = [X_1,X_2,X_3];
+VAR_SALIDA = re.compile(r"var\s+(.+?)\s*:\s*(\w+)\s*::.*\boutput_var\b")
+ARREGLO_SALIDA = re.compile(r"array\s*\[[^\]]*\]\s*of\s+var\s+(.+?)\s*:\s*(\w+)\s*::"
+                            r".*\boutput_array\b.*=\s*\[(.*)\]\s*;")
+
+
+@functools.lru_cache(maxsize=None)
+def version_minizinc(ejecutable=None):
+    """Texto de minizinc --version ('' si no se puede ejecutar)"""
+    try:
+        proceso = subprocess.run([ejecutable or MINIZINC, "--version"], capture_output=True,
+                                 text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return proceso.stdout.strip()
+
+
+def clave_compilacion(ruta_mzn, extras=(), ruta_dzn=None, texto_dzn=None, solver=None,
+                      salida_json=False, ejecutable=None):
+    """
+    Calcula la llave de un modelo aplanado
+
+    Parametros:
+        ruta_mzn: ruta del modelo .mzn
+        extras: rutas de modelos adicionales que se unen al principal
+        ruta_dzn / texto_dzn: datos de la instancia (archivo o texto)
+        solver: identificador del solver (None para el de por defecto)
+        salida_json: si se compila con --output-mode json
+        ejecutable: ejecutable de MiniZinc (su version entra en la llave)
+
+    Retorna:
+        Hash sha256 en hexadecimal
+    """
+
+    h = hashlib.sha256()
+    for ruta in (ruta_mzn,) + tuple(extras):
+        h.update(hash_archivo(ruta).encode())
+    if texto_dzn is None:
+        h.update(hash_archivo(ruta_dzn).encode())
+    else:
+        h.update(hashlib.sha256(texto_dzn.encode()).hexdigest().encode())
+    h.update(f"solver={solver or ''};json={bool(salida_json)};"
+             f"minizinc={version_minizinc(ejecutable)}".encode())
+    return h.hexdigest()
+
+
+class CacheCompilacion:
+    """
+    Cache en disco de pares .fzn/.ozn con politica LRU y contadores de
+    aciertos y de tiempo de compilacion
+    """
+
+    def __init__(self, directorio=RUTA_CACHE_FZN, max_entradas=500):
+        self.directorio = directorio
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self.tiempo_compilacion = 0.0
+        os.makedirs(directorio, exist_ok=True)
+        # Pares en el directorio, estimados sin recorrerlo en cada compilacion
+        self.entradas = contar_archivos(directorio, ".fzn")
+
+    # --------------------------------------------------
+    def _rutas(self, clave):
+        base = os.path.join(self.directorio, clave)
+        return base + ".fzn", base + ".ozn"
+
+    # --------------------------------------------------
+    def obtener(self, clave):
+        """Retorna las rutas (fzn, ozn) guardadas con esa llave, o None"""
+        ruta_fzn, ruta_ozn = self._rutas(clave)
+        if not (os.path.exists(ruta_fzn) and os.path.exists(ruta_ozn)):
+            return None
+        try:
+            # Marcar la entrada como usada recientemente
+            os.utime(ruta_fzn)
+        except FileNotFoundError:
+            return None
+        return ruta_fzn, ruta_ozn
+
+    # --------------------------------------------------
+    def compilar(self, ruta_mzn, extras=(), ruta_dzn=None, texto_dzn=None, solver=None,
+                 salida_json=False, ejecutable=None, timeout=None, cancelar=None,
+                 estadisticas=False):
+        """
+        Retorna el modelo aplanado, compilandolo solo si no esta en la cache
+
+        Parametros:
+            los de clave_compilacion, y ademas:
+            ejecutable: ejecutable de MiniZinc (por defecto MINIZINC)
+            timeout: segundos maximos para compilar
+            cancelar: threading.Event opcional para detener la compilacion
+            estadisticas: pedir las estadisticas del aplanado (--statistics)
+
+        Retorna:
+            Diccionario con las llaves fzn, ozn (rutas), acierto (si venia de
+            la cache), tiempo (segundos de compilacion, 0 en un acierto) y
+            estadisticas (las del aplanado, guardadas junto al .fzn para
+            los aciertos; vacio sin estadisticas=True)
+
+        Lanza RuntimeError si MiniZinc no puede compilar el modelo, o si se
+        agota el tiempo o se cancela
+        """
+
+        clave = clave_compilacion(ruta_mzn, extras, ruta_dzn, texto_dzn, solver, salida_json,
+                                  ejecutable)
+        rutas = self.obtener(clave)
+        if rutas is not None:
+            self.aciertos += 1
+            return {'fzn': rutas[0], 'ozn': rutas[1], 'acierto': True, 'tiempo': 0.0,
+                    'estadisticas': self._leer_estadisticas(clave) if estadisticas else {}}
+
+        self.fallos += 1
+        inicio = time.perf_counter()
+        ruta_fzn, ruta_ozn = self._rutas(clave)
+        # Compilar a temporales y renombrar para que ningun lector vea un
+        # archivo a medio escribir
+        fd, temp_fzn = tempfile.mkstemp(dir=self.directorio, suffix=".fzn.tmp")
+        os.close(fd)
+        fd, temp_ozn = tempfile.mkstemp(dir=self.directorio, suffix=".ozn.tmp")
+        os.close(fd)
+        try:
+            comando = [ejecutable or MINIZINC, "-c"]
+            if solver:
+                comando += ["--solver", solver]
+            if salida_json:
+                comando += ["--output-mode", "json"]
+            if estadisticas:
+                comando.append("--statistics")
+            comando += ["--fzn", temp_fzn, "--ozn", temp_ozn, ruta_mzn] + list(extras)
+            with argumentos_datos(ruta_dzn, texto_dzn) as datos:
+                stdout = _ejecutar_compilacion(comando + datos, timeout, cancelar)
+            os.replace(temp_fzn, ruta_fzn)
+            os.replace(temp_ozn, ruta_ozn)
+        finally:
+            for temporal in (temp_fzn, temp_ozn):
+                if os.path.exists(temporal):
+                    os.remove(temporal)
+
+        tiempo = time.perf_counter() - inicio
+        self.tiempo_compilacion += tiempo
+        encontradas = {}
+        if estadisticas:
+            for linea in stdout.splitlines():
+                leer_estadistica(linea, encontradas)
+            with open(self._rutas(clave)[0][:-len(".fzn")] + ".json", 'w') as f:
+                json.dump(encontradas, f)
+        self.entradas += 1
+        if self.entradas > self.max_entradas:
+            self._desalojar()
+        return {'fzn': ruta_fzn, 'ozn': ruta_ozn, 'acierto': False, 'tiempo': tiempo,
+                'estadisticas': encontradas}
+
+    # --------------------------------------------------
+    def _leer_estadisticas(self, clave):
+        """Estadisticas del aplanado guardadas con la entrada, o {} si no hay"""
+        try:
+            with open(self._rutas(clave)[0][:-len(".fzn")] + ".json", 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # --------------------------------------------------
+    def _desalojar(self):
+        """Elimina los pares menos usados hasta dejar la holgura bajo max_entradas"""
+        entradas = entradas_por_uso(self.directorio, ".fzn")
+        sobrantes = max(len(entradas) - limite_desalojo(self.max_entradas), 0)
+        for _, ruta in entradas[:sobrantes]:
+            base = ruta[:-len(".fzn")]
+            for ruta_par in (ruta, base + ".ozn", base + ".json"):
+                try:
+                    os.remove(ruta_par)
+                except FileNotFoundError:
+                    pass
+        self.entradas = len(entradas) - sobrantes
+
+    # --------------------------------------------------
+    def estadisticas(self):
+        """Retorna los aciertos, fallos y segundos de compilacion de esta sesion"""
+        total = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / total if total else 0.0,
+            'tiempo_compilacion': self.tiempo_compilacion
+        }
+
+
+def restringir_fzn(ruta_fzn, restricciones):
+    """
+    Copia un FlatZinc agregando restricciones sobre sus variables de salida
+
+    Parametros:
+        ruta_fzn: FlatZinc aplanado (no se modifica: puede ser el de la cache)
+        restricciones: lista de (nombre, operador, valor) con operador '=' o
+                       '<='; valor es un numero o, si la variable es un
+                       arreglo, la lista de sus valores por filas
+
+    Retorna:
+        Ruta de un .fzn temporal que quien llama debe borrar
+
+    Lanza RuntimeError si alguna variable no es de salida en el FlatZinc o
+    si un arreglo no tiene tantos elementos como valores
+    """
+
+    with open(ruta_fzn, 'r') as f:
+        lineas = f.read().splitlines()
+
+    # nombre -> (es flotante, lista de elementos o None para un escalar)
+    declaradas = {}
+    for linea in lineas:
+        encontrada = ARREGLO_SALIDA.match(linea)
+        if encontrada:
+            dominio, nombre, elementos = encontrada.groups()
+            declaradas[nombre] = (_dominio_flotante(dominio),
+                                  [e.strip() for e in elementos.split(",") if e.strip()])
+            continue
+        encontrada = VAR_SALIDA.match(linea)
+        if encontrada:
+            dominio, nombre = encontrada.groups()
+            declaradas[nombre] = (_dominio_flotante(dominio), None)
+
+    nuevas = []
+    for nombre, operador, valor in restricciones:
+        if nombre not in declaradas:
+            raise RuntimeError(f"{nombre} no es una variable de salida del FlatZinc")
+        flotante, elementos = declaradas[nombre]
+        if elementos is None:
+            nuevas.append(_restriccion_fzn(nombre, flotante, operador, valor))
+            continue
+        if len(elementos) != len(valor):
+            raise RuntimeError(f"{nombre} tiene {len(elementos)} elementos en el FlatZinc "
+                               f"y {len(valor)} valores")
+        for elemento, dato in zip(elementos, valor):
+            nuevas.append(_restriccion_fzn(elemento, flotante, operador, dato))
+
+    # Las restricciones van antes del solve, que cierra el FlatZinc
+    inicio_solve = next((i for i, linea in enumerate(lineas) if linea.startswith("solve")),
+                        len(lineas))
+    fd, ruta = tempfile.mkstemp(prefix="minpol_", suffix=".fzn")
+    with os.fdopen(fd, 'w') as f:
+        f.write("\n".join(lineas[:inicio_solve] + nuevas + lineas[inicio_solve:]) + "\n")
+    return ruta
+
+
+def _dominio_flotante(dominio):
+    """Si el dominio de una variable del FlatZinc es de flotantes"""
+    return "float" in dominio or re.search(r"\d\.\d", dominio) is not None
+
+
+def _restriccion_fzn(variable, flotante, operador, valor):
+    """Restriccion FlatZinc variable = valor o variable <= valor"""
+    sufijo = "eq" if operador == '=' else "le"
+    if flotante:
+        return f"constraint float_{sufijo}({variable}, {float(valor):.17e});"
+    entero = int(valor) if operador == '=' else math.floor(valor)
+    return f"constraint int_{sufijo}({variable}, {entero});"
+
+
+def _ejecutar_compilacion(comando, timeout, cancelar):
+    """Ejecuta minizinc -c atendiendo el tiempo maximo y la cancelacion"""
+    proceso = subprocess.Popen(
+        comando,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=(os.name == 'posix')
+    )
+    limite = time.perf_counter() + timeout if timeout is not None else None
+    while True:
+        try:
+            stdout, stderr = proceso.communicate(timeout=0.05)
+            break
+        except subprocess.TimeoutExpired:
+            if cancelar is not None and cancelar.is_set():
+                motivo = "Compilacion cancelada"
+            elif limite is not None and time.perf_counter() > limite:
+                motivo = "Tiempo de compilacion excedido"
+            else:
+                continue
+            terminar_proceso(proceso)
+            proceso.communicate()
+            raise RuntimeError(motivo)
+
+    if proceso.returncode != 0:
+        raise RuntimeError(stderr.strip() or "MiniZinc no pudo compilar el modelo")
+    return stdout
@@ -0,0 +1,374 @@
+"""
+Cotas por posicion de la mediana y poda antes de la busqueda exacta
+
+Con la mediana fija en q, la polarizacion de un plan es la polarizacion
+inicial menos la ganancia de cada persona que se mueve (d[i] - d[j], con
+d = |v - v[q]|). Relajando el subproblema a un programa lineal sobre esas
+ganancias se obtiene, para las m posiciones a la vez y con NumPy, una cota
+inferior de total_polarization:
+- cada persona que puede moverse desde i gana a lo sumo d[i]
+- cada unidad de ganancia cuesta al menos RES_COST[k] del presupuesto ct
+- cada movimiento gana a lo sumo la mayor pendiente (v[j] - v[i]) / (j - i)
+  entre i y q (solo si v es creciente; si no, la cota usa solo ct)
+- si la mediana exige cruzar personas hacia q, los movimientos minimos
+  para hacerlo deben caber en maxMovs (si no, la posicion es infactible)
+La ganancia maxima del programa lineal se acota por dualidad lagrangiana
+(relajando ct con un multiplicador mu que se busca por seccion aurea).
+
+resolver_acotado calcula primero todas las cotas, descarta las posiciones
+cuya cota no mejora la mejor solucion conocida y solo pasa las restantes,
+de menor a mayor cota, al subproblema exacto de solver_nativo. Despues de
+cada paso reporta la cota inferior global y el gap, asi que se puede
+detener en cuanto el gap sea aceptable.
+"""
+
+import math
+import time
+
+import numpy as np
+
+from solver_nativo import (RES_COST, EPS, Limite, validar_datos, mediana_inicial,
+                           _resolver_mediana, _solucion_inicial, polarizacion_de,
+                           distribucion_final)
+
+
+# Posiciones de la mediana que se procesan juntas (limita la memoria a
+# BLOQUE * 3m valores; m no pasa de 1001 porque v tiene 3 decimales)
+BLOQUE = 256
+
+# Iteraciones de la seccion aurea sobre el multiplicador de ct
+ITERACIONES_MU = 6
+
+
+def _pendientes(v):
+    """
+    Ganancia maxima por movimiento de cada opinion i con la mediana en q:
+    la mayor pendiente |v[j] - v[i]| / |j - i| con j entre i y q (moverse
+    mas alla de q gana menos por movimiento)
+
+    Retorna:
+        Arreglo (m, m) R con R[q, i] (0 en la diagonal); None si v no es
+        creciente, porque entonces la cota no aplica
+    """
+
+    m = len(v)
+    if np.any(np.diff(v) < 0):
+        return None
+    indices = np.arange(m)
+    despues = indices[None, :] > indices[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pendiente = np.where(despues, (v[None, :] - v[:, None]) / (indices[None, :] - indices[:, None]),
+                             -np.inf)
+    # izquierda[i, q] = max(pendiente[i, j], i < j <= q), para i < q
+    izquierda = np.maximum.accumulate(pendiente, axis=1)
+    # derecha[q, i] = max(pendiente[j, i], q <= j < i), para i > q
+    derecha = np.maximum.accumulate(pendiente[::-1], axis=0)[::-1]
+    return np.where(despues.T, izquierda.T, np.where(despues, derecha, 0.0))
+
+
+def _movs_cruce(movibles, exceso, q):
+    """
+    Movimientos minimos para llevar exceso personas de las opiniones
+    anteriores a q hasta q (las mas cercanas primero), para todas las q
+
+    Parametros:
+        movibles: personas que pueden moverse en cada opinion (m,)
+        exceso: personas que deben cruzar para cada q (m,), <= 0 si ninguna
+        q: arreglo de posiciones (m,)
+
+    Retorna:
+        Arreglo (m,) con los movimientos (inf si no hay suficientes personas)
+    """
+
+    indices = np.arange(len(movibles), dtype=float)
+    # prefijo[t] = personas en las opiniones 0..t-1 y ponderado con su indice
+    prefijo = np.concatenate(([0], np.cumsum(movibles)))
+    ponderado = np.concatenate(([0.0], np.cumsum(movibles * indices)))
+    exceso = np.maximum(exceso, 0)
+    disponibles = prefijo[q]
+
+    # t: opinion mas lejana que aporta personas (solo en parte)
+    t = np.searchsorted(prefijo, disponibles - exceso, side='right') - 1
+    t = np.clip(t, 0, None)
+    siguiente = np.minimum(t + 1, q)
+    completas = disponibles - prefijo[siguiente]
+    movs = (q * completas - (ponderado[q] - ponderado[siguiente]) +
+            (exceso - completas) * (q - t))
+    movs = np.where(exceso > 0, movs, 0.0)
+    return np.where(exceso > disponibles, np.inf, movs)
+
+
+def _ganancia_movs(ganancia, por_mov, max_movs):
+    """
+    Mochila fraccionaria sobre maxMovs, fila por fila
+
+    Parametros:
+        ganancia: ganancia maxima de cada item (b, r)
+        por_mov: ganancia por movimiento de cada item (b, r); si viene
+                 formada por tramos ya ordenados de mayor a menor, el
+                 ordenamiento estable solo tiene que mezclarlos
+        max_movs: movimientos disponibles
+
+    Retorna:
+        Arreglo (b,) con la mayor ganancia alcanzable
+    """
+
+    orden = np.argsort(-por_mov, axis=1, kind='stable')
+    ganancia = np.take_along_axis(ganancia, orden, axis=1)
+    por_mov = np.take_along_axis(por_mov, orden, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        movs = np.where(ganancia > 0, ganancia / por_mov, 0.0)
+    previos = np.cumsum(movs, axis=1) - movs
+    parcial = np.where(previos < max_movs, (max_movs - previos) * por_mov, 0.0)
+    return np.minimum(ganancia, parcial).sum(axis=1)
+
+
+def cotas_medianas(datos, bloque=BLOQUE, iteraciones=ITERACIONES_MU):
+    """
+    Calcula la cota inferior de total_polarization para cada posicion de
+    la mediana (relajacion lineal del subproblema, ver el encabezado)
+
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        bloque: posiciones que se procesan juntas
+        iteraciones: pasos de la busqueda del multiplicador de ct
+
+    Retorna:
+        Arreglo (m,) con las cotas; math.inf en las posiciones donde la
+        mediana no se puede alcanzar con maxMovs movimientos y 0.0 donde
+        la relajacion no da un valor finito
+    """
+
+    n = datos['n']
+    m = datos['m']
+    ct = max(float(datos['ct']), 0.0)
+    max_movs = float(math.floor(datos['maxMovs'] + EPS))
+    if max_movs < 0 or datos['ct'] < -EPS:
+        return np.full(m, np.inf)
+
+    p = np.asarray(datos['p'], dtype=float)
+    v = np.asarray(datos['v'], dtype=float)
+    s = np.asarray(datos['s'], dtype=float)
+    costo = np.asarray(RES_COST)
+    movibles = s.sum(axis=1)
+    q = np.arange(m)
+
+    # Personas que deben cruzar hacia la mediana desde cada lado y
+    # movimientos minimos para hacerlo (el lado derecho es el izquierdo
+    # con el orden de las opiniones invertido)
+    exceso_izq = np.concatenate(([0.0], np.cumsum(p)[:-1])) - (math.ceil(n / 2) - 1)
+    exceso_der = (p.sum() - np.cumsum(p)) - n // 2
+    cruce = (_movs_cruce(movibles, exceso_izq, q) +
+             _movs_cruce(movibles[::-1], exceso_der[::-1], q)[::-1])
+
+    pendientes = _pendientes(v)
+    cotas = np.empty(m)
+    for inicio in range(0, m, bloque):
+        bloque_q = q[inicio:inicio + bloque]
+        filas = len(bloque_q)
+        d = np.abs(v[None, :] - v[bloque_q, None])
+        base = d @ p
+
+        # Solo con ct: cubrir primero la ganancia mas barata
+        por_nivel = d @ s
+        previo = np.cumsum(por_nivel * costo, axis=1) - por_nivel * costo
+        solo_ct = np.minimum(por_nivel, np.maximum(ct - previo, 0.0) / costo).sum(axis=1)
+        if pendientes is None:
+            cotas[bloque_q] = np.maximum(base - solo_ct, 0.0)
+            continue
+
+        # Items (k, i) con ganancia maxima s[i, k] * d[i], ordenados en cada
+        # nivel k por ganancia por movimiento (el orden no cambia con mu)
+        orden = np.argsort(-pendientes[bloque_q], axis=1)
+        por_mov = np.take_along_axis(pendientes[bloque_q], orden, axis=1)
+        ganancia = np.take_along_axis(d, orden, axis=1)[:, None, :] * s[orden].transpose(0, 2, 1)
+
+        # Relajando ct con mu: mu * ct + mochila de maxMovs con ganancias
+        # escaladas por (1 - mu * costo); es convexa en mu
+        def dual(mu):
+            escala = np.maximum(1.0 - mu[:, None] * costo[None, :], 0.0)[:, :, None]
+            return mu * ct + _ganancia_movs((ganancia * escala).reshape(filas, 3 * m),
+                                            (por_mov[:, None, :] * escala).reshape(filas, 3 * m),
+                                            max_movs)
+
+        mejor = np.minimum(solo_ct, dual(np.zeros(filas)))
+        a = np.zeros(filas)
+        b = np.full(filas, 1.0 / costo.min())
+        razon = (math.sqrt(5) - 1) / 2
+        for _ in range(iteraciones):
+            mu1 = b - razon * (b - a)
+            mu2 = a + razon * (b - a)
+            g1, g2 = dual(mu1), dual(mu2)
+            mejor = np.minimum(mejor, np.minimum(g1, g2))
+            menor = g1 <= g2
+            b = np.where(menor, mu2, b)
+            a = np.where(menor, a, mu1)
+
+        cotas[bloque_q] = np.maximum(base - mejor, 0.0)
+
+    # Una cota NaN o infinita no debe podar ninguna posicion
+    cotas[~np.isfinite(cotas)] = 0.0
+    cotas[cruce > max_movs + EPS] = np.inf
+    return cotas
+
+
+def resolver_acotado(datos, inicial=None, gap=0.0, cotas=None, al_progreso=None,
+                     tiempo_max=None, cancelar=None):
+    """
+    Resuelve una instancia con poda por cotas antes de la busqueda exacta
+
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        inicial: resultado factible opcional (por ejemplo, el de
+                 heuristica.resolver_heuristico) que sirve de cota superior
+        gap: gap relativo aceptable; con 0 se resuelve hasta el optimo y
+             con un valor mayor se detiene cuando
+             (superior - inferior) / superior <= gap
+        cotas: cotas por posicion ya calculadas con cotas_medianas
+        al_progreso: funcion opcional que recibe un diccionario con
+                     tiempo, inferior, superior, gap, pendientes y podadas
+                     despues de cada posicion resuelta; si retorna True la
+                     busqueda se detiene con la mejor solucion conocida
+        tiempo_max: segundos maximos de busqueda (None para no limitar)
+        cancelar: threading.Event opcional; se consulta tambien dentro del
+                  subproblema exacto, asi que detiene la busqueda aunque
+                  una posicion tarde minutos
+
+    Retorna:
+        Diccionario con las llaves de solver_nativo.resolver_nativo
+        (estado 'OPTIMO', 'SOLUCION' si se detuvo por el gap, el tiempo o
+        una cancelacion, 'INSATISFACIBLE', o 'TIMEOUT' / 'CANCELADO' si se
+        detuvo antes de tener una solucion) mas:
+        - interrupcion: 'TIMEOUT' o 'CANCELADO' si la busqueda se corto
+          (None si termino o se detuvo por el gap)
+        - gap: gap final (0.0 si es optimo)
+        - cota_inferior: cota inferior global final
+        - podadas: posiciones descartadas sin resolver
+        - resueltas: posiciones que paso por el subproblema exacto
+        - cotas_finales: cota inferior de cada posicion al terminar (su
+          optimo si se resolvio); siguen valiendo si despues solo se
+          reducen ct o maxMovs
+        - tiempo_cotas: segundos calculando las cotas
+        - traza: lista de tuplas (segundos, inferior, superior)
+    """
+
+    inicio = time.perf_counter()
+    validar_datos(datos)
+    m = datos['m']
+    limite = Limite(tiempo_max, cancelar)
+
+    if cotas is None:
+        cotas = cotas_medianas(datos)
+    tiempo_cotas = time.perf_counter() - inicio
+
+    # El plan vacio con la mediana inicial es factible y da la primera cota
+    mejor = _solucion_inicial(inicial)
+    q0 = mediana_inicial(datos)
+    if q0 is not None:
+        vacio = [[[0] * m for _ in range(m)] for _ in range(3)]
+        pol_vacio = polarizacion_de(datos, vacio, q0)
+        if mejor is None or pol_vacio < mejor[0]:
+            mejor = (pol_vacio, vacio, q0)
+
+    pendientes = sorted((q for q in range(m) if cotas[q] < math.inf), key=lambda q: cotas[q])
+    podadas = m - len(pendientes)
+    resueltas = 0
+    finales = [float(cota) for cota in cotas]
+    traza = []
+
+    def progreso():
+        # Las posiciones ya resueltas no bajan de la mejor solucion, asi que
+        # la cota global es la menor entre esta y las cotas pendientes
+        superior = mejor[0] if mejor else math.inf
+        inferior = min([superior] + [float(cotas[q]) for q in pendientes])
+        actual = (superior - inferior) / superior if superior > EPS else 0.0
+        traza.append((time.perf_counter() - inicio, inferior, superior))
+        if al_progreso is not None and al_progreso({'tiempo': traza[-1][0], 'inferior': inferior,
+                                                    'superior': superior, 'gap': actual,
+                                                    'pendientes': len(pendientes),
+                                                    'podadas': podadas}):
+            limite.motivo = 'CANCELADO'
+        return inferior, actual
+
+    while True:
+        # Descartar las posiciones cuya cota ya no mejora la mejor solucion
+        if mejor is not None:
+            sobrevivientes = [q for q in pendientes if cotas[q] < mejor[0] - EPS]
+            podadas += len(pendientes) - len(sobrevivientes)
+            pendientes = sobrevivientes
+        inferior, actual = progreso()
+        if not pendientes or limite.agotado() or (mejor is not None and actual <= gap):
+            break
+
+        q = pendientes[0]
+        corte = mejor[0] if mejor else math.inf
+        sol = _resolver_mediana(datos, q, corte, detener=limite.agotado)
+        if sol is not None and (mejor is None or sol[0] < mejor[0] - EPS):
+            mejor = (sol[0], sol[1], q)
+        if limite.motivo is not None:
+            # La posicion q no se termino: sigue pendiente con su cota
+            inferior, actual = progreso()
+            break
+        pendientes.pop(0)
+        resueltas += 1
+        # Sin plan, el optimo de q no mejora el corte
+        finales[q] = sol[0] if sol is not None else max(finales[q], corte)
+
+    tiempo = time.perf_counter() - inicio
+    # Una interrupcion despues de la ultima posicion no cambia el resultado
+    motivo = limite.motivo if pendientes else None
+    if mejor is None:
+        return {'estado': motivo or 'INSATISFACIBLE', 'interrupcion': motivo,
+                'tiempo': tiempo, 'gap': None,
+                'cota_inferior': None, 'podadas': podadas, 'resueltas': resueltas,
+                'cotas_finales': finales, 'tiempo_cotas': tiempo_cotas, 'traza': traza}
+
+    polarizacion, x, q = mejor
+    optimo = not pendientes
+    return {
+        'estado': 'OPTIMO' if optimo else 'SOLUCION',
+        'interrupcion': motivo,
+        'polarizacion': polarizacion,
+        'med_pos': q + 1,
+        'p_prime': distribucion_final(datos, x),
+        'x': x,
+        'tiempo': tiempo,
+        'gap': 0.0 if optimo else actual,
+        'cota_inferior': polarizacion if optimo else inferior,
+        'podadas': podadas,
+        'resueltas': resueltas,
+        'cotas_finales': finales,
+        'tiempo_cotas': tiempo_cotas,
+        'traza': traza
+    }
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import argparse
+    from parser import leer_txt
+    from heuristica import resolver_heuristico
+    from solver_nativo import formatear_salida
+
+    argumentos = argparse.ArgumentParser(
+        description="Resuelve una instancia MinPol podando posiciones de la mediana por cotas")
+    argumentos.add_argument("entrada", help="archivo .txt de la instancia")
+    argumentos.add_argument("--gap", type=float, default=0.0,
+                            help="detenerse con este gap relativo (0.05 = 5%%)")
+    args = argumentos.parse_args()
+
+    datos = leer_txt(args.entrada)
+    cotas = cotas_medianas(datos)
+    factibles = int(np.isfinite(cotas).sum())
+    print(f"Cotas: {factibles} de {datos['m']} posiciones factibles, "
+          f"cota global {cotas.min():.3f}")
+
+    def mostrar(progreso):
+        print(f"[{progreso['tiempo']:.2f}s] inferior {progreso['inferior']:.3f}  "
+              f"superior {progreso['superior']:.3f}  gap {progreso['gap']:.2%}  "
+              f"pendientes {progreso['pendientes']}  podadas {progreso['podadas']}")
+
+    resultado = resolver_acotado(datos, inicial=resolver_heuristico(datos), gap=args.gap,
+                                 cotas=cotas, al_progreso=mostrar)
+    print(formatear_salida(resultado), end="")
+    print(f"Estado: {resultado['estado']}  Tiempo: {resultado['tiempo']:.4f}s")
@@ -0,0 +1,328 @@
+"""
+Editor virtualizado de la matriz de resistencias para la GUI
+
+Los valores viven en un array plano de 3 * m enteros (ModeloResistencias)
+y la grilla (GrillaResistencias) dibuja en un Canvas solo las filas
+visibles; para editar una celda se coloca un unico Entry encima de ella.
+Asi la ventana se construye igual de rapido con 5 o con 5000 opiniones.
+
+Tambien se pueden pegar o importar desde CSV tablas con una fila por
+opinion: 3 columnas (baja, media, alta) o 5 columnas (p, v, baja, media,
+alta). Se aceptan como separadores comas, punto y coma, tabuladores o
+espacios, y una primera fila de encabezados. leer_tabla revisa la tabla
+completa en una sola pasada y reporta todos los errores juntos.
+"""
+
+import re
+import tkinter as tk
+from array import array
+from tkinter import ttk
+
+
+# Niveles de resistencia (columnas de la matriz)
+NIVELES = ('Baja', 'Media', 'Alta')
+
+# Maximo de errores que se listan en el mensaje de leer_tabla
+MAX_ERRORES = 10
+
+_SEPARADORES = re.compile(r"[,;\t ]+")
+
+
+def _es_numero(texto):
+    try:
+        float(texto)
+        return True
+    except ValueError:
+        return False
+
+
+class ModeloResistencias:
+    """Matriz m x 3 de resistencias guardada en un array plano de enteros"""
+
+    def __init__(self, m=0):
+        self.valores = array('q', bytes(8 * 3 * m))
+
+    @property
+    def m(self):
+        """Numero de opiniones (filas)"""
+        return len(self.valores) // 3
+
+    def redimensionar(self, m):
+        """Cambia el numero de filas conservando las existentes (las nuevas en 0)"""
+        actual = len(self.valores)
+        if 3 * m < actual:
+            del self.valores[3 * m:]
+        else:
+            self.valores.extend(array('q', bytes(8 * (3 * m - actual))))
+
+    def obtener(self, i, k):
+        """Valor de la opinion i y el nivel k (base 0)"""
+        return self.valores[3 * i + k]
+
+    def asignar(self, i, k, valor):
+        """Asigna el valor de la opinion i y el nivel k (base 0)"""
+        self.valores[3 * i + k] = valor
+
+    def cargar(self, filas):
+        """Reemplaza toda la matriz por una lista de filas de 3 enteros"""
+        self.valores = array('q', (valor for fila in filas for valor in fila))
+
+    def filas(self):
+        """Retorna la matriz como lista de filas [baja, media, alta]"""
+        v = self.valores
+        return [[v[t], v[t + 1], v[t + 2]] for t in range(0, len(v), 3)]
+
+
+def leer_tabla(texto):
+    """
+    Lee una tabla pegada o importada con una fila por opinion
+
+    Parametros:
+        texto: filas de 3 columnas (baja, media, alta) o de 5 columnas
+               (p, v, baja, media, alta); la primera fila puede ser de
+               encabezados
+
+    Retorna:
+        Tupla (p, v, s) con p y v en None si la tabla tiene 3 columnas
+
+    Lanza ValueError con todos los errores encontrados (hasta MAX_ERRORES)
+    """
+
+    filas = [(numero, _SEPARADORES.split(linea.strip()))
+             for numero, linea in enumerate(texto.splitlines(), 1) if linea.strip()]
+    if filas and not _es_numero(filas[0][1][0]):
+        filas = filas[1:]  # encabezados
+    if not filas:
+        raise ValueError("La tabla no tiene filas")
+
+    columnas = len(filas[0][1])
+    if columnas not in (3, 5):
+        raise ValueError("La tabla debe tener 3 columnas (baja, media, alta) "
+                         "o 5 columnas (p, v, baja, media, alta)")
+
+    p, v, s, errores = [], [], [], []
+    for numero, celdas in filas:
+        if len(celdas) != columnas:
+            errores.append(f"Linea {numero}: tiene {len(celdas)} columnas en lugar de {columnas}")
+            continue
+        try:
+            resistencias = [int(x) for x in celdas[-3:]]
+            if columnas == 5:
+                personas, valor = int(celdas[0]), float(celdas[1])
+        except ValueError:
+            errores.append(f"Linea {numero}: valores no numericos")
+            continue
+        if min(resistencias) < 0:
+            errores.append(f"Linea {numero}: las resistencias no pueden ser negativas")
+        if columnas == 5:
+            if personas != sum(resistencias):
+                errores.append(f"Linea {numero}: p = {personas} no coincide con la suma de "
+                               f"las resistencias ({sum(resistencias)})")
+            p.append(personas)
+            v.append(valor)
+        s.append(resistencias)
+
+    if errores:
+        extra = len(errores) - MAX_ERRORES
+        mensaje = "\n".join(errores[:MAX_ERRORES])
+        if extra > 0:
+            mensaje += f"\n... y {extra} errores mas"
+        raise ValueError(mensaje)
+    if columnas == 3:
+        return None, None, s
+    return p, v, s
+
+
+def validar_columnas(n, p, v, s):
+    """
+    Revisa en una sola pasada que p, v y s sean consistentes con n
+
+    Retorna:
+        Lista de mensajes de error (vacia si todo es correcto)
+    """
+
+    errores = []
+    m = len(s)
+    if len(p) != m or len(v) != m:
+        errores.append(f"p y v deben tener {m} valores (uno por fila de resistencias)")
+    if sum(p) != n:
+        errores.append(f"La suma de p ({sum(p)}) no coincide con n = {n}")
+    for i, (personas, fila) in enumerate(zip(p, s), 1):
+        if min(fila) < 0 or sum(fila) != personas:
+            errores.append(f"Opinion {i}: las resistencias deben ser >= 0 y sumar p = {personas}")
+            if len(errores) >= MAX_ERRORES:
+                break
+    return errores
+
+
+class GrillaResistencias(tk.Frame):
+    """
+    Grilla virtualizada sobre un ModeloResistencias: solo dibuja las filas
+    visibles y edita una celda a la vez con un Entry superpuesto
+    """
+
+    ALTO_FILA = 24
+    ANCHO_ETIQUETA = 70
+    ANCHO_CELDA = 70
+
+    def __init__(self, parent, modelo, colores, **opciones):
+        super().__init__(parent, bg='white', **opciones)
+        self.modelo = modelo
+        self.colores = colores
+        self.primera = 0
+        self.editor = None
+
+        self.canvas = tk.Canvas(self, bg='white', highlightthickness=0,
+                                width=self.ANCHO_ETIQUETA + 3 * self.ANCHO_CELDA + 10)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._desplazar)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.redibujar())
+        self.canvas.bind("<Button-1>", self._editar_en)
+        self.canvas.bind("<MouseWheel>", lambda e: self._mover(-1 if e.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda e: self._mover(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._mover(1))
+
+    # --------------------------------------------------
+    def _visibles(self):
+        """Numero de filas que caben en el canvas (sin el encabezado)"""
+        return max(1, self.canvas.winfo_height() // self.ALTO_FILA - 1)
+
+    # --------------------------------------------------
+    def redibujar(self):
+        """Dibuja el encabezado y las filas visibles"""
+        # El editor quedaria fuera de lugar: se guarda (o se descarta si
+        # el valor no es valido)
+        if not self._cerrar_editor(guardar=True):
+            self._cerrar_editor(guardar=False)
+        self.canvas.delete("all")
+        m = self.modelo.m
+        visibles = self._visibles()
+        self.primera = max(0, min(self.primera, m - visibles))
+
+        alto = self.ALTO_FILA
+        for k, nivel in enumerate(NIVELES):
+            x = self.ANCHO_ETIQUETA + k * self.ANCHO_CELDA
+            self.canvas.create_rectangle(x + 2, 2, x + self.ANCHO_CELDA - 2, alto - 2,
+                                         fill=self.colores['bg_light'], outline="")
+            self.canvas.create_text(x + self.ANCHO_CELDA // 2, alto // 2, text=nivel,
+                                    font=('Segoe UI', 9, 'bold'), fill=self.colores['text_dark'])
+
+        for fila in range(visibles):
+            i = self.primera + fila
+            if i >= m:
+                break
+            y = (fila + 1) * alto
+            self.canvas.create_text(self.ANCHO_ETIQUETA // 2, y + alto // 2, text=f"Op {i + 1}",
+                                    font=('Segoe UI', 9, 'bold'), fill=self.colores['text_dark'])
+            for k in range(3):
+                x = self.ANCHO_ETIQUETA + k * self.ANCHO_CELDA
+                self.canvas.create_rectangle(x + 2, y + 2, x + self.ANCHO_CELDA - 2, y + alto - 2,
+                                             outline=self.colores['border'])
+                self.canvas.create_text(x + self.ANCHO_CELDA // 2, y + alto // 2,
+                                        text=str(self.modelo.obtener(i, k)), font=('Segoe UI', 9))
+
+        if m:
+            self.scrollbar.set(self.primera / m, min(1.0, (self.primera + visibles) / m))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # --------------------------------------------------
+    def _desplazar(self, accion, cantidad, unidad=None):
+        """Atiende los comandos de la barra de desplazamiento"""
+        if accion == 'moveto':
+            self.primera = int(float(cantidad) * self.modelo.m)
+            self.redibujar()
+        else:
+            paso = self._visibles() if unidad == 'pages' else 1
+            self._mover(int(cantidad) * paso)
+
+    # --------------------------------------------------
+    def _mover(self, filas):
+        """Desplaza la vista filas posiciones"""
+        self.primera += filas
+        self.redibujar()
+
+    # --------------------------------------------------
+    def _celda_en(self, x, y):
+        """Retorna (i, k) de la celda en la posicion del canvas, o None"""
+        fila = y // self.ALTO_FILA - 1
+        k = (x - self.ANCHO_ETIQUETA) // self.ANCHO_CELDA
+        i = self.primera + fila
+        if fila < 0 or not 0 <= k < 3 or i >= self.modelo.m:
+            return None
+        return i, k
+
+    # --------------------------------------------------
+    def _editar_en(self, evento):
+        celda = self._celda_en(evento.x, evento.y)
+        if celda is not None:
+            self.editar(*celda)
+
+    # --------------------------------------------------
+    def editar(self, i, k):
+        """Abre el editor sobre la celda (i, k), desplazando la vista si hace falta"""
+        if not self._cerrar_editor(guardar=True):
+            return
+        visibles = self._visibles()
+        if not self.primera <= i < self.primera + visibles:
+            self.primera = i if i < self.primera else i - visibles + 1
+        self.redibujar()
+
+        x = self.ANCHO_ETIQUETA + k * self.ANCHO_CELDA
+        y = (i - self.primera + 1) * self.ALTO_FILA
+        entrada = tk.Entry(self.canvas, font=('Segoe UI', 9), justify='center',
+                           relief='solid', borderwidth=1)
+        entrada.insert(0, str(self.modelo.obtener(i, k)))
+        entrada.select_range(0, tk.END)
+        self.canvas.create_window(x + 2, y + 2, window=entrada, anchor='nw',
+                                  width=self.ANCHO_CELDA - 4, height=self.ALTO_FILA - 4)
+        entrada.focus_set()
+        self.editor = (entrada, i, k)
+
+        entrada.bind("<Return>", lambda e: self._siguiente(i + 1, k))
+        entrada.bind("<Down>", lambda e: self._siguiente(i + 1, k))
+        entrada.bind("<Up>", lambda e: self._siguiente(i - 1, k))
+        entrada.bind("<Left>", lambda e: self._siguiente(i, k - 1))
+        entrada.bind("<Right>", lambda e: self._siguiente(i, k + 1))
+        entrada.bind("<Tab>", lambda e: self._siguiente(i + (k + 1) // 3, (k + 1) % 3))
+        entrada.bind("<Escape>", lambda e: self._cerrar_editor(guardar=False) and self.redibujar())
+        entrada.bind("<FocusOut>", lambda e: self._cerrar_editor(guardar=True) and self.redibujar())
+
+    # --------------------------------------------------
+    def _siguiente(self, i, k):
+        """Guarda la celda actual y pasa a la celda (i, k) si existe"""
+        if self._cerrar_editor(guardar=True):
+            if 0 <= i < self.modelo.m and 0 <= k < 3:
+                self.editar(i, k)
+            else:
+                self.redibujar()
+        return "break"
+
+    # --------------------------------------------------
+    def _cerrar_editor(self, guardar):
+        """
+        Cierra el editor (sin redibujar); con guardar, escribe el valor en
+        el modelo
+
+        Retorna:
+            False si el valor no es un entero >= 0 (el editor sigue abierto)
+        """
+
+        if self.editor is None:
+            return True
+        entrada, i, k = self.editor
+        if guardar:
+            try:
+                valor = int(entrada.get())
+                if valor < 0:
+                    raise ValueError
+            except ValueError:
+                entrada.config(bg='#FFCDD2')
+                self.bell()
+                return False
+            self.modelo.asignar(i, k, valor)
+        self.editor = None
+        entrada.destroy()
+        return True
@@ -0,0 +1,114 @@
+"""
+Conversion de instancias MinPol a punto fijo para ProyectoEntero.mzn
+
+Proyecto.mzn usa flotantes para v, ct, maxMovs y la polarizacion, lo que
+deja fuera a los solvers enteros (Chuffed, Gecode, ...). Aqui se elige la
+menor escala 10^d que vuelve enteros todos los valores de v (las
+instancias traen hasta 3 decimales, la misma precision de la salida
+round(total_polarization * 1000)) y se escalan los demas datos de forma
+que el modelo entero tenga exactamente los mismos planes factibles:
+- el costo de un plan multiplicado por escala * 2 es entero, asi que
+  costo <= ct equivale a costo_esc <= floor(ct * escala * 2)
+- los movimientos son enteros, asi que movs <= maxMovs equivale a
+  movs <= floor(maxMovs)
+- la polarizacion escalada es la original multiplicada por escala
+Si algun valor de v tiene mas decimales de los admitidos se lanza
+ValueError en lugar de redondear, y tambien si algun valor escalado no
+cabe en un entero de 32 bits (Gecode y Chuffed no lo pueden representar);
+en ambos casos hay que usar Proyecto.mzn.
+"""
+
+import math
+
+from solver_nativo import EPS
+
+
+# Maximo de decimales admitidos en v
+MAX_DECIMALES = 9
+
+# res_cost = [1.0, 1.5, 2.0] multiplicado por 2
+RES_COST_ESC = [2, 3, 4]
+
+# Mayor entero que representan los solvers de 32 bits
+MAX_ENTERO = 2 ** 31 - 1
+
+
+def escala_decimal(valores, max_decimales=MAX_DECIMALES):
+    """
+    Retorna la menor potencia de 10 que vuelve enteros todos los valores
+
+    Lanza ValueError si ninguna escala hasta 10^max_decimales lo logra
+    """
+
+    for decimales in range(max_decimales + 1):
+        escala = 10 ** decimales
+        if all(abs(x * escala - round(x * escala)) < 1e-6 for x in valores):
+            return escala
+    raise ValueError(f"Los valores de v tienen mas de {max_decimales} decimales")
+
+
+def datos_enteros(datos):
+    """
+    Convierte una instancia a los datos de ProyectoEntero.mzn
+
+    Retorna:
+        Diccionario con n, m, p, s y las llaves escaladas v_esc, escala,
+        ct_esc y maxMovs_esc
+
+    Lanza ValueError si v no se puede escalar o si ct_esc, la polarizacion
+    o el costo de un plan escalados pueden llegar a MAX_ENTERO
+    """
+
+    escala = escala_decimal(datos['v'])
+    ct_esc = int(math.floor(datos['ct'] * escala * 2 + EPS))
+    rango = (max(datos['v']) - min(datos['v'])) * escala
+    # El costo escalado de mover a las n personas de un extremo al otro
+    # acota tanto la polarizacion como el costo de cualquier plan
+    mayor = max(ct_esc, datos['n'] * rango * max(RES_COST_ESC))
+    if mayor >= MAX_ENTERO:
+        raise ValueError(f"Con escala {escala} los valores escalados llegan a {mayor:.0f}, "
+                         f"fuera del rango de 32 bits")
+    return {
+        'n': datos['n'],
+        'm': datos['m'],
+        'p': datos['p'],
+        's': datos['s'],
+        'v_esc': [int(round(x * escala)) for x in datos['v']],
+        'escala': escala,
+        'ct_esc': ct_esc,
+        'maxMovs_esc': int(math.floor(datos['maxMovs'] + EPS))
+    }
+
+
+def dzn_entero(datos):
+    """Genera el contenido .dzn de una instancia para ProyectoEntero.mzn"""
+    enteros = datos_enteros(datos)
+    m = enteros['m']
+    flat_resistencias = [val for fila in enteros['s'] for val in fila]
+    return (f"n = {enteros['n']};\n"
+            f"m = {m};\n"
+            f"p = {enteros['p']};\n"
+            f"v_esc = {enteros['v_esc']};\n"
+            f"s = array2d(1..{m}, 1..3, {flat_resistencias});\n"
+            f"escala = {enteros['escala']};\n"
+            f"ct_esc = {enteros['ct_esc']};\n"
+            f"maxMovs_esc = {enteros['maxMovs_esc']};\n")
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import sys
+    from parser import leer_txt
+
+    if len(sys.argv) != 3:
+        print("Uso:")
+        print("  python escalado.py input.txt output.dzn")
+        sys.exit(1)
+
+    datos = leer_txt(sys.argv[1])
+    enteros = datos_enteros(datos)
+    with open(sys.argv[2], 'w') as f:
+        f.write(dzn_entero(datos))
+    print(f"Escala de v: {enteros['escala']} (ct_esc = {enteros['ct_esc']}, "
+          f"maxMovs_esc = {enteros['maxMovs_esc']})")
+    print(f"Datos enteros guardados en {sys.argv[2]} (modelo ProyectoEntero.mzn)")
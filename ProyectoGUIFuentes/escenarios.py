@@ -0,0 +1,232 @@
+"""
+Escenarios: muchas instancias MinPol en un solo archivo JSON Lines
+
+Cada linea del archivo es un objeto JSON con las llaves n, m, p, v, s, ct
+y maxMovs (las mismas de parser.leer_txt) y, opcionalmente, un id:
+
+    {"id": "caso-1", "n": 10, "m": 3, "p": [3, 3, 4], "v": [0.297, 0.673, 0.809],
+     "s": [[1, 2, 0], [0, 3, 0], [2, 1, 1]], "ct": 25, "maxMovs": 5}
+
+El archivo se lee de forma perezosa (una linea a la vez) y cada linea se
+resuelve en un pool de procesos con lote.resolver_datos. Solo se mantienen
+en vuelo unas pocas instancias por trabajador y cada resultado se escribe
+como una linea JSON apenas termina, asi que la memoria no crece con el
+tamano del archivo.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from cache import RUTA_CACHE
+from lote import COLUMNAS, expandir_entradas, resolver_datos
+from parser import Instancia, leer_txt
+
+
+# Instancias en vuelo por trabajador del pool
+EN_VUELO_POR_PROCESO = 2
+
+
+def leer_escenarios(ruta):
+    """
+    Generador de las lineas de un archivo de escenarios
+
+    Retorna (en cada iteracion):
+        Tupla (numero de linea, texto de la linea); las lineas vacias se
+        omiten y el texto no se parsea aqui
+    """
+
+    with open(ruta, 'r') as f:
+        for numero, linea in enumerate(f, 1):
+            linea = linea.strip()
+            if linea:
+                yield numero, linea
+
+
+def datos_registro(registro):
+    """
+    Valida un objeto de escenario ya decodificado
+
+    Retorna:
+        Diccionario de la instancia
+
+    Lanza ValueError si faltan campos, alguno no se puede convertir a
+    numero o la instancia no pasa Instancia.validar
+    """
+
+    if not isinstance(registro, dict):
+        raise ValueError("Cada instancia debe ser un objeto JSON")
+    faltantes = [llave for llave in ('n', 'm', 'p', 'v', 's', 'ct', 'maxMovs')
+                 if llave not in registro]
+    if faltantes:
+        raise ValueError(f"Faltan las llaves {', '.join(faltantes)}")
+
+    conversiones = {
+        'n': int,
+        'm': int,
+        'p': lambda p: [int(x) for x in p],
+        'v': lambda v: [float(x) for x in v],
+        's': lambda s: [[int(x) for x in fila] for fila in s],
+        'ct': float,
+        'maxMovs': float
+    }
+    campos = {}
+    for llave, convertir in conversiones.items():
+        try:
+            campos[llave] = convertir(registro[llave])
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor invalido en {llave}: {registro[llave]!r}")
+
+    instancia = Instancia(**campos)
+    instancia.validar()
+    return instancia.a_datos()
+
+
+def datos_escenario(linea):
+    """
+    Parsea y valida una linea de escenario
+
+    Retorna:
+        Tupla (id, datos) con el id de la linea (None si no trae) y el
+        diccionario de la instancia
+
+    Lanza ValueError si la linea no es JSON valido o la instancia no tiene
+    los campos y tamanos esperados
+    """
+
+    try:
+        registro = json.loads(linea)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON invalido: {e}")
+    datos = datos_registro(registro)
+    return registro.get('id'), datos
+
+
+def linea_escenario(datos, id_escenario=None):
+    """Convierte una instancia en una linea de escenario (sin salto de linea)"""
+    registro = {} if id_escenario is None else {'id': id_escenario}
+    registro.update((llave, datos[llave]) for llave in ('n', 'm', 'p', 'v', 's', 'ct', 'maxMovs'))
+    return json.dumps(registro, separators=(',', ':'))
+
+
+def resolver_linea(ruta, numero, linea, motor='nativo', timeout=60, ruta_cache=None,
+                   verificacion=False):
+    """
+    Parsea y resuelve una linea de escenario (se ejecuta en el trabajador)
+
+    Retorna:
+        Diccionario con id, linea y las columnas de lote.COLUMNAS (archivo
+        es la ruta del escenario); los errores de formato o del solver
+        quedan en la columna error con estado 'ERROR'
+    """
+
+    fila = dict.fromkeys(COLUMNAS)
+    fila.update(archivo=ruta, motor=motor)
+    salida = {'id': None, 'linea': numero}
+
+    inicio = time.perf_counter()
+    try:
+        id_escenario, datos = datos_escenario(linea)
+        salida['id'] = id_escenario
+        fila['tiempo_lectura'] = time.perf_counter() - inicio
+        resolver_datos(fila, datos, motor, timeout, ruta_cache, verificacion)
+    except Exception as e:
+        fila['estado'] = 'ERROR'
+        fila['error'] = str(e)
+
+    fila['tiempo_total'] = time.perf_counter() - inicio
+    salida.update(fila)
+    return salida
+
+
+def resolver_escenarios(ruta, motor='nativo', procesos=None, timeout=60, ruta_cache=None,
+                        verificacion=False):
+    """
+    Resuelve todas las instancias de un archivo de escenarios
+
+    Lee el archivo con leer_escenarios y mantiene a lo sumo
+    EN_VUELO_POR_PROCESO instancias por trabajador en el pool
+
+    Retorna (en cada iteracion):
+        La fila de resolver_linea de cada instancia, en el orden en que
+        terminan (la llave linea indica su posicion en el archivo)
+    """
+
+    procesos = procesos or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        pendientes = set()
+        for numero, linea in leer_escenarios(ruta):
+            pendientes.add(pool.submit(resolver_linea, ruta, numero, linea, motor, timeout,
+                                       ruta_cache, verificacion))
+            if len(pendientes) >= procesos * EN_VUELO_POR_PROCESO:
+                listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    yield futuro.result()
+        while pendientes:
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                yield futuro.result()
+
+
+def convertir_txt(archivos, salida):
+    """
+    Junta varios .txt en un archivo de escenarios; el id de cada linea es
+    el nombre del archivo sin extension
+
+    Retorna:
+        Numero de instancias escritas
+    """
+
+    with open(salida, 'w') as f:
+        for archivo in archivos:
+            id_escenario = os.path.splitext(os.path.basename(archivo))[0]
+            f.write(linea_escenario(leer_txt(archivo), id_escenario) + "\n")
+    return len(archivos)
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Escenarios MinPol en JSON Lines")
+    comandos = argumentos.add_subparsers(dest="comando", required=True)
+
+    convertir = comandos.add_parser("convertir", help="juntar archivos .txt en un escenario .jsonl")
+    convertir.add_argument("salida", help="archivo .jsonl a crear")
+    convertir.add_argument("entradas", nargs="+",
+                           help="directorios, archivos o patrones glob (ej. '../DatosProyecto/*.txt')")
+
+    resolver = comandos.add_parser("resolver", help="resolver todas las instancias de un escenario")
+    resolver.add_argument("escenario", help="archivo .jsonl con una instancia por linea")
+    resolver.add_argument("--salida", default="resultados.jsonl",
+                          help="archivo .jsonl con un resultado por linea")
+    resolver.add_argument("--motor", choices=['nativo', 'heuristico', 'minizinc'], default='nativo')
+    resolver.add_argument("--procesos", type=int, default=None,
+                          help="numero de trabajadores (por defecto, uno por nucleo)")
+    resolver.add_argument("--timeout", type=float, default=60,
+                          help="segundos maximos por instancia (cualquier motor)")
+    resolver.add_argument("--cache", nargs="?", const=RUTA_CACHE, default=None,
+                          help="usar la cache de resultados (directorio opcional)")
+    resolver.add_argument("--verificar", action="store_true",
+                          help="recalcular cada solucion y comprobar sus restricciones")
+    args = argumentos.parse_args()
+
+    if args.comando == "convertir":
+        archivos = expandir_entradas(args.entradas)
+        if not archivos:
+            print("No se encontraron instancias")
+            raise SystemExit(1)
+        print(f"{convertir_txt(archivos, args.salida)} instancias guardadas en {args.salida}")
+        raise SystemExit(0)
+
+    inicio = time.perf_counter()
+    total = errores = 0
+    with open(args.salida, 'w') as f:
+        for fila in resolver_escenarios(args.escenario, args.motor, args.procesos, args.timeout,
+                                        args.cache, args.verificar):
+            f.write(json.dumps(fila) + "\n")
+            f.flush()
+            total += 1
+            errores += fila['estado'] == 'ERROR'
+    print(f"{total} instancias resueltas en {time.perf_counter() - inicio:.2f}s ({errores} con error)")
+    print(f"Resultados guardados en {args.salida}")
@@ -0,0 +1,203 @@
+"""
+Evaluador vectorizado de soluciones de MinPol
+
+Recalcula, sin confiar en lo que imprimio el solver, todo lo que define una
+solucion a partir de la matriz de movimientos x[k][i][j]: la distribucion
+final p_prime, el costo contra ct, los movimientos contra maxMovs, las
+restricciones de x, la mediana y total_polarization. Trabaja con una pila
+de candidatos (B, 3, m, m) en una sola llamada de NumPy, asi que sirve
+tanto para verificar una respuesta como para puntuar miles de planes.
+"""
+
+import numpy as np
+
+from solver_nativo import RES_COST, EPS
+
+
+# Tolerancia para comparar polarizaciones reportadas (la salida del modelo
+# redondea a milesimas)
+TOLERANCIA = 1e-3
+
+
+def tensores_instancia(datos):
+    """
+    Precalcula los arreglos de la instancia que usa evaluar_lote
+
+    Retorna:
+        Diccionario con p (m,), s (3, m), costo_unitario (3, m, m),
+        distancia (m, m) y separacion (m, m) = |v[j] - v[q]|
+    """
+
+    v = np.asarray(datos['v'], dtype=float)
+    m = datos['m']
+    indices = np.arange(m)
+    separacion = np.abs(v[:, None] - v[None, :])
+    return {
+        'p': np.asarray(datos['p'], dtype=np.int64),
+        's': np.asarray(datos['s'], dtype=np.int64).T,
+        'costo_unitario': np.asarray(RES_COST)[:, None, None] * separacion[None, :, :],
+        'distancia': np.abs(indices[:, None] - indices[None, :]),
+        'separacion': separacion
+    }
+
+
+def evaluar_lote(datos, planes, tensores=None):
+    """
+    Evalua una pila de planes de movimientos
+
+    Parametros:
+        datos: diccionario con la instancia
+        planes: arreglo (B, 3, m, m) o (3, m, m) con x[k][i][j]
+        tensores: resultado de tensores_instancia (se calcula si falta)
+
+    Retorna:
+        Diccionario de arreglos de largo B:
+        - p_prime (B, m): distribucion final
+        - costo, movs: costo y movimientos de cada plan
+        - estructura: x >= 0, diagonal en cero y salidas <= s
+        - med_pos: mejor mediana valida (1..m), o 0 si ninguna cumple
+        - polarizacion: polarizacion con esa mediana (inf si no hay)
+        - factible: cumple todas las restricciones del modelo
+    """
+
+    if tensores is None:
+        tensores = tensores_instancia(datos)
+    x = np.asarray(planes, dtype=np.int64)
+    if x.ndim == 3:
+        x = x[None]
+    m = datos['m']
+    n = datos['n']
+
+    salidas = x.sum(axis=3)                                  # (B, 3, m)
+    p_prime = tensores['p'][None, :] + x.sum(axis=(1, 2)) - salidas.sum(axis=1)
+    costo = np.einsum('bkij,kij->b', x, tensores['costo_unitario'])
+    movs = np.einsum('bkij,ij->b', x, tensores['distancia'])
+
+    diagonal = x[:, :, np.arange(m), np.arange(m)]
+    estructura = ((x >= 0).all(axis=(1, 2, 3)) &
+                  (diagonal == 0).all(axis=(1, 2)) &
+                  (salidas <= tensores['s'][None]).all(axis=(1, 2)))
+
+    # Mediana: izquierda < n/2 y derecha <= n/2 para cada posicion q
+    acumulado = np.cumsum(p_prime, axis=1)
+    izquierda = acumulado - p_prime
+    derecha = p_prime.sum(axis=1, keepdims=True) - acumulado
+    valida = (2 * izquierda < n) & (2 * derecha <= n)
+
+    polarizaciones = np.where(valida, p_prime @ tensores['separacion'], np.inf)
+    mejor = polarizaciones.argmin(axis=1)
+    polarizacion = polarizaciones[np.arange(len(x)), mejor]
+    hay_mediana = valida.any(axis=1)
+
+    factible = (estructura & hay_mediana &
+                (costo <= datos['ct'] + EPS) & (movs <= datos['maxMovs'] + EPS))
+
+    return {
+        'p_prime': p_prime,
+        'costo': costo,
+        'movs': movs,
+        'estructura': estructura,
+        'med_pos': np.where(hay_mediana, mejor + 1, 0),
+        'polarizacion': polarizacion,
+        'factible': factible
+    }
+
+
+def plan_de(resultado, m):
+    """
+    Retorna la matriz x[k][i][j] de un resultado: la llave x (motor nativo
+    y heuristica) o la lista dispersa movimientos (Resultado.a_dict), o None
+    si el resultado no trae un plan
+    """
+
+    if resultado.get('x') is not None:
+        return np.asarray(resultado['x'], dtype=np.int64)
+    if resultado.get('movimientos') is not None:
+        x = np.zeros((3, m, m), dtype=np.int64)
+        for k, i, j, personas in resultado['movimientos']:
+            x[k, i, j] = personas
+        return x
+    return None
+
+
+def verificar(datos, resultado):
+    """
+    Verifica un resultado (estado, polarizacion, med_pos y el plan)
+
+    Retorna:
+        Lista de mensajes con los problemas encontrados (vacia si el
+        resultado es correcto)
+    """
+
+    if resultado.get('estado') not in ('OPTIMO', 'SOLUCION'):
+        return []
+    x = plan_de(resultado, datos['m'])
+    if x is None:
+        return ["El resultado no trae la matriz de movimientos"]
+
+    tensores = tensores_instancia(datos)
+    ev = evaluar_lote(datos, x, tensores)
+    errores = []
+    if not ev['estructura'][0]:
+        errores.append("x tiene valores negativos, movimientos i -> i o supera s")
+    if ev['costo'][0] > datos['ct'] + EPS:
+        errores.append(f"El costo {ev['costo'][0]:.3f} supera ct = {datos['ct']}")
+    if ev['movs'][0] > datos['maxMovs'] + EPS:
+        errores.append(f"Los movimientos {ev['movs'][0]} superan maxMovs = {datos['maxMovs']}")
+    if ev['med_pos'][0] == 0:
+        errores.append("Ninguna opinion cumple las restricciones de la mediana")
+        return errores
+
+    if resultado.get('p_prime') is not None and list(resultado['p_prime']) != ev['p_prime'][0].tolist():
+        errores.append("p_prime no coincide con el plan")
+    med_pos = resultado.get('med_pos')
+    if med_pos is not None:
+        q = med_pos - 1
+        izquierda = ev['p_prime'][0][:q].sum()
+        derecha = ev['p_prime'][0][q + 1:].sum()
+        if not (2 * izquierda < datos['n'] and 2 * derecha <= datos['n']):
+            errores.append(f"med_pos = {med_pos} no cumple las restricciones de la mediana")
+        else:
+            polarizacion = float(ev['p_prime'][0] @ tensores['separacion'][:, q])
+            if resultado.get('polarizacion') is not None and \
+                    abs(polarizacion - resultado['polarizacion']) > TOLERANCIA:
+                errores.append(f"La polarizacion reportada {resultado['polarizacion']} no coincide "
+                               f"con la del plan ({polarizacion:.3f})")
+    return errores
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import sys
+    import time
+    from parser import leer_txt
+
+    if len(sys.argv) not in (2, 3):
+        print("Uso:")
+        print("  python evaluador.py input.txt [candidatos]")
+        sys.exit(1)
+
+    # Puntuar planes aleatorios que respetan s, como prueba de rendimiento
+    datos = leer_txt(sys.argv[1])
+    cantidad = int(sys.argv[2]) if len(sys.argv) == 3 else 10000
+    m = datos['m']
+    rng = np.random.default_rng(0)
+    s = np.asarray(datos['s']).T
+    planes = np.zeros((cantidad, 3, m, m), dtype=np.int64)
+    for k in range(3):
+        for i in range(m):
+            if s[k, i]:
+                destinos = rng.integers(0, m, size=(cantidad, s[k, i]))
+                personas = rng.integers(0, 2, size=(cantidad, s[k, i]))
+                for j in range(m):
+                    planes[:, k, i, j] = ((destinos == j) & (personas == 1)).sum(axis=1)
+    planes[:, :, np.arange(m), np.arange(m)] = 0
+
+    inicio = time.perf_counter()
+    ev = evaluar_lote(datos, planes)
+    tiempo = time.perf_counter() - inicio
+    factibles = int(ev['factible'].sum())
+    print(f"{cantidad} planes evaluados en {tiempo * 1000:.1f} ms, {factibles} factibles")
+    if factibles:
+        mejor = np.where(ev['factible'], ev['polarizacion'], np.inf).min()
+        print(f"Mejor polarizacion entre los factibles: {mejor:.3f}")
@@ -0,0 +1,127 @@
+"""
+Generador de instancias sinteticas de MinPol con semilla
+
+Produce instancias validas (sum(p) == n, cada fila de s suma p[i], v
+creciente y sin repetidos) controlando cuatro parametros:
+- n y m: personas y opiniones
+- densidad (0..1): peso de las resistencias altas; cada persona recibe el
+  nivel k con probabilidad binomial(2, densidad), asi que 0 deja a todos
+  en resistencia baja y 1 a todos en resistencia alta
+- holgura (0..1): que tan amplio es el presupuesto; ct y maxMovs son esa
+  fraccion de lo necesario para llevar a todos a la mediana inicial (con
+  holgura 1 la polarizacion optima es 0)
+La misma semilla produce siempre la misma instancia.
+"""
+
+import math
+import os
+
+import numpy as np
+
+from solver_nativo import RES_COST
+from parser import texto_txt
+
+
+def _mediana(p, n):
+    """Indice (base 0) de la mediana de la distribucion p"""
+    acumulado = 0
+    for q, personas in enumerate(p):
+        acumulado += personas
+        if 2 * acumulado >= n:
+            return q
+    return len(p) - 1
+
+
+def generar_instancia(n, m, densidad=0.5, holgura=0.3, semilla=0):
+    """
+    Genera una instancia sintetica
+
+    Parametros:
+        n: numero de personas
+        m: numero de opiniones (m <= 1001, v tiene 3 decimales)
+        densidad: peso de las resistencias altas (0..1)
+        holgura: fraccion del presupuesto que alcanza para llevar a todos
+                 a la mediana (0..1)
+        semilla: semilla del generador aleatorio
+
+    Retorna:
+        Diccionario con las llaves n, m, p, v, s, ct y maxMovs
+
+    Lanza ValueError si algun parametro esta fuera de rango
+    """
+
+    if n < 1 or not 1 <= m <= 1001:
+        raise ValueError("Se requiere n >= 1 y 1 <= m <= 1001")
+    if not 0 <= densidad <= 1 or not 0 <= holgura <= 1:
+        raise ValueError("densidad y holgura deben estar entre 0 y 1")
+
+    rng = np.random.default_rng(semilla)
+    p = rng.multinomial(n, rng.dirichlet(np.ones(m)))
+    v = np.sort(rng.choice(1001, size=m, replace=False)) / 1000
+    niveles = [(1 - densidad) ** 2, 2 * densidad * (1 - densidad), densidad ** 2]
+    s = np.array([rng.multinomial(personas, niveles) for personas in p])
+
+    # Presupuesto necesario para llevar a todos a la mediana inicial
+    q = _mediana(p, n)
+    distancias = np.abs(v - v[q])
+    costo_total = float((s * np.asarray(RES_COST)).sum(axis=1) @ distancias)
+    movs_total = int(p @ np.abs(np.arange(m) - q))
+
+    return {
+        'n': int(n),
+        'm': int(m),
+        'p': [int(x) for x in p],
+        'v': [float(x) for x in v],
+        's': [[int(x) for x in fila] for fila in s],
+        'ct': math.ceil(costo_total * holgura * 100) / 100,
+        'maxMovs': int(movs_total * holgura)
+    }
+
+
+def generar_archivos(carpeta, cantidad, n, m, densidad=0.5, holgura=0.3, semilla=0):
+    """
+    Escribe cantidad instancias .txt en carpeta (semillas consecutivas
+    desde semilla)
+
+    Retorna:
+        Lista de rutas escritas
+    """
+
+    os.makedirs(carpeta, exist_ok=True)
+    rutas = []
+    for t in range(cantidad):
+        ruta = os.path.join(carpeta, f"Sintetica_n{n}_m{m}_s{semilla + t}.txt")
+        with open(ruta, 'w') as f:
+            f.write(texto_txt(generar_instancia(n, m, densidad, holgura, semilla + t)))
+        rutas.append(ruta)
+    return rutas
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import argparse
+    from escenarios import linea_escenario
+
+    argumentos = argparse.ArgumentParser(description="Genera instancias MinPol sinteticas")
+    argumentos.add_argument("salida", help="carpeta de .txt, o archivo .jsonl para un escenario")
+    argumentos.add_argument("--cantidad", type=int, default=1)
+    argumentos.add_argument("-n", type=int, default=1000, help="numero de personas")
+    argumentos.add_argument("-m", type=int, default=10, help="numero de opiniones")
+    argumentos.add_argument("--densidad", type=float, default=0.5,
+                            help="peso de las resistencias altas (0..1)")
+    argumentos.add_argument("--holgura", type=float, default=0.3,
+                            help="fraccion del presupuesto para llevar a todos a la mediana (0..1)")
+    argumentos.add_argument("--semilla", type=int, default=0)
+    args = argumentos.parse_args()
+
+    if args.salida.endswith(".jsonl"):
+        with open(args.salida, 'w') as f:
+            for t in range(args.cantidad):
+                semilla = args.semilla + t
+                datos = generar_instancia(args.n, args.m, args.densidad, args.holgura, semilla)
+                f.write(linea_escenario(datos, f"sintetica-{semilla}") + "\n")
+        print(f"{args.cantidad} instancias guardadas en {args.salida}")
+    else:
+        rutas = generar_archivos(args.salida, args.cantidad, args.n, args.m, args.densidad,
+                                 args.holgura, args.semilla)
+        print(f"{len(rutas)} instancias guardadas en {args.salida}")
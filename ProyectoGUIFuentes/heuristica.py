@@ -0,0 +1,227 @@
+"""
+Heuristica rapida para el modelo MinPol
+
+Construye en milisegundos un plan factible (sin garantia de optimalidad):
+para cada posicion de la mediana, empezando por la mediana inicial y
+alejandose de ella, arma el plan voraz de solver_nativo, que mueve primero
+a las personas que menos recursos consumen, y luego mejora los mejores
+planes con una busqueda local que agrega o redirige personas de a una
+mientras haya presupuesto de ct y maxMovs. Todo respeta tiempo_max: con
+muchas opiniones no se alcanzan a probar todas las posiciones. Sirve como respuesta inmediata, como cota
+superior para los solvers exactos y como respaldo cuando estos tardan
+demasiado.
+"""
+
+import math
+import time
+
+from solver_nativo import (RES_COST, EPS, validar_datos, plan_voraz, distribucion_final,
+                           mediana_inicial, polarizacion_de)
+
+
+# Segundos por defecto de resolver_heuristico
+TIEMPO_HEURISTICA = 0.5
+
+
+def cumple_mediana(datos, p_prime, q):
+    """Indica si la opinion q (base 0) cumple las restricciones de la mediana para p_prime"""
+    n = datos['n']
+    return sum(p_prime[:q]) < n / 2 and sum(p_prime[q + 1:]) <= n / 2
+
+
+def es_factible(datos, x, q):
+    """
+    Verifica que el plan x[k][i][j] con la mediana en q (base 0) cumpla
+    todas las restricciones del modelo
+    """
+
+    m = datos['m']
+    v = datos['v']
+    s = datos['s']
+    costo = 0.0
+    movs = 0
+    for k in range(3):
+        for i in range(m):
+            if x[k][i][i] != 0 or min(x[k][i]) < 0 or sum(x[k][i]) > s[i][k]:
+                return False
+            for j in range(m):
+                costo += abs(v[i] - v[j]) * RES_COST[k] * x[k][i][j]
+                movs += abs(i - j) * x[k][i][j]
+
+    if costo > datos['ct'] + EPS or movs > datos['maxMovs'] + EPS:
+        return False
+    return cumple_mediana(datos, distribucion_final(datos, x), q)
+
+
+def mejor_mediana(datos, p_prime):
+    """
+    Retorna la tupla (polarizacion, q) con la mejor mediana (base 0) para
+    la distribucion p_prime entre las que cumplen sus restricciones
+    """
+
+    v = datos['v']
+    mejor = None
+    for q in range(datos['m']):
+        if not cumple_mediana(datos, p_prime, q):
+            continue
+        polarizacion = sum(p_prime[j] * abs(v[j] - v[q]) for j in range(datos['m']))
+        if mejor is None or polarizacion < mejor[0] - EPS:
+            mejor = (polarizacion, q)
+    return mejor
+
+
+def busqueda_local(datos, x, q, limite=math.inf):
+    """
+    Mejora el plan x con la mediana fija en q (base 0) aplicando el mejor
+    movimiento de una persona en cada paso: agregar un movimiento i -> j,
+    o redirigir (o deshacer) uno ya hecho. Se detiene cuando ningun paso
+    reduce la polarizacion o al llegar al instante limite (perf_counter)
+
+    Retorna:
+        El plan mejorado (se modifica x)
+    """
+
+    n = datos['n']
+    m = datos['m']
+    v = datos['v']
+    s = datos['s']
+    ct = datos['ct']
+    max_movs = datos['maxMovs']
+    d = [abs(v[j] - v[q]) for j in range(m)]
+
+    p_prime = distribucion_final(datos, x)
+    izq = sum(p_prime[:q])
+    der = sum(p_prime[q + 1:])
+    costo = sum(abs(v[i] - v[j]) * RES_COST[k] * x[k][i][j]
+                for k in range(3) for i in range(m) for j in range(m))
+    movs = sum(abs(i - j) * x[k][i][j] for k in range(3) for i in range(m) for j in range(m))
+    restante = [[s[i][k] - sum(x[k][i]) for i in range(m)] for k in range(3)]
+
+    def lado(j):
+        return (1 if j < q else 0), (1 if j > q else 0)
+
+    while time.perf_counter() < limite:
+        mejor = None
+        for k in range(3):
+            for i in range(m):
+                # Destinos actuales de las personas (k, i): None es "sin mover"
+                origenes = [None] if restante[k][i] > 0 else []
+                origenes += [j for j in range(m) if x[k][i][j] > 0]
+                for desde in origenes:
+                    actual = desde if desde is not None else i
+                    for hacia in range(m):
+                        if hacia == actual or (desde is None and hacia == i):
+                            continue
+                        ganancia = d[actual] - d[hacia]
+                        if ganancia <= EPS or (mejor is not None and ganancia <= mejor[0]):
+                            continue
+                        delta_movs = abs(i - hacia) - abs(i - actual)
+                        delta_costo = (abs(v[i] - v[hacia]) - abs(v[i] - v[actual])) * RES_COST[k]
+                        if movs + delta_movs > max_movs + EPS or costo + delta_costo > ct + EPS:
+                            continue
+                        izq_h, der_h = lado(hacia)
+                        izq_a, der_a = lado(actual)
+                        if izq + izq_h - izq_a >= n / 2 or der + der_h - der_a > n / 2:
+                            continue
+                        mejor = (ganancia, k, i, desde, hacia, delta_movs, delta_costo)
+        if mejor is None:
+            break
+
+        _, k, i, desde, hacia, delta_movs, delta_costo = mejor
+        actual = desde if desde is not None else i
+        if desde is None:
+            restante[k][i] -= 1
+        else:
+            x[k][i][desde] -= 1
+        if hacia == i:
+            restante[k][i] += 1
+        else:
+            x[k][i][hacia] += 1
+        izq_h, der_h = lado(hacia)
+        izq_a, der_a = lado(actual)
+        izq += izq_h - izq_a
+        der += der_h - der_a
+        movs += delta_movs
+        costo += delta_costo
+
+    return x
+
+
+def resolver_heuristico(datos, tiempo_max=TIEMPO_HEURISTICA):
+    """
+    Construye un plan factible para la instancia en poco tiempo
+
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        tiempo_max: segundos maximos; la mitad se dedica a los planes
+                    voraces (al menos uno) y el resto a la busqueda local
+
+    Retorna:
+        Diccionario con las mismas llaves que solver_nativo.resolver_nativo,
+        con estado 'SOLUCION' (plan factible, sin probar que sea optimo)
+    """
+
+    inicio = time.perf_counter()
+    limite = inicio + tiempo_max
+    validar_datos(datos)
+    m = datos['m']
+
+    # El plan vacio con la mediana inicial siempre es factible
+    mejor = None
+    if mediana_inicial(datos) is not None:
+        polarizacion, q = mejor_mediana(datos, datos['p'])
+        mejor = (polarizacion, [[[0] * m for _ in range(m)] for _ in range(3)], q)
+
+    # Planes voraces, primero las posiciones cercanas a la mediana inicial
+    q0 = mediana_inicial(datos)
+    orden = sorted(range(m), key=lambda q: abs(q - q0) if q0 is not None else 0)
+    limite_voraz = inicio + tiempo_max / 2
+    planes = []
+    for q in orden:
+        if planes and time.perf_counter() > limite_voraz:
+            break
+        x = plan_voraz(datos, q)
+        if x is None or not es_factible(datos, x, q):
+            continue
+        planes.append((polarizacion_de(datos, x, q), q, x))
+
+    # Busqueda local sobre los planes, del mejor al peor, hasta el limite
+    planes.sort(key=lambda plan: plan[:2])
+    for t, (_, q, x) in enumerate(planes):
+        if t and time.perf_counter() > limite:
+            break
+        x = busqueda_local(datos, x, q, limite)
+        # Con el plan fijo, la mejor mediana puede ser otra
+        polarizacion, q_final = mejor_mediana(datos, distribucion_final(datos, x))
+        if mejor is None or polarizacion < mejor[0] - EPS:
+            mejor = (polarizacion, x, q_final)
+
+    tiempo = time.perf_counter() - inicio
+    if mejor is None:
+        return {'estado': 'DESCONOCIDO', 'tiempo': tiempo}
+
+    polarizacion, x, q = mejor
+    return {
+        'estado': 'SOLUCION',
+        'polarizacion': polarizacion,
+        'med_pos': q + 1,
+        'p_prime': distribucion_final(datos, x),
+        'x': x,
+        'tiempo': tiempo
+    }
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import sys
+    from parser import leer_txt
+    from solver_nativo import formatear_salida
+
+    if len(sys.argv) != 2:
+        print("Uso:")
+        print("  python heuristica.py input.txt")
+        sys.exit(1)
+
+    resultado = resolver_heuristico(leer_txt(sys.argv[1]))
+    print(formatear_salida(resultado), end="")
+    print(f"Tiempo: {resultado['tiempo']:.4f}s")
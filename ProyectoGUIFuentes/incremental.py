@@ -0,0 +1,268 @@
+"""
+Re-solucion incremental de MinPol
+
+En una sesion de "que pasa si" la misma instancia se resuelve una y otra
+vez despues de cambios pequenos (una entrada de p, una fila de s, ct o
+maxMovs). ResolucionIncremental recuerda la ultima instancia resuelta y,
+para la siguiente:
+- calcula que campos cambiaron (diferencias)
+- reutiliza el plan anterior como solucion inicial; si el cambio lo dejo
+  infactible lo repara deshaciendo movimientos, y si no se puede reparar
+  recurre a la heuristica
+- conserva las cotas por posicion de la mediana de la corrida anterior
+  cuando siguen siendo validas (si solo se reducen ct o maxMovs, ningun
+  subproblema puede mejorar) y recalcula las demas con cotas.py
+- solo pasa al subproblema exacto las posiciones cuya cota todavia puede
+  mejorar el plan reutilizado
+Todo trabaja sobre los datos en memoria, sin convertir a .dzn ni lanzar
+MiniZinc, y el resultado informa cuanto trabajo se ahorro.
+"""
+
+import copy
+import math
+import time
+
+import numpy as np
+
+from cotas import cotas_medianas, resolver_acotado
+from heuristica import resolver_heuristico, mejor_mediana, es_factible, busqueda_local
+from solver_nativo import RES_COST, EPS, validar_datos, distribucion_final
+
+
+# Campos de una instancia que se comparan
+CAMPOS = ('n', 'm', 'p', 'v', 's', 'ct', 'maxMovs')
+
+# Segundos de busqueda local para mejorar el plan reutilizado
+TIEMPO_LOCAL = 0.05
+
+
+def diferencias(anterior, nuevo):
+    """
+    Compara dos instancias
+
+    Retorna:
+        Diccionario campo -> cambio: para p, v y s la lista de indices
+        (base 0) que cambiaron; para n, m, ct y maxMovs la tupla
+        (anterior, nuevo). Vacio si las instancias son iguales
+    """
+
+    cambios = {}
+    for campo in CAMPOS:
+        antes, despues = anterior[campo], nuevo[campo]
+        if campo in ('p', 'v', 's'):
+            if len(antes) != len(despues):
+                cambios[campo] = list(range(len(despues)))
+                continue
+            indices = [i for i, (a, b) in enumerate(zip(antes, despues)) if a != b]
+            if indices:
+                cambios[campo] = indices
+        elif antes != despues:
+            cambios[campo] = (antes, despues)
+    return cambios
+
+
+def _solo_ajusta_presupuesto(cambios):
+    """Indica si los cambios solo reducen ct y/o maxMovs (las cotas anteriores siguen valiendo)"""
+    if not cambios or set(cambios) - {'ct', 'maxMovs'}:
+        return False
+    return all(despues <= antes for antes, despues in cambios.values())
+
+
+def reparar_plan(datos, x, limite=math.inf):
+    """
+    Adapta un plan de movimientos a una instancia que cambio
+
+    Deshace movimientos hasta que ninguna fila supere su oferta s[i][k] y
+    el plan quepa en ct (primero los mas caros) y en maxMovs (primero los
+    mas largos); luego elige la mejor mediana valida y mejora el plan con
+    la busqueda local de heuristica.py hasta el instante limite
+
+    Retorna:
+        Tupla (polarizacion, x, q, deshechos) con deshechos el numero de
+        personas que se dejaron de mover, o None si el plan no se pudo
+        reparar
+    """
+
+    m = datos['m']
+    v = datos['v']
+    s = datos['s']
+    x = copy.deepcopy(x)
+    deshechos = 0
+
+    # Oferta: quitar primero las rutas mas largas de cada fila
+    for k in range(3):
+        for i in range(m):
+            exceso = sum(x[k][i]) - s[i][k]
+            for j in sorted(range(m), key=lambda j: -abs(i - j)):
+                if exceso <= 0:
+                    break
+                quitar = min(exceso, x[k][i][j])
+                x[k][i][j] -= quitar
+                exceso -= quitar
+                deshechos += quitar
+
+    # Presupuestos: deshacer de a una persona las rutas que mas consumen
+    def costo_ruta(k, i, j):
+        return abs(v[i] - v[j]) * RES_COST[k]
+
+    def movs_ruta(k, i, j):
+        return abs(i - j)
+
+    rutas = [(k, i, j) for k in range(3) for i in range(m) for j in range(m) if x[k][i][j]]
+    for consumo, presupuesto in ((costo_ruta, datos['ct']), (movs_ruta, datos['maxMovs'])):
+        usado = sum(consumo(k, i, j) * x[k][i][j] for k, i, j in rutas)
+        for k, i, j in sorted(rutas, key=lambda ruta: -consumo(*ruta)):
+            while x[k][i][j] and usado > presupuesto + EPS:
+                x[k][i][j] -= 1
+                usado -= consumo(k, i, j)
+                deshechos += 1
+
+    mediana = mejor_mediana(datos, distribucion_final(datos, x))
+    if mediana is None or not es_factible(datos, x, mediana[1]):
+        return None
+    x = busqueda_local(datos, x, mediana[1], limite)
+    polarizacion, q = mejor_mediana(datos, distribucion_final(datos, x))
+    return polarizacion, x, q, deshechos
+
+
+class ResolucionIncremental:
+    """
+    Sesion de re-solucion: cada llamada a resolver parte de la instancia y
+    el resultado de la anterior
+    """
+
+    def __init__(self, tiempo_local=TIEMPO_LOCAL):
+        self.tiempo_local = tiempo_local
+        self.datos = None
+        self.resultado = None
+        # Tiempo de la ultima solucion completa, como referencia del ahorro
+        self.tiempo_completo = None
+
+    # --------------------------------------------------
+    def resolver(self, datos, gap=0.0, al_progreso=None, tiempo_max=None, cancelar=None):
+        """
+        Resuelve datos reutilizando lo que siga valiendo de la corrida anterior
+
+        Parametros:
+            datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+            gap: gap aceptable (ver cotas.resolver_acotado)
+            al_progreso: funcion de progreso de cotas.resolver_acotado (si
+                         retorna True la busqueda se detiene)
+            tiempo_max, cancelar: limites de la busqueda exacta (ver
+                                  cotas.resolver_acotado)
+
+        Retorna:
+            El diccionario de cotas.resolver_acotado mas la llave
+            incremental con:
+            - cambios: resultado de diferencias (None en la primera corrida)
+            - plan_previo: 'REUTILIZADO', 'REPARADO', 'DESCARTADO' o None
+            - cotas_reutilizadas: posiciones cuya cota anterior era mejor
+              que la recalculada
+            - posiciones_evitadas: posiciones que no pasaron por el
+              subproblema exacto
+            - tiempo: segundos de esta llamada
+            - tiempo_completo: segundos de la ultima solucion completa
+        """
+
+        inicio = time.perf_counter()
+        validar_datos(datos)
+        anterior = self.resultado
+        cambios = None
+        if self.datos is not None and self.datos['m'] == datos['m']:
+            cambios = diferencias(self.datos, datos)
+            # Sin cambios se reutiliza el resultado si ya era definitivo o
+            # cumple el gap pedido (no si la corrida anterior se detuvo antes)
+            completo = anterior['estado'] in ('OPTIMO', 'INSATISFACIBLE') or (
+                anterior['estado'] == 'SOLUCION' and anterior['gap'] <= gap)
+            if not cambios and completo:
+                return self._informar(dict(anterior), cambios, 'REUTILIZADO', 0, inicio)
+
+        # Sin corrida anterior comparable se resuelve completo
+        if cambios is None or anterior is None or anterior['estado'] not in ('OPTIMO', 'SOLUCION'):
+            resultado = resolver_acotado(datos, inicial=resolver_heuristico(datos), gap=gap,
+                                         al_progreso=al_progreso, tiempo_max=tiempo_max,
+                                         cancelar=cancelar)
+            self.tiempo_completo = time.perf_counter() - inicio
+            return self._guardar(datos, resultado, cambios, None, 0, inicio)
+
+        # Plan anterior como solucion inicial
+        limite = time.perf_counter() + self.tiempo_local
+        reparado = reparar_plan(datos, anterior['x'], limite)
+        if reparado is not None:
+            polarizacion, x, q, deshechos = reparado
+            plan_previo = 'REPARADO' if deshechos else 'REUTILIZADO'
+            inicial = {'estado': 'SOLUCION', 'polarizacion': polarizacion, 'x': x, 'med_pos': q + 1}
+        else:
+            plan_previo = 'DESCARTADO'
+            inicial = resolver_heuristico(datos, self.tiempo_local)
+
+        # Cotas: las anteriores siguen valiendo si solo se ajusto el presupuesto a la baja
+        cotas = cotas_medianas(datos)
+        reutilizadas = 0
+        if _solo_ajusta_presupuesto(cambios):
+            previas = np.asarray(anterior['cotas_finales'], dtype=float)
+            reutilizadas = int((previas > cotas + EPS).sum())
+            cotas = np.maximum(cotas, previas)
+
+        resultado = resolver_acotado(datos, inicial=inicial, gap=gap, cotas=cotas,
+                                     al_progreso=al_progreso, tiempo_max=tiempo_max,
+                                     cancelar=cancelar)
+        return self._guardar(datos, resultado, cambios, plan_previo, reutilizadas, inicio)
+
+    # --------------------------------------------------
+    def _guardar(self, datos, resultado, cambios, plan_previo, reutilizadas, inicio):
+        """Recuerda la instancia y su resultado para la siguiente llamada"""
+        self.datos = copy.deepcopy(datos)
+        self.resultado = resultado
+        return self._informar(resultado, cambios, plan_previo, reutilizadas, inicio)
+
+    # --------------------------------------------------
+    def _informar(self, resultado, cambios, plan_previo, reutilizadas, inicio):
+        """Agrega al resultado la llave incremental"""
+        resueltas = resultado.get('resueltas', 0) if cambios != {} else 0
+        resultado['incremental'] = {
+            'cambios': cambios,
+            'plan_previo': plan_previo,
+            'cotas_reutilizadas': reutilizadas,
+            'posiciones_evitadas': self.datos['m'] - resueltas if self.datos else None,
+            'tiempo': time.perf_counter() - inicio,
+            'tiempo_completo': self.tiempo_completo
+        }
+        return resultado
+
+
+def formatear_informe(informe):
+    """Resume en una linea la llave incremental de un resultado"""
+    if informe['cambios'] is None:
+        return f"Solucion completa en {informe['tiempo']:.3f}s"
+    if not informe['cambios']:
+        return "Sin cambios: se reutiliza el resultado anterior"
+    texto = (f"Cambios: {', '.join(sorted(informe['cambios']))}; plan anterior "
+             f"{informe['plan_previo'].lower()}; {informe['cotas_reutilizadas']} cotas reutilizadas; "
+             f"{informe['posiciones_evitadas']} posiciones de la mediana sin resolver; "
+             f"{informe['tiempo']:.3f}s")
+    if informe['tiempo_completo']:
+        texto += f" (solucion completa: {informe['tiempo_completo']:.3f}s)"
+    return texto
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import argparse
+    from parser import leer_txt
+
+    argumentos = argparse.ArgumentParser(
+        description="Resuelve una instancia y luego sus variantes de forma incremental")
+    argumentos.add_argument("entradas", nargs="+",
+                            help="archivos .txt: la instancia base y luego sus variantes")
+    argumentos.add_argument("--gap", type=float, default=0.0,
+                            help="gap aceptable (0.05 = 5%%)")
+    args = argumentos.parse_args()
+
+    sesion = ResolucionIncremental()
+    for entrada in args.entradas:
+        resultado = sesion.resolver(leer_txt(entrada), args.gap)
+        polarizacion = resultado.get('polarizacion')
+        print(f"{entrada}: {resultado['estado']} "
+              f"{polarizacion if polarizacion is not None else ''}")
+        print(f"  {formatear_informe(resultado['incremental'])}")
@@ -0,0 +1,494 @@
+"""
+Ejecucion por lotes de instancias MinPol sin interfaz grafica
+
+Recibe directorios o patrones glob (por ejemplo DatosProyecto/*.txt),
+resuelve cada instancia en un pool de procesos y guarda una tabla con el
+resultado de cada una en CSV o JSON. Los datos de cada instancia se pasan
+a MiniZinc en memoria, asi que varias instancias se pueden resolver a la
+vez sin pisar DatosProyecto.dzn.
+
+Con una bitacora (ver bitacora.py) el lote es reanudable: cada instancia
+queda registrada al terminar, al volver a ejecutar se saltan las ya
+resueltas y se reintentan las fallidas, y varios trabajadores (tambien en
+otras maquinas con el directorio compartido) se reparten las instancias.
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import wait
+
+from cache import CacheResultados, clave_cache, RUTA_CACHE
+from compilacion import CacheCompilacion
+from evaluador import verificar
+from metricas import RegistroMetricas, RUTA_METRICAS
+from parser import leer_txt
+from presolve import presolve, dzn_parametrico, parametros_parametrico, RUTA_MZN_PARAMETRICO
+from anytime import resolver_anytime, cota_global
+from bitacora import Bitacora, MAX_INTENTOS
+from resultado import Resultado
+from cotas import resolver_acotado
+from heuristica import resolver_heuristico, TIEMPO_HEURISTICA
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUTA_NATIVO = os.path.join(BASE_DIR, "solver_nativo.py")
+RUTA_HEURISTICA = os.path.join(BASE_DIR, "heuristica.py")
+RUTA_COTAS = os.path.join(BASE_DIR, "cotas.py")
+RUTA_INCREMENTAL = os.path.join(BASE_DIR, "incremental.py")
+RUTA_PRESOLVE = os.path.join(BASE_DIR, "presolve.py")
+RUTA_ANYTIME = os.path.join(BASE_DIR, "anytime.py")
+RUTA_RESULTADO = os.path.join(BASE_DIR, "resultado.py")
+RUTA_COMPILACION = os.path.join(BASE_DIR, "compilacion.py")
+RUTA_PORTAFOLIO = os.path.join(BASE_DIR, "portafolio.py")
+
+# Archivos que ejecuta cada motor: cambiar cualquiera invalida su cache
+ARCHIVOS_MOTOR = {
+    'nativo': [RUTA_NATIVO, RUTA_COTAS, RUTA_HEURISTICA, RUTA_INCREMENTAL],
+    'heuristico': [RUTA_HEURISTICA, RUTA_NATIVO],
+    'minizinc': [RUTA_MZN_PARAMETRICO, RUTA_PRESOLVE, RUTA_ANYTIME, RUTA_RESULTADO,
+                 RUTA_COMPILACION, RUTA_PORTAFOLIO, RUTA_COTAS, RUTA_HEURISTICA, RUTA_NATIVO]
+}
+
+# Columnas de la tabla de resultados
+COLUMNAS = ['archivo', 'motor', 'estado', 'polarizacion', 'gap', 'med_pos', 'cache',
+            'verificado', 'tiempo_lectura', 'tiempo_compilacion', 'tiempo_solucion',
+            'tiempo_total', 'error']
+
+# Estados definitivos que vale la pena guardar en la cache
+ESTADOS_DEFINITIVOS = ('OPTIMO', 'INSATISFACIBLE')
+
+# Maximo de segundos entre consultas a la bitacora mientras un fallo espera
+# su reintento
+ESPERA_SONDEO = 5
+
+# Fraccion del timeout que puede usar el plan heuristico inicial
+FRACCION_HEURISTICA = 0.1
+
+
+def expandir_entradas(entradas):
+    """
+    Convierte una lista de directorios, archivos y patrones glob en la
+    lista ordenada de archivos .txt a resolver, sin repetidos
+    """
+
+    archivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            archivos.extend(glob.glob(os.path.join(entrada, "*.txt")))
+        else:
+            archivos.extend(glob.glob(entrada))
+    return sorted(set(archivos))
+
+
+def _tiempo_heuristica(timeout):
+    """Segundos del plan heuristico inicial dentro del timeout de una instancia"""
+    return min(TIEMPO_HEURISTICA, timeout * FRACCION_HEURISTICA)
+
+
+def _resolver_minizinc(datos, timeout, cache_fzn=None, cancelar=None):
+    """
+    Resuelve una instancia con MiniZinc pasando los datos en memoria; antes
+    se aplica el presolve, asi que se usa el modelo parametrico con solo los
+    arcos alcanzables (su FlatZinc se reutiliza entre instancias con los
+    mismos n, m, v y arcos). Si se agota el tiempo se conserva la mejor solucion
+    encontrada. El plan heuristico se pasa como cota superior y es la
+    respuesta de respaldo si MiniZinc no encuentra nada (por tiempo o
+    cancelacion); su tiempo se descuenta del timeout
+
+    Retorna:
+        Diccionario con las llaves estado, polarizacion, med_pos, p_prime y
+        movimientos (None si no hubo solucion), gap, stdout y
+        tiempo_compilacion (solo con cache_fzn)
+    """
+
+    inicio = time.perf_counter()
+    heuristico = resolver_heuristico(datos, _tiempo_heuristica(timeout))
+    cota_superior = heuristico.get('polarizacion')
+    arcos = presolve(datos)['arcos']
+    restante = max(timeout - (time.perf_counter() - inicio), 0.0)
+    resultado = resolver_anytime(RUTA_MZN_PARAMETRICO, timeout=restante, cota=cota_global(datos),
+                                 salida_json=True, cota_superior=cota_superior,
+                                 texto_dzn=dzn_parametrico(datos, arcos),
+                                 parametros=parametros_parametrico(datos, arcos),
+                                 cache_fzn=cache_fzn, arcos=arcos, cancelar=cancelar)
+
+    if resultado['estado'] == 'ERROR':
+        raise RuntimeError(resultado['stderr'].strip() or "MiniZinc termino con error")
+    if resultado['estado'] in ('TIMEOUT', 'CANCELADO') and cota_superior is not None:
+        salida = Resultado.desde_nativo(heuristico).a_dict()
+        cota = cota_global(datos)
+        gap = max(0.0, (cota_superior - cota) / cota_superior) if cota_superior > 0 else 0.0
+        salida.update(gap=gap, stdout="", tiempo_compilacion=resultado['tiempo_compilacion'])
+        return salida
+
+    if resultado['resultado'] is not None:
+        salida = resultado['resultado'].a_dict()
+    else:
+        salida = {'estado': resultado['estado'], 'polarizacion': None}
+    salida.update(gap=resultado['gap'], stdout=resultado['stdout'],
+                  tiempo_compilacion=resultado['tiempo_compilacion'])
+    return salida
+
+
+def clave_motor(datos, motor):
+    """Calcula la llave de cache de una instancia para el motor indicado"""
+    archivos = ARCHIVOS_MOTOR.get(motor, ARCHIVOS_MOTOR['minizinc'])
+    return clave_cache(datos, archivos, {'motor': motor})
+
+
+def resolver_datos(fila, datos, motor='nativo', timeout=60, ruta_cache=None, verificacion=False,
+                   gap=0.0, cancelar=None):
+    """
+    Resuelve una instancia ya leida y completa las columnas de fila con el
+    resultado (estado, polarizacion, gap, med_pos, cache, verificado,
+    tiempo_compilacion, tiempo_solucion y error)
+
+    Los parametros motor, timeout, ruta_cache, verificacion y gap son los
+    de resolver_archivo; timeout limita a todos los motores. cancelar es un
+    threading.Event opcional (o un proxy de multiprocessing.Manager) que
+    detiene el motor nativo o MiniZinc con su mejor solucion. Los errores
+    del solver se propagan como excepciones.
+
+    Retorna:
+        El resultado del motor (con el plan de movimientos), tal como lo
+        entrega el solver o la cache
+    """
+
+    inicio_solucion = time.perf_counter()
+    cache = CacheResultados(ruta_cache) if ruta_cache else None
+    resultado = None
+    if cache is not None:
+        clave = clave_motor(datos, motor)
+        resultado = cache.obtener(clave)
+        fila['cache'] = 'HIT' if resultado is not None else 'MISS'
+
+    if resultado is None:
+        if motor == 'nativo':
+            inicial = resolver_heuristico(datos, _tiempo_heuristica(timeout))
+            restante = max(timeout - (time.perf_counter() - inicio_solucion), 0.0)
+            resultado = resolver_acotado(datos, inicial=inicial, gap=gap, tiempo_max=restante,
+                                         cancelar=cancelar)
+        elif motor == 'heuristico':
+            resultado = resolver_heuristico(datos, min(TIEMPO_HEURISTICA, timeout))
+        else:
+            cache_fzn = CacheCompilacion(os.path.join(ruta_cache, "fzn")) if ruta_cache else None
+            resultado = _resolver_minizinc(datos, timeout, cache_fzn, cancelar)
+        # Una solucion que no pasa la verificacion no se guarda, aunque no
+        # se haya pedido verificar
+        errores = verificar(datos, resultado) if verificacion or cache is not None else []
+        if cache is not None and resultado['estado'] in ESTADOS_DEFINITIVOS and not errores:
+            cache.guardar(clave, resultado)
+    elif verificacion:
+        errores = verificar(datos, resultado)
+
+    fila['estado'] = resultado['estado']
+    fila['polarizacion'] = resultado.get('polarizacion')
+    fila['gap'] = 0.0 if resultado['estado'] == 'OPTIMO' else resultado.get('gap')
+    fila['med_pos'] = resultado.get('med_pos')
+    if fila['cache'] != 'HIT':
+        fila['tiempo_compilacion'] = resultado.get('tiempo_compilacion')
+    fila['tiempo_solucion'] = time.perf_counter() - inicio_solucion
+
+    if verificacion:
+        fila['verificado'] = not errores
+        if errores:
+            fila['error'] = "; ".join(errores)
+    return resultado
+
+
+def resolver_archivo(archivo, motor='nativo', timeout=60, ruta_cache=None, verificacion=False,
+                     gap=0.0):
+    """
+    Lee y resuelve un archivo de instancia
+
+    Parametros:
+        archivo: ruta del .txt de la instancia
+        motor: 'nativo', 'heuristico' o 'minizinc'
+        timeout: segundos maximos por instancia, para cualquier motor; el
+                 nativo se detiene con su mejor solucion y su gap
+        ruta_cache: directorio de la cache de resultados (None para no usarla);
+                    con MiniZinc tambien guarda ahi el modelo aplanado
+        verificacion: recalcular la solucion (tambien las de la cache) con
+                      evaluador.verificar; el resultado va en la columna
+                      verificado y los problemas en la columna error
+        gap: gap aceptable del motor nativo; con un valor mayor que 0 se
+             detiene antes de probar el optimo (estado 'SOLUCION')
+
+    Retorna:
+        Diccionario con las columnas de COLUMNAS; los errores de lectura o
+        del solver quedan en la columna error con estado 'ERROR'
+    """
+
+    fila = dict.fromkeys(COLUMNAS)
+    fila.update(archivo=archivo, motor=motor)
+
+    inicio = time.perf_counter()
+    try:
+        datos = leer_txt(archivo)
+        fila['tiempo_lectura'] = time.perf_counter() - inicio
+        resolver_datos(fila, datos, motor, timeout, ruta_cache, verificacion, gap)
+    except Exception as e:
+        fila['estado'] = 'ERROR'
+        fila['error'] = str(e)
+
+    fila['tiempo_total'] = time.perf_counter() - inicio
+    return fila
+
+
+def ejecutar_lote(archivos, motor='nativo', procesos=None, timeout=60, ruta_cache=None,
+                  verificacion=False, gap=0.0):
+    """
+    Resuelve una lista de instancias en un pool de procesos
+
+    Parametros:
+        archivos: lista de rutas .txt
+        motor: 'nativo', 'heuristico' o 'minizinc'
+        procesos: numero de trabajadores (por defecto, uno por nucleo)
+        timeout: segundos maximos por instancia
+        ruta_cache: directorio de la cache de resultados (None para no usarla)
+        verificacion: verificar cada solucion con evaluador.verificar
+        gap: gap aceptable del motor nativo (0 para resolver hasta el optimo)
+
+    Retorna:
+        Lista de filas (diccionarios) en el mismo orden que archivos
+    """
+
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as pool:
+        futuros = [pool.submit(resolver_archivo, archivo, motor, timeout, ruta_cache, verificacion,
+                               gap)
+                   for archivo in archivos]
+        return [futuro.result() for futuro in futuros]
+
+
+def clave_trabajo(archivo, motor='nativo', timeout=60, verificacion=False, gap=0.0):
+    """
+    Llave de una instancia en la bitacora: hash del contenido del archivo
+    y de la configuracion del lote, asi que una instancia editada o
+    resuelta con otras opciones es un trabajo nuevo
+    """
+
+    llave = hashlib.sha256()
+    try:
+        with open(archivo, 'rb') as f:
+            llave.update(f.read())
+    except OSError:
+        # El error de lectura se reporta al resolverla
+        llave.update(archivo.encode())
+    config = {'motor': motor, 'timeout': timeout, 'verificacion': verificacion, 'gap': gap}
+    llave.update(json.dumps(config, sort_keys=True).encode())
+    return llave.hexdigest()
+
+
+def trabajar(ruta_bitacora, trabajos, motor='nativo', timeout=60, ruta_cache=None,
+             verificacion=False, gap=0.0, max_intentos=MAX_INTENTOS, limite=None):
+    """
+    Ciclo de un trabajador: reclama en la bitacora la siguiente instancia
+    pendiente, la resuelve y registra el resultado, hasta que no quede nada
+    pendiente o se alcance el instante limite (time.time())
+
+    Parametros:
+        ruta_bitacora: directorio de la bitacora
+        trabajos: lista de tuplas (clave, archivo)
+        max_intentos: intentos por instancia; los demas parametros son los
+                      de resolver_archivo
+    """
+
+    bitacora = Bitacora(ruta_bitacora)
+    while limite is None or time.time() < limite:
+        bitacora.actualizar()
+        pendientes = [(clave, archivo) for clave, archivo in trabajos
+                      if bitacora.pendiente(clave, max_intentos)]
+        if not pendientes:
+            return
+
+        for clave, archivo in pendientes:
+            if bitacora.disponible(clave, max_intentos) and bitacora.reclamar(clave, max_intentos):
+                break
+        else:
+            # Nada que tomar: si algun fallo espera su reintento se duerme
+            # hasta entonces; si todo lo pendiente lo tienen otros
+            # trabajadores, ellos lo terminan (o se retoma al reanudar)
+            reintentos = [bitacora.proximo_intento(clave) for clave, _ in pendientes
+                          if bitacora.estado(clave)['fallos']]
+            if not reintentos:
+                return
+            time.sleep(min(max(min(reintentos) - time.time(), 0.0) + 0.01, ESPERA_SONDEO))
+            continue
+
+        intento = bitacora.iniciar(clave, archivo)
+        with bitacora.trabajando(clave):
+            fila = resolver_archivo(archivo, motor, timeout, ruta_cache, verificacion, gap)
+            # Registrar antes de liberar el reclamo, para que nadie lo retome
+            evento = 'FALLO' if fila['estado'] == 'ERROR' else 'TERMINADO'
+            bitacora.registrar(evento, clave, intento=intento, fila=fila)
+
+
+def filas_bitacora(ruta_bitacora, archivos, claves, motor='nativo'):
+    """
+    Tabla de resultados de un lote a partir de su bitacora
+
+    Retorna:
+        Lista de filas en el mismo orden que archivos; las instancias sin
+        resultado quedan con estado 'PENDIENTE'
+    """
+
+    bitacora = Bitacora(ruta_bitacora)
+    filas = []
+    for archivo, clave in zip(archivos, claves):
+        trabajo = bitacora.estado(clave)
+        if trabajo['fila'] is not None:
+            filas.append(dict(trabajo['fila'], archivo=archivo))
+            continue
+        fila = dict.fromkeys(COLUMNAS)
+        fila.update(archivo=archivo, motor=motor, estado='PENDIENTE')
+        if trabajo['intentos']:
+            fila['error'] = f"sin resultado tras {trabajo['intentos']} intentos"
+        filas.append(fila)
+    return filas
+
+
+def ejecutar_lote_reanudable(archivos, ruta_bitacora, motor='nativo', procesos=None, timeout=60,
+                             ruta_cache=None, verificacion=False, gap=0.0,
+                             max_intentos=MAX_INTENTOS, duracion=None):
+    """
+    Resuelve una lista de instancias registrando el avance en una bitacora
+
+    Lanza procesos trabajadores independientes (ver trabajar); si uno
+    muere, por ejemplo por falta de memoria, se reemplaza y su instancia se
+    retoma cuando vence su reclamo. Otras maquinas pueden ejecutar el mismo
+    lote con la misma bitacora al mismo tiempo.
+
+    Parametros:
+        ruta_bitacora: directorio de la bitacora (se crea si no existe)
+        max_intentos: intentos por instancia antes de darla por fallida
+        duracion: segundos tras los que no se empiezan instancias nuevas
+                  (None para no limitar); las que queden se retoman en la
+                  siguiente ejecucion
+        Los demas parametros son los de ejecutar_lote
+
+    Retorna:
+        Lista de filas (diccionarios) en el mismo orden que archivos,
+        incluidas las que resolvieron ejecuciones anteriores u otros
+        trabajadores
+    """
+
+    claves = [clave_trabajo(archivo, motor, timeout, verificacion, gap) for archivo in archivos]
+    trabajos = list(dict(zip(claves, archivos)).items())
+    limite = time.time() + duracion if duracion else None
+    argumentos = (ruta_bitacora, trabajos, motor, timeout, ruta_cache, verificacion, gap,
+                  max_intentos, limite)
+
+    def iniciar():
+        proceso = multiprocessing.Process(target=trabajar, args=argumentos)
+        proceso.start()
+        return proceso
+
+    activos = [iniciar() for _ in range(min(procesos or os.cpu_count(), len(trabajos)))]
+    # Cada caida consume un intento de alguna instancia, asi que no puede
+    # haber mas reemplazos que intentos
+    reemplazos = len(trabajos) * max_intentos
+    while activos:
+        wait([proceso.sentinel for proceso in activos])
+        for proceso in [proceso for proceso in activos if proceso.exitcode is not None]:
+            activos.remove(proceso)
+            if proceso.exitcode != 0 and reemplazos > 0 and (limite is None or time.time() < limite):
+                reemplazos -= 1
+                activos.append(iniciar())
+
+    return filas_bitacora(ruta_bitacora, archivos, claves, motor)
+
+
+def registrar_metricas(filas, ruta=RUTA_METRICAS):
+    """Agrega al log de metricas una corrida por fila, con sus tiempos por fase"""
+    registro = RegistroMetricas(ruta)
+    for fila in filas:
+        corrida = registro.nueva(fila['motor'], origen=fila['archivo'])
+        corrida.medir('lectura', fila['tiempo_lectura'])
+        corrida.medir('aplanado', fila['tiempo_compilacion'])
+        corrida.medir('solucion', fila['tiempo_solucion'])
+        corrida.terminar(fila['estado'], fila['polarizacion'], fila['tiempo_total'])
+        registro.guardar(corrida)
+
+
+def guardar_resultados(filas, salida):
+    """Guarda la tabla de resultados en CSV o JSON segun la extension de salida"""
+    if salida.lower().endswith(".json"):
+        with open(salida, 'w') as f:
+            json.dump(filas, f, indent=2)
+    else:
+        with open(salida, 'w', newline='') as f:
+            escritor = csv.DictWriter(f, fieldnames=COLUMNAS)
+            escritor.writeheader()
+            escritor.writerows(filas)
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Resuelve instancias MinPol por lotes")
+    argumentos.add_argument("entradas", nargs="+",
+                            help="directorios, archivos o patrones glob (ej. '../DatosProyecto/*.txt')")
+    argumentos.add_argument("--motor", choices=['nativo', 'heuristico', 'minizinc'], default='nativo')
+    argumentos.add_argument("--procesos", type=int, default=None,
+                            help="numero de trabajadores (por defecto, uno por nucleo)")
+    argumentos.add_argument("--timeout", type=float, default=60,
+                            help="segundos maximos por instancia (cualquier motor)")
+    argumentos.add_argument("--salida", default="resultados.csv",
+                            help="archivo .csv o .json con la tabla de resultados")
+    argumentos.add_argument("--cache", nargs="?", const=RUTA_CACHE, default=None,
+                            help="usar la cache de resultados (directorio opcional)")
+    argumentos.add_argument("--verificar", action="store_true",
+                            help="recalcular cada solucion y comprobar sus restricciones")
+    argumentos.add_argument("--gap", type=float, default=0.0,
+                            help="gap aceptable del motor nativo (0.05 = 5%%)")
+    argumentos.add_argument("--metricas", nargs="?", const=RUTA_METRICAS, default=None,
+                            help="agregar los tiempos por fase al log de metricas (archivo opcional)")
+    argumentos.add_argument("--bitacora", default=None,
+                            help="directorio de la bitacora para reanudar el lote y repartirlo entre maquinas")
+    argumentos.add_argument("--intentos", type=int, default=MAX_INTENTOS,
+                            help="intentos por instancia con --bitacora")
+    argumentos.add_argument("--duracion", type=float, default=None,
+                            help="segundos tras los que no se empiezan instancias nuevas (con --bitacora)")
+    args = argumentos.parse_args()
+
+    archivos = expandir_entradas(args.entradas)
+    if not archivos:
+        print("No se encontraron instancias")
+        raise SystemExit(1)
+
+    inicio = time.perf_counter()
+    if args.bitacora:
+        filas = ejecutar_lote_reanudable(archivos, args.bitacora, args.motor, args.procesos,
+                                         args.timeout, args.cache, args.verificar, args.gap,
+                                         args.intentos, args.duracion)
+    else:
+        filas = ejecutar_lote(archivos, args.motor, args.procesos, args.timeout, args.cache,
+                              args.verificar, args.gap)
+    guardar_resultados(filas, args.salida)
+    if args.metricas:
+        registrar_metricas(filas, args.metricas)
+
+    for fila in filas:
+        print(f"{os.path.basename(fila['archivo'])}: {fila['estado']} "
+              f"{fila['polarizacion'] if fila['polarizacion'] is not None else ''}")
+    print(f"\n{len(filas)} instancias resueltas en {time.perf_counter() - inicio:.2f}s")
+    if args.bitacora:
+        pendientes = sum(1 for fila in filas if fila['estado'] == 'PENDIENTE')
+        fallidas = sum(1 for fila in filas if fila['estado'] == 'ERROR')
+        print(f"Bitacora: {pendientes} pendientes y {fallidas} fallidas; las que aun tienen "
+              f"intentos se retoman al volver a ejecutar con --bitacora {args.bitacora}")
+    if args.cache:
+        aciertos = sum(1 for fila in filas if fila['cache'] == 'HIT')
+        print(f"Cache: {aciertos} aciertos, {len(filas) - aciertos} fallos")
+    if args.verificar:
+        fallidas = sum(1 for fila in filas if fila['verificado'] is False)
+        print(f"Verificacion: {fallidas} soluciones con problemas")
+    print(f"Resultados guardados en {args.salida}")
+    if args.metricas:
+        print(f"Metricas agregadas a {args.metricas}")
@@ -1,14 +1,39 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-import subprocess
 import os
-from parser import txt_to_dzn
+import queue
+import threading
+from parser import Instancia
+from solver_nativo import formatear_salida
+from incremental import ResolucionIncremental, formatear_informe
+from heuristica import resolver_heuristico
+from portafolio import resolver_portafolio, SOLVERS_PORTAFOLIO
+from anytime import resolver_anytime, cota_global, formatear_traza
+from cache import CacheResultados
+from presolve import presolve, dzn_parametrico, parametros_parametrico, RUTA_MZN_PARAMETRICO
+from escalado import dzn_entero
+from compilacion import CacheCompilacion
+from lote import clave_motor, ESTADOS_DEFINITIVOS
+from evaluador import verificar
+from servicio import ClienteServicio, direccion_servicio
+from metricas import RegistroMetricas, formatear_resumen
+from editor_resistencias import (ModeloResistencias, GrillaResistencias, leer_tabla,
+                                 validar_columnas)
 
 # RUTAS
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RUTA_TXT = os.path.join(BASE_DIR, "..", "Mis Instancias")
 RUTA_DZN = os.path.join(BASE_DIR, "..", "DatosProyecto.dzn")
 RUTA_MZN = os.path.join(BASE_DIR, "..", "Proyecto.mzn")
+RUTA_MZN_ENTERO = os.path.join(BASE_DIR, "..", "ProyectoEntero.mzn")
+
+# Maximo de opiniones que se pueden editar en la GUI
+MAX_OPINIONES_GUI = 100000
+
+# Segundos de cada espera al servicio (entre una y otra se revisa el boton
+# Cancelar) y limite para que el servicio responda un mensaje
+SONDEO_SERVICIO = 0.5
+TIMEOUT_SERVICIO = 10
 
 # COLORES Y ESTILOS
 COLORES = {
@@ -38,8 +63,28 @@ class MinPolGUI:
 
         # Variable para almacenar la ruta del archivo seleccionado
         self.archivo_txt = None
-        # Lista para almacenar los campos de entrada de resistencias
-        self.res_entries = []
+        # Ultima instancia convertida o generada, en memoria, y sus datos
+        # como diccionario (para el motor nativo y la heuristica)
+        self.instancia = None
+        self.datos = None
+        # Matriz de resistencias de la GUI (array plano de 3 * m enteros)
+        self.modelo_res = ModeloResistencias()
+        # Cache en disco de resultados ya calculados
+        self.cache = CacheResultados()
+        # Cache en disco del modelo ya aplanado (FlatZinc)
+        self.cache_fzn = CacheCompilacion()
+        # Tiempos por fase y estadisticas del solver de cada ejecucion
+        self.metricas = RegistroMetricas()
+        # Sesion del motor nativo: reutiliza el plan y las cotas de la ultima instancia
+        self.incremental = ResolucionIncremental()
+
+        # Cola de tareas que se ejecutan en un hilo aparte para no
+        # bloquear la ventana, y cola de mensajes de ese hilo hacia Tk
+        self.trabajos = queue.Queue()
+        self.mensajes = queue.Queue()
+        self.pendientes = 0
+        self.tarea_actual = None
+        self.cancelar = threading.Event()
 
         # Configurar estilos visuales de los componentes
         self.configurar_estilos()
@@ -72,6 +117,10 @@ class MinPolGUI:
         # Mensaje inicial en la consola
         self.log("Sistema iniciado correctamente. Listo para optimizar politicas.")
 
+        # Iniciar el hilo de trabajo y la lectura de sus mensajes
+        threading.Thread(target=self._trabajador, daemon=True).start()
+        self.root.after(50, self.procesar_mensajes)
+
     # --------------------------------------------------
     def configurar_estilos(self):
         """Configura los estilos visuales de los componentes ttk"""
@@ -173,6 +222,70 @@ class MinPolGUI:
         btn_execute.bind('<Enter>', lambda e: e.widget.config(bg='#E64A19'))
         btn_execute.bind('<Leave>', lambda e: e.widget.config(bg=COLORES['accent']))
 
+        # Boton para resolver con el motor nativo (sin MiniZinc)
+        btn_nativo = tk.Button(btn_frame,
+                               text="Resolver Nativo",
+                               command=self.ejecutar_nativo,
+                               bg=COLORES['primary'],
+                               fg=COLORES['text_light'],
+                               font=('Segoe UI', 10, 'bold'),
+                               relief='flat',
+                               padx=20,
+                               pady=10,
+                               cursor='hand2')
+        btn_nativo.grid(row=0, column=3, padx=5)
+        btn_nativo.bind('<Enter>', lambda e: e.widget.config(bg=COLORES['primary_dark']))
+        btn_nativo.bind('<Leave>', lambda e: e.widget.config(bg=COLORES['primary']))
+
+        # Boton para lanzar varios backends de MiniZinc en carrera
+        btn_portafolio = tk.Button(btn_frame,
+                                   text="Ejecutar Portafolio",
+                                   command=self.ejecutar_portafolio,
+                                   bg=COLORES['accent'],
+                                   fg=COLORES['text_light'],
+                                   font=('Segoe UI', 10, 'bold'),
+                                   relief='flat',
+                                   padx=20,
+                                   pady=10,
+                                   cursor='hand2')
+        btn_portafolio.grid(row=0, column=4, padx=5)
+        btn_portafolio.bind('<Enter>', lambda e: e.widget.config(bg='#E64A19'))
+        btn_portafolio.bind('<Leave>', lambda e: e.widget.config(bg=COLORES['accent']))
+
+        # Boton para cancelar la ejecucion en curso
+        btn_cancelar = tk.Button(btn_frame,
+                                 text="Cancelar",
+                                 command=self.cancelar_ejecucion,
+                                 bg=COLORES['error'],
+                                 fg=COLORES['text_light'],
+                                 font=('Segoe UI', 10, 'bold'),
+                                 relief='flat',
+                                 padx=20,
+                                 pady=10,
+                                 cursor='hand2')
+        btn_cancelar.grid(row=0, column=5, padx=5)
+
+        # Boton para ver el resumen de tiempos por fase de esta sesion
+        btn_metricas = tk.Button(btn_frame,
+                                 text="Metricas",
+                                 command=self.mostrar_metricas,
+                                 bg=COLORES['bg_dark'],
+                                 fg=COLORES['text_light'],
+                                 font=('Segoe UI', 10, 'bold'),
+                                 relief='flat',
+                                 padx=20,
+                                 pady=10,
+                                 cursor='hand2')
+        btn_metricas.grid(row=0, column=6, padx=5)
+
+        # Etiqueta con la tarea en curso y las que esperan en la cola
+        self.lbl_estado = tk.Label(btn_frame,
+                                   text="En ejecucion: ninguna  |  En cola: 0",
+                                   font=('Segoe UI', 9, 'italic'),
+                                   bg='white',
+                                   fg='gray')
+        self.lbl_estado.grid(row=1, column=0, columnspan=7, pady=(10, 0))
+
     # --------------------------------------------------
     def crear_seccion_parametros(self, parent):
         """Crea la seccion de parametros del sistema"""
@@ -257,87 +370,106 @@ class MinPolGUI:
                                       borderwidth=2)
         self.frame_res.pack(side='left', fill='both', expand=True, padx=(5, 0))
 
+        # Botones para cargar la tabla completa de una vez
+        botones = tk.Frame(self.frame_res, bg='white')
+        botones.pack(fill='x', padx=10, pady=(10, 0))
+        for texto, comando in (("Pegar tabla", self.pegar_tabla),
+                               ("Importar CSV", self.importar_csv)):
+            tk.Button(botones,
+                     text=texto,
+                     command=comando,
+                     bg=COLORES['bg_light'],
+                     fg=COLORES['text_dark'],
+                     font=('Segoe UI', 9),
+                     relief='flat',
+                     padx=10,
+                     cursor='hand2').pack(side='left', padx=(0, 5))
+
         # Texto informativo inicial
-        info = tk.Label(self.frame_res,
-                       text="Ingrese 'm' y las resistencias se generaran automaticamente",
-                       font=('Segoe UI', 9, 'italic'),
-                       bg='white',
-                       fg='gray')
-        info.pack(pady=10)
+        tk.Label(self.frame_res,
+                text="Ingrese 'm', o pegue una tabla: baja,media,alta o p,v,baja,media,alta",
+                font=('Segoe UI', 9, 'italic'),
+                bg='white',
+                fg='gray').pack(pady=5)
+
+        # Grilla virtualizada: solo dibuja las filas visibles
+        self.grilla_res = GrillaResistencias(self.frame_res, self.modelo_res, COLORES)
+        self.grilla_res.pack(fill='both', expand=True, padx=10, pady=(0, 10))
 
     # --------------------------------------------------
     def crear_resistencias(self):
-        """Genera dinamicamente la matriz de resistencias segun el valor de m"""
-        # Limpiar widgets existentes
-        for w in self.frame_res.winfo_children():
-            w.destroy()
-
-        # Limpiar lista de entradas
-        self.res_entries.clear()
-
+        """Ajusta la matriz de resistencias al valor de m"""
         try:
             # Obtener y validar el valor de m
             m_value = self.entry_m.get()
             if m_value == "Numero de opiniones posibles" or not m_value:
                 return
             m = int(m_value)
-            if m <= 0 or m > 20:
+            if m <= 0 or m > MAX_OPINIONES_GUI:
                 return
         except ValueError:
             return
 
-        # Crear canvas con scroll para la matriz
-        canvas = tk.Canvas(self.frame_res, bg='white', highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self.frame_res, orient="vertical", command=canvas.yview)
-        scrollable = tk.Frame(canvas, bg='white')
+        self.modelo_res.redimensionar(m)
+        self.grilla_res.redibujar()
 
-        # Configurar el scroll
-        scrollable.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+    # --------------------------------------------------
+    def _fijar_campo(self, entry, texto):
+        """Reemplaza el contenido de un campo (quitando el placeholder)"""
+        entry.delete(0, tk.END)
+        entry.insert(0, texto)
+        entry.config(fg=COLORES['text_dark'])
 
-        canvas.create_window((0, 0), window=scrollable, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        # Crear encabezados de la matriz
-        tk.Label(scrollable, text="", bg='white', width=8).grid(row=0, column=0)
-        for idx, nivel in enumerate(['Baja', 'Media', 'Alta'], 1):
-            tk.Label(scrollable,
-                    text=nivel,
-                    font=('Segoe UI', 9, 'bold'),
-                    bg=COLORES['bg_light'],
-                    fg=COLORES['text_dark'],
-                    relief='flat',
-                    padx=10,
-                    pady=5).grid(row=0, column=idx, padx=2, pady=5)
-
-        # Crear filas de resistencias para cada opinion
-        for i in range(m):
-            # Etiqueta de la opinion
-            tk.Label(scrollable,
-                    text=f"Op {i+1}",
-                    font=('Segoe UI', 9, 'bold'),
-                    bg='white',
-                    fg=COLORES['text_dark']).grid(row=i+1, column=0, pady=2)
-            
-            # Crear tres campos de entrada (baja, media, alta)
-            fila = []
-            for j in range(3):
-                e = tk.Entry(scrollable,
-                           width=8,
-                           font=('Segoe UI', 9),
-                           relief='solid',
-                           borderwidth=1,
-                           justify='center')
-                e.grid(row=i+1, column=j+1, padx=2, pady=2)
-                e.insert(0, "0")
-                fila.append(e)
-            self.res_entries.append(fila)
-
-        # Empaquetar canvas y scrollbar
-        canvas.pack(side="left", fill="both", expand=True, padx=10, pady=10)
-        scrollbar.pack(side="right", fill="y")
+    # --------------------------------------------------
+    def pegar_tabla(self):
+        """Carga la tabla de resistencias (y opcionalmente p y v) del portapapeles"""
+        try:
+            texto = self.root.clipboard_get()
+        except tk.TclError:
+            messagebox.showwarning("Advertencia", "El portapapeles esta vacio")
+            return
+        self.importar_tabla(texto)
+
+    # --------------------------------------------------
+    def importar_csv(self):
+        """Carga la tabla de resistencias (y opcionalmente p y v) de un archivo CSV"""
+        ruta = filedialog.askopenfilename(title="Seleccionar tabla",
+                                          filetypes=[("CSV", "*.csv"), ("Texto", "*.txt"),
+                                                     ("Todos", "*.*")])
+        if not ruta:
+            return
+        try:
+            with open(ruta, 'r') as f:
+                texto = f.read()
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo leer el archivo: {str(e)}")
+            return
+        self.importar_tabla(texto)
+
+    # --------------------------------------------------
+    def importar_tabla(self, texto):
+        """
+        Valida la tabla completa y, si no tiene errores, la carga en la
+        grilla; con 5 columnas tambien completa m, p, v (y n si esta vacio)
+        """
+        try:
+            p, v, filas = leer_tabla(texto)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Error en la tabla:\n{str(e)}")
+            self.log(f"Error en la tabla: {str(e)}")
+            return
+
+        self.modelo_res.cargar(filas)
+        self._fijar_campo(self.entry_m, str(len(filas)))
+        if p is not None:
+            self._fijar_campo(self.entry_p, ",".join(str(x) for x in p))
+            self._fijar_campo(self.entry_v, ",".join(str(x) for x in v))
+            if self.entry_n.get() in ("", "Numero total de personas"):
+                self._fijar_campo(self.entry_n, str(sum(p)))
+        self.grilla_res.primera = 0
+        self.grilla_res.redibujar()
+        self.log(f"Tabla importada: {len(filas)} opiniones"
+                 f"{' (con p y v)' if p is not None else ''}")
 
     # --------------------------------------------------
     def crear_boton_generar(self, parent):
@@ -405,16 +537,54 @@ class MinPolGUI:
             messagebox.showwarning("Advertencia", "Debe seleccionar un archivo .txt primero")
             return
 
-        if txt_to_dzn(self.archivo_txt, RUTA_DZN):
-            self.log("DatosProyecto.dzn actualizado exitosamente desde archivo .txt")
-            messagebox.showinfo("Exito", "Conversion completada correctamente")
-        else:
-            self.log("Error al convertir el archivo")
+        corrida = self.metricas.nueva('conversion', origen=os.path.basename(self.archivo_txt))
+        try:
+            with corrida.fase('lectura'):
+                with open(self.archivo_txt, 'r') as f:
+                    instancia = Instancia.desde_texto(f.read())
+            with corrida.fase('escritura_dzn'):
+                self.cargar_instancia(instancia)
+        except (OSError, IndexError, ValueError) as e:
+            self.log(f"Error al convertir el archivo: {str(e)}")
             messagebox.showerror("Error", "No se pudo convertir el archivo")
+            corrida.terminar('ERROR')
+            self.metricas.guardar(corrida)
+            return
+        corrida.terminar('OK')
+        self.metricas.guardar(corrida)
+
+        self.log("DatosProyecto.dzn actualizado exitosamente desde archivo .txt")
+        messagebox.showinfo("Exito", "Conversion completada correctamente")
+
+    # --------------------------------------------------
+    def cargar_instancia(self, instancia):
+        """
+        Deja la instancia en memoria para las siguientes ejecuciones y la
+        exporta a DatosProyecto.dzn (solo como copia para usar el modelo
+        fuera de la GUI; los solvers reciben los datos en memoria)
+        """
+        self.instancia = instancia
+        self.datos = instancia.a_datos()
+        with open(RUTA_DZN, 'w') as f:
+            f.write(instancia.a_dzn())
+
+    # --------------------------------------------------
+    def datos_dzn(self):
+        """
+        Retorna el texto .dzn de la instancia actual; si no se cargo
+        ninguna en esta sesion se usa el DatosProyecto.dzn existente, o
+        None si tampoco existe
+        """
+        if self.instancia is not None:
+            return self.instancia.a_dzn()
+        if os.path.exists(RUTA_DZN):
+            with open(RUTA_DZN, 'r') as f:
+                return f.read()
+        return None
 
     # --------------------------------------------------
     def generar_desde_gui(self):
-        """Genera el archivo dzn a partir de los datos ingresados en la GUI"""
+        """Genera la instancia a partir de los datos ingresados en la GUI"""
         try:
             # Funcion auxiliar para obtener valores limpiando placeholders
             def get_value(entry, placeholder):
@@ -434,32 +604,21 @@ class MinPolGUI:
                 raise ValueError("Todos los campos son obligatorios")
 
             # Validar que el numero de resistencias coincida con m
-            if len(self.res_entries) != int(m):
+            if self.modelo_res.m != int(m):
                 raise ValueError("Numero incorrecto de filas de resistencias")
 
-            # Construir el contenido del archivo temporal
-            lineas = [n, m, p, v]
-
-            # Agregar las filas de resistencias
-            for fila in self.res_entries:
-                lineas.append(",".join(e.get() for e in fila))
-
-            lineas.append(ct)
-            lineas.append(maxMovs)
-
-            # Crear archivo temporal con los datos
-            temp_txt = os.path.join(BASE_DIR, "entrada_gui_temp.txt")
-
-            with open(temp_txt, "w") as f:
-                f.write("\n".join(lineas))
-
-            # Convertir el archivo temporal a dzn
-            if txt_to_dzn(temp_txt, RUTA_DZN):
-                self.log("DatosProyecto.dzn generado exitosamente desde la GUI")
-                messagebox.showinfo("Exito", "Archivo generado correctamente")
-            else:
-                self.log("Error al generar desde la GUI")
-                messagebox.showerror("Error", "No se pudo generar el archivo")
+            # Revisar p, v y las resistencias en una sola pasada y construir
+            # la instancia directamente desde el modelo de la grilla
+            n, p, v = int(n), [int(x) for x in p.split(',')], [float(x) for x in v.split(',')]
+            resistencias = self.modelo_res.filas()
+            errores = validar_columnas(n, p, v, resistencias)
+            if errores:
+                raise ValueError("\n".join(errores))
+            instancia = Instancia(n, int(m), p, v, resistencias, float(ct), float(maxMovs))
+            instancia.validar()
+            self.cargar_instancia(instancia)
+            self.log("DatosProyecto.dzn generado exitosamente desde la GUI")
+            messagebox.showinfo("Exito", "Archivo generado correctamente")
 
         except Exception as e:
             messagebox.showerror("Error", f"Error en los datos: {str(e)}")
@@ -467,45 +626,461 @@ class MinPolGUI:
 
     # --------------------------------------------------
     def ejecutar_modelo(self):
-        """Ejecuta el modelo MiniZinc con el archivo dzn generado"""
-        # Validar que existe el archivo dzn
-        if not os.path.exists(RUTA_DZN):
+        """Encola una ejecucion del modelo MiniZinc con la instancia actual"""
+        # Tomar los datos ahora, para que la ejecucion en cola no dependa
+        # de cambios posteriores en la instancia
+        texto_dzn = self.datos_dzn()
+        if texto_dzn is None:
             messagebox.showwarning("Advertencia", "No existe DatosProyecto.dzn")
             return
 
+        # Con MINPOL_SERVICIO configurado y la instancia en memoria, el
+        # servicio resuelve con su motor minizinc (sin salida en vivo)
+        if direccion_servicio() and self.datos is not None:
+            datos = self.datos
+
+            def local():
+                arcos = presolve(datos)['arcos']
+                self._correr_minizinc(RUTA_MZN_PARAMETRICO, dzn_parametrico(datos, arcos),
+                                      clave_motor(datos, 'minizinc'), datos,
+                                      parametros=parametros_parametrico(datos, arcos))
+
+            self.log("\n" + "="*60)
+            self.log("Ejecutando modelo MiniZinc en el servicio...")
+            self.log("="*60 + "\n")
+            self.encolar("Modelo MiniZinc (servicio)",
+                         lambda: self._correr_servicio(datos, 'minizinc', local))
+            return
+
+        # Consultar la cache antes de lanzar MiniZinc
+        clave = clave_motor(self.datos, 'minizinc') if self.datos is not None else None
+        guardado = self.cache.obtener(clave) if clave else None
+        if guardado is not None:
+            self.log("\n" + "="*60)
+            self.log("RESULTADO (cache):")
+            self.log("-" * 60)
+            self.log(guardado['stdout'])
+            self.log_cache()
+            return
+
+        # Con la instancia en memoria se aplica el presolve y se usa el
+        # modelo parametrico (su FlatZinc sirve para otros ct y p); con solo
+        # DatosProyecto.dzn, el modelo completo
+        corrida = self.metricas.nueva('minizinc', self.datos)
+        ruta_mzn = RUTA_MZN
+        parametros = None
+        if self.datos is not None:
+            with corrida.fase('presolve'):
+                reduccion = presolve(self.datos)
+            with corrida.fase('dzn'):
+                texto_dzn = dzn_parametrico(self.datos, reduccion['arcos'])
+                parametros = parametros_parametrico(self.datos, reduccion['arcos'])
+            ruta_mzn = RUTA_MZN_PARAMETRICO
+            self.log(f"Presolve: {reduccion['variables']} -> {reduccion['restantes']} "
+                     f"variables de movimiento")
+
+        # Mostrar de inmediato un plan heuristico; su polarizacion se usa
+        # como cota superior para MiniZinc y como respaldo si no termina
+        datos = self.datos
+        heuristico = None
+        if datos is not None:
+            try:
+                with corrida.fase('heuristica'):
+                    heuristico = resolver_heuristico(datos)
+            except ValueError as e:
+                self.log(f"Heuristica no disponible: {str(e)}")
+        if heuristico is not None and heuristico['estado'] == 'SOLUCION':
+            self.log(f"Solucion heuristica inmediata: polarizacion {heuristico['polarizacion']:.3f} "
+                     f"({heuristico['tiempo'] * 1000:.1f} ms)")
+        else:
+            heuristico = None
+
+        self.encolar("Modelo MiniZinc",
+                     lambda: self._correr_minizinc(ruta_mzn, texto_dzn, clave, datos, heuristico,
+                                                   corrida=corrida, parametros=parametros))
+
+    # --------------------------------------------------
+    def _correr_minizinc(self, ruta_mzn, texto_dzn, clave, datos, heuristico=None, timeout=60,
+                         corrida=None, parametros=None):
+        """
+        Ejecuta MiniZinc en el hilo de trabajo con soluciones intermedias,
+        enviando cada linea de su salida a la consola a medida que llega.
+        Si se agota el tiempo o se cancela, muestra la mejor solucion
+        encontrada y su gap (o el plan heuristico si MiniZinc no encontro
+        ninguna). Los tiempos de aplanado, solucion y lectura de la salida
+        y las estadisticas del solver quedan en la corrida de metricas.
+        parametros son los datos de ProyectoParametrico.mzn (ver
+        resolver_anytime)
+        """
+        corrida = corrida or self.metricas.nueva('minizinc', datos)
+        self.log_async("\n" + "="*60)
+        self.log_async("Ejecutando modelo MiniZinc...")
+        self.log_async("="*60 + "\n")
+
+        cota = cota_global(datos) if datos is not None else None
+        cota_superior = heuristico['polarizacion'] if heuristico is not None else None
+        self.log_async("SALIDA:")
+        self.log_async("-" * 60)
+        try:
+            resultado = resolver_anytime(
+                ruta_mzn, timeout=timeout, cota=cota,
+                texto_dzn=texto_dzn,
+                parametros=parametros,
+                cota_superior=cota_superior,
+                cache_fzn=self.cache_fzn,
+                cancelar=self.cancelar,
+                estadisticas=True,
+                al_linea=self.log_async,
+                al_mejorar=lambda t, pol: self.log_async(f">> [{t:.2f}s] nueva mejor polarizacion: {pol:.3f}")
+            )
+        except FileNotFoundError:
+            self.error_async(
+                "Error",
+                "MiniZinc no esta instalado o no se encuentra en el PATH del sistema.\n\n"
+                "Por favor instale MiniZinc desde: https://www.minizinc.org/"
+            )
+            self.log_async("MiniZinc no encontrado en el sistema")
+            return
+
+        corrida.medir('aplanado', resultado['tiempo_compilacion'])
+        corrida.medir('solucion', resultado['tiempo_solucion'])
+        corrida.medir('lectura_salida', resultado['tiempo_lectura_salida'])
+        corrida.estadisticas(resultado['estadisticas'])
+        corrida.terminar(resultado['interrupcion'] or resultado['estado'], resultado['polarizacion'])
+        self.metricas.guardar(corrida)
+
+        if resultado['interrupcion'] == 'CANCELADO':
+            self.log_async("Ejecucion cancelada por el usuario")
+        elif resultado['interrupcion'] == 'TIMEOUT':
+            self.log_async(f"Tiempo de ejecucion excedido ({timeout}s)")
+        if resultado['compilacion'] == 'CACHE':
+            self.log_async("Compilacion: modelo aplanado tomado de la cache")
+        elif resultado['compilacion'] == 'COMPILADO':
+            self.log_async(f"Compilacion: {resultado['tiempo_compilacion']:.3f}s")
+        if resultado['tiempo_solucion'] is not None:
+            self.log_async(f"Solucion: {resultado['tiempo_solucion']:.3f}s")
+        elif resultado['estado'] == 'ERROR':
+            self.log_async(f"Error al compilar el modelo: {resultado['stderr']}")
+        est = resultado['estadisticas']
+        if 'nodes' in est or 'flatIntVars' in est:
+            self.log_async(f"Estadisticas: {est.get('nodes', '-')} nodos, "
+                           f"{est.get('failures', '-')} fallos, "
+                           f"{est.get('flatIntVars', 0) + est.get('flatFloatVars', 0)} variables y "
+                           f"{est.get('flatIntConstraints', 0) + est.get('flatFloatConstraints', 0)} "
+                           f"restricciones en FlatZinc")
+
+        if resultado['polarizacion'] is None:
+            if heuristico is not None and resultado['interrupcion'] is not None:
+                self.log_async("\nRESULTADO (plan heuristico):")
+                self.log_async("-" * 60)
+                self.log_async(formatear_salida(heuristico))
+                return
+            if resultado['interrupcion'] == 'TIMEOUT':
+                self.error_async("Error", "El modelo tardo demasiado en ejecutarse")
+            return
+
+        self.log_async("\nRESULTADO:")
+        self.log_async("-" * 60)
+        self.log_async(resultado['stdout'])
+        if resultado['estado'] == 'OPTIMO':
+            self.log_async("Solucion optima")
+        elif resultado['gap'] is not None:
+            self.log_async(f"Mejor solucion encontrada (gap {resultado['gap']:.2%})")
+        else:
+            self.log_async("Mejor solucion encontrada (gap desconocido)")
+        self.log_async("Traza de la polarizacion:")
+        self.log_async(formatear_traza(resultado['traza']))
+
+        # Guardar en la cache las respuestas definitivas
+        if clave and resultado['estado'] in ESTADOS_DEFINITIVOS:
+            self.cache.guardar(clave, {'estado': resultado['estado'],
+                                       'polarizacion': resultado['polarizacion'],
+                                       'stdout': resultado['stdout']})
+
+        self.log_async("\n" + "="*60)
+        self.log_async("Ejecucion completada")
+        self.log_async("="*60 + "\n")
+
+    # --------------------------------------------------
+    def ejecutar_nativo(self):
+        """Resuelve la instancia actual con el motor nativo, sin MiniZinc"""
+        # Validar que ya se cargo una instancia
+        if self.datos is None:
+            messagebox.showwarning("Advertencia", "Debe convertir o generar una instancia primero")
+            return
+
         self.log("\n" + "="*60)
-        self.log("Ejecutando modelo MiniZinc...")
+        self.log("Ejecutando motor nativo...")
         self.log("="*60 + "\n")
 
+        # Con MINPOL_SERVICIO configurado la GUI solo envia la instancia al
+        # servicio local, que ya tiene los procesos y modelos cargados
+        if direccion_servicio():
+            datos = self.datos
+            self.encolar("Motor nativo (servicio)",
+                         lambda: self._correr_servicio(datos, 'nativo',
+                                                       lambda: self._correr_nativo(datos)))
+            return
+
+        datos = self.datos
+        self.encolar("Motor nativo", lambda: self._correr_nativo(datos))
+
+    # --------------------------------------------------
+    def _correr_nativo(self, datos):
+        """
+        Resuelve con el motor nativo en el hilo de trabajo; la cache y las
+        metricas solo se escriben desde este hilo. Al cancelar se muestra
+        la mejor solucion encontrada hasta ese momento
+        """
+        clave = clave_motor(datos, 'nativo')
+        resultado = self.cache.obtener(clave)
+        informe = None
+        if resultado is None:
+            corrida = self.metricas.nueva('nativo', datos)
+            try:
+                # Tras editar la instancia se parte del plan y las cotas de
+                # la corrida anterior en lugar de resolver desde cero
+                with corrida.fase('solucion'):
+                    resultado = self.incremental.resolver(datos, cancelar=self.cancelar)
+                informe = resultado['incremental']
+            except ValueError as e:
+                self.error_async("Error", f"Instancia invalida: {str(e)}")
+                self.log_async(f"Error: {str(e)}")
+                return
+            cancelado = self.cancelar.is_set() and resultado['estado'] not in ESTADOS_DEFINITIVOS
+            corrida.terminar('CANCELADO' if cancelado else resultado['estado'],
+                             resultado.get('polarizacion'))
+            self.metricas.guardar(corrida)
+            # Solo se guarda un plan que pasa la verificacion
+            if resultado['estado'] in ESTADOS_DEFINITIVOS and not verificar(datos, resultado):
+                self.cache.guardar(clave, resultado)
+            if cancelado:
+                self.log_async("Ejecucion cancelada por el usuario")
+                if resultado['estado'] == 'CANCELADO':
+                    return
+        else:
+            self.log_async("(resultado tomado de la cache)")
+
+        self.log_async("RESULTADO:")
+        self.log_async("-" * 60)
+        self.log_async(formatear_salida(resultado))
+        if resultado['estado'] == 'OPTIMO':
+            self.log_async(f"Mediana: opinion {resultado['med_pos']}")
+        elif resultado['estado'] == 'SOLUCION':
+            self.log_async(f"Mejor solucion encontrada (gap {resultado['gap']:.2%})")
+        if resultado.get('podadas') is not None:
+            self.log_async(f"Posiciones de la mediana: {resultado['resueltas']} resueltas, "
+                           f"{resultado['podadas']} descartadas por su cota")
+        if informe is not None:
+            self.log_async(formatear_informe(informe))
+        self.log_async(f"Tiempo: {resultado['tiempo']:.4f}s")
+        self.log_cache(self.log_async)
+
+        self.log_async("\n" + "="*60)
+        self.log_async("Ejecucion completada")
+        self.log_async("="*60 + "\n")
+
+    # --------------------------------------------------
+    def _correr_servicio(self, datos, motor='nativo', local=None):
+        """
+        Resuelve en el servicio local (hilo de trabajo). Espera el resultado
+        por tramos de SONDEO_SERVICIO para atender el boton Cancelar; un
+        trabajo en curso cancelado entrega su mejor solucion. Si el servicio
+        no responde se ejecuta local()
+        """
         try:
-            # Ejecutar MiniZinc con timeout de 60 segundos
-            resultado = subprocess.run(
-                ["minizinc", RUTA_MZN, RUTA_DZN],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            with ClienteServicio(timeout=TIMEOUT_SERVICIO) as cliente:
+                id_trabajo = cliente.enviar(datos, motor)
+                trabajo = cliente.esperar(id_trabajo, SONDEO_SERVICIO)
+                cancelado = False
+                while trabajo['estado'] in ('EN_COLA', 'EN_CURSO'):
+                    if self.cancelar.is_set() and not cancelado:
+                        cliente.cancelar(id_trabajo)
+                        self.log_async("Ejecucion cancelada por el usuario")
+                        cancelado = True
+                    trabajo = cliente.esperar(id_trabajo, SONDEO_SERVICIO)
+        except OSError as e:
+            self.log_async(f"No se pudo conectar con el servicio ({str(e)}); se resuelve localmente")
+            if local is not None:
+                local()
+            return
+        except RuntimeError as e:
+            self.error_async("Error", f"Instancia invalida: {str(e)}")
+            self.log_async(f"Error: {str(e)}")
+            return
 
-            # Mostrar la salida estandar si existe
-            if resultado.stdout:
-                self.log("RESULTADO:")
-                self.log("-" * 60)
-                self.log(resultado.stdout)
-                
-            self.log("\n" + "="*60)
-            self.log("Ejecucion completada")
-            self.log("="*60 + "\n")
+        if trabajo['estado'] == 'CANCELADO' and trabajo['resultado'] is None:
+            return
+        if trabajo['estado'] not in ('TERMINADO', 'CANCELADO'):
+            self.log_async(f"Error en el servicio: {trabajo['error']}")
+            return
+        resultado = trabajo['resultado']
+        self.log_async("RESULTADO:")
+        self.log_async("-" * 60)
+        if resultado.get('x') is not None:
+            self.log_async(formatear_salida(resultado))
+        elif resultado.get('stdout'):
+            self.log_async(resultado['stdout'])
+        else:
+            self.log_async(f"{resultado['estado']} {resultado.get('polarizacion')}")
+        if resultado.get('med_pos') is not None:
+            self.log_async(f"Mediana: opinion {resultado['med_pos']}")
+        if trabajo.get('tiempo_cola') is not None:
+            self.log_async(f"Tiempo en cola del servicio: {trabajo['tiempo_cola']:.4f}s")
+        fila = trabajo.get('fila') or {}
+        if fila.get('tiempo_total') is not None:
+            self.log_async(f"Tiempo: {fila['tiempo_total']:.4f}s")
+
+        self.log_async("\n" + "="*60)
+        self.log_async("Ejecucion completada")
+        self.log_async("="*60 + "\n")
+
+    # --------------------------------------------------
+    def mostrar_metricas(self):
+        """Muestra en la consola los tiempos por fase de las ejecuciones de la sesion"""
+        self.log("\n" + "="*60)
+        self.log("METRICAS DE LA SESION:")
+        self.log("-" * 60)
+        self.log(formatear_resumen(self.metricas.instantanea()))
+        self.log(f"Log completo: {self.metricas.ruta}")
+
+    # --------------------------------------------------
+    def log_cache(self, log=None):
+        """
+        Muestra en la consola los contadores de la cache de resultados
+        (desde el hilo de trabajo se pasa log=self.log_async)
+        """
+        est = self.cache.estadisticas()
+        (log or self.log)(f"Cache: {est['aciertos']} aciertos, {est['fallos']} fallos")
 
-        except subprocess.TimeoutExpired:
-            self.log("Tiempo de ejecucion excedido (60s)")
-            messagebox.showerror("Error", "El modelo tardo demasiado en ejecutarse")
+    # --------------------------------------------------
+    def ejecutar_portafolio(self):
+        """Encola una carrera entre varios backends de MiniZinc"""
+        texto_dzn = self.datos_dzn()
+        if texto_dzn is None:
+            messagebox.showwarning("Advertencia", "No existe DatosProyecto.dzn")
+            return
+
+        # Con la instancia en memoria se usa el modelo entero, que tambien
+        # pueden resolver los solvers sin soporte de flotantes (Chuffed)
+        ruta_mzn = RUTA_MZN
+        if self.datos is not None:
+            try:
+                texto_dzn = dzn_entero(self.datos)
+                ruta_mzn = RUTA_MZN_ENTERO
+            except ValueError as e:
+                self.log(f"Modelo entero no disponible ({str(e)}); se usa Proyecto.mzn")
+
+        self.encolar("Portafolio", lambda: self._correr_portafolio(ruta_mzn, texto_dzn))
+
+    # --------------------------------------------------
+    def _correr_portafolio(self, ruta_mzn, texto_dzn):
+        """Ejecuta el portafolio de solvers en el hilo de trabajo"""
+        self.log_async("\n" + "="*60)
+        self.log_async(f"Ejecutando portafolio: {', '.join(SOLVERS_PORTAFOLIO)}")
+        self.log_async("="*60 + "\n")
+
+        try:
+            resultado = resolver_portafolio(ruta_mzn, timeout=60, texto_dzn=texto_dzn,
+                                            cancelar=self.cancelar)
         except FileNotFoundError:
-            messagebox.showerror(
+            self.error_async(
                 "Error",
                 "MiniZinc no esta instalado o no se encuentra en el PATH del sistema.\n\n"
                 "Por favor instale MiniZinc desde: https://www.minizinc.org/"
             )
-            self.log("MiniZinc no encontrado en el sistema")
+            self.log_async("MiniZinc no encontrado en el sistema")
+            return
+
+        if resultado['estado'] == 'CANCELADO':
+            self.log_async("Ejecucion cancelada por el usuario")
+            return
+        if resultado['estado'] == 'TIMEOUT':
+            self.log_async("Tiempo de ejecucion excedido (60s)")
+            self.error_async("Error", "Ningun solver termino a tiempo")
+            return
+        if resultado['estado'] == 'ERROR':
+            for solver, error in resultado['errores'].items():
+                self.log_async(f"{solver}: {error.strip()}")
+            self.error_async("Error", "Ningun solver pudo resolver el modelo")
+            return
+
+        self.log_async("RESULTADO:")
+        self.log_async("-" * 60)
+        self.log_async(resultado['stdout'])
+        self.log_async(f"Solver ganador: {resultado['ganador']}")
+        self.log_async(f"Tiempo: {resultado['tiempo']:.4f}s")
+
+        self.log_async("\n" + "="*60)
+        self.log_async("Ejecucion completada")
+        self.log_async("="*60 + "\n")
+
+    # --------------------------------------------------
+    def encolar(self, nombre, tarea):
+        """Agrega una tarea a la cola del hilo de trabajo"""
+        self.pendientes += 1
+        self.trabajos.put((nombre, tarea))
+        self.log(f"{nombre} en cola")
+        self.actualizar_estado()
+
+    # --------------------------------------------------
+    def _trabajador(self):
+        """Ejecuta, una por una, las tareas encoladas (hilo de trabajo)"""
+        while True:
+            nombre, tarea = self.trabajos.get()
+            self.cancelar.clear()
+            self.mensajes.put(('estado', nombre))
+            try:
+                tarea()
+            except Exception as e:
+                self.log_async(f"Error en {nombre}: {str(e)}")
+            self.mensajes.put(('terminado', nombre))
+
+    # --------------------------------------------------
+    def cancelar_ejecucion(self):
+        """Cancela la ejecucion en curso; las tareas en cola siguen su turno"""
+        if self.tarea_actual is None:
+            self.log("No hay ninguna ejecucion en curso")
+            return
+        # El hilo de trabajo revisa este evento y termina el solver
+        self.cancelar.set()
+
+    # --------------------------------------------------
+    def log_async(self, texto):
+        """Envia un mensaje a la consola desde el hilo de trabajo"""
+        self.mensajes.put(('log', texto))
+
+    # --------------------------------------------------
+    def error_async(self, titulo, texto):
+        """Muestra un dialogo de error desde el hilo de trabajo"""
+        self.mensajes.put(('error', (titulo, texto)))
+
+    # --------------------------------------------------
+    def procesar_mensajes(self):
+        """Atiende en el hilo de Tk los mensajes enviados por el hilo de trabajo"""
+        try:
+            while True:
+                tipo, contenido = self.mensajes.get_nowait()
+                if tipo == 'log':
+                    self.log(contenido)
+                elif tipo == 'error':
+                    messagebox.showerror(*contenido)
+                elif tipo == 'estado':
+                    self.tarea_actual = contenido
+                    self.pendientes -= 1
+                    self.actualizar_estado()
+                elif tipo == 'terminado':
+                    self.tarea_actual = None
+                    self.actualizar_estado()
+        except queue.Empty:
+            pass
+        self.root.after(50, self.procesar_mensajes)
+
+    # --------------------------------------------------
+    def actualizar_estado(self):
+        """Actualiza la etiqueta con la tarea en curso y las pendientes"""
+        actual = self.tarea_actual or "ninguna"
+        self.lbl_estado.config(text=f"En ejecucion: {actual}  |  En cola: {self.pendientes}")
 
 # MAIN
 if __name__ == "__main__":
@@ -0,0 +1,228 @@
+"""
+Metricas de ejecucion de MinPol
+
+Cada ejecucion (de la GUI, de lote.py o de quien use el registro) es una
+Corrida con el tiempo de cada fase (lectura, escritura del .dzn, presolve,
+aplanado, solucion, lectura del resultado, ...) y las estadisticas del
+solver (nodos, fallos, variables y restricciones del FlatZinc, ...). Al
+terminar se guarda como una linea JSON en el log de metricas y queda en
+memoria para el resumen (instantanea): cantidad de corridas por motor y
+estado, y media, p50, p95 y maximo de cada fase.
+
+El log por defecto es .cache_minpol/metricas.jsonl; la variable de
+entorno MINPOL_METRICAS lo reemplaza.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from cache import RUTA_CACHE
+
+
+RUTA_METRICAS = os.environ.get('MINPOL_METRICAS') or os.path.join(RUTA_CACHE, "metricas.jsonl")
+
+# Corridas que se conservan en memoria para el resumen
+MAX_MEMORIA = 1000
+
+# Estadisticas de MiniZinc que se muestran en el resumen
+ESTADISTICAS_RESUMEN = ('flatTime', 'solveTime', 'nodes', 'failures',
+                        'flatIntVars', 'flatFloatVars', 'flatIntConstraints',
+                        'flatFloatConstraints')
+
+
+class Corrida:
+    """Tiempos por fase y estadisticas de una ejecucion"""
+
+    def __init__(self, motor, datos=None, origen=None):
+        self.registro = {
+            'fecha': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'motor': motor,
+            'origen': origen,
+            'n': datos['n'] if datos is not None else None,
+            'm': datos['m'] if datos is not None else None,
+            'estado': None,
+            'polarizacion': None,
+            'fases': {},
+            'estadisticas': {},
+            'tiempo_total': None
+        }
+        self._inicio = time.perf_counter()
+
+    # --------------------------------------------------
+    @contextmanager
+    def fase(self, nombre):
+        """Mide el bloque con with y lo suma a la fase indicada"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.medir(nombre, time.perf_counter() - inicio)
+
+    # --------------------------------------------------
+    def medir(self, nombre, segundos):
+        """Suma segundos a una fase (se ignora si segundos es None)"""
+        if segundos is not None:
+            fases = self.registro['fases']
+            fases[nombre] = fases.get(nombre, 0.0) + segundos
+
+    # --------------------------------------------------
+    def estadisticas(self, valores):
+        """Agrega estadisticas del solver (diccionario clave -> valor)"""
+        self.registro['estadisticas'].update(valores or {})
+
+    # --------------------------------------------------
+    def terminar(self, estado, polarizacion=None, tiempo_total=None):
+        """
+        Fija el resultado y el tiempo total de la corrida (por defecto, el
+        transcurrido desde que se creo)
+        """
+        self.registro['estado'] = estado
+        self.registro['polarizacion'] = polarizacion
+        self.registro['tiempo_total'] = (tiempo_total if tiempo_total is not None
+                                         else time.perf_counter() - self._inicio)
+
+
+def _percentil(valores, fraccion):
+    """Percentil de una lista ya ordenada (el valor mas cercano)"""
+    return valores[min(len(valores) - 1, int(round(fraccion * (len(valores) - 1))))]
+
+
+class RegistroMetricas:
+    """
+    Registro de corridas en memoria (las ultimas max_memoria) y en un log
+    JSON Lines (ruta=None para no escribir el log)
+    """
+
+    def __init__(self, ruta=RUTA_METRICAS, max_memoria=MAX_MEMORIA):
+        self.ruta = ruta
+        self.corridas = deque(maxlen=max_memoria)
+        self._candado = threading.Lock()
+        if ruta:
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+
+    # --------------------------------------------------
+    def nueva(self, motor, datos=None, origen=None):
+        """Crea una corrida (se registra al pasarla a guardar)"""
+        return Corrida(motor, datos, origen)
+
+    # --------------------------------------------------
+    def guardar(self, corrida):
+        """Registra una corrida (si no se termino, se termina sin estado)"""
+        registro = corrida.registro
+        if registro['tiempo_total'] is None:
+            corrida.terminar(registro['estado'], registro['polarizacion'])
+        with self._candado:
+            self.corridas.append(registro)
+            if self.ruta:
+                with open(self.ruta, 'a') as f:
+                    f.write(json.dumps(registro) + "\n")
+
+    # --------------------------------------------------
+    def instantanea(self):
+        """
+        Resumen de las corridas en memoria
+
+        Retorna:
+            Diccionario con corridas (total), por_motor y por_estado
+            (conteos), fases (n, media, p50, p95 y max en segundos),
+            estadisticas (media de ESTADISTICAS_RESUMEN) y lentas (las 5
+            corridas de mayor tiempo total)
+        """
+
+        with self._candado:
+            corridas = list(self.corridas)
+        return resumir(corridas)
+
+
+def resumir(corridas):
+    """Calcula la instantanea (ver RegistroMetricas.instantanea) de una lista de registros"""
+    por_motor, por_estado, fases, estadisticas = {}, {}, {}, {}
+    for registro in corridas:
+        por_motor[registro['motor']] = por_motor.get(registro['motor'], 0) + 1
+        por_estado[registro['estado']] = por_estado.get(registro['estado'], 0) + 1
+        for nombre, segundos in registro['fases'].items():
+            fases.setdefault(nombre, []).append(segundos)
+        for nombre in ESTADISTICAS_RESUMEN:
+            valor = registro['estadisticas'].get(nombre)
+            if isinstance(valor, (int, float)):
+                estadisticas.setdefault(nombre, []).append(valor)
+
+    resumen_fases = {}
+    for nombre, valores in fases.items():
+        valores.sort()
+        resumen_fases[nombre] = {
+            'n': len(valores),
+            'media': sum(valores) / len(valores),
+            'p50': _percentil(valores, 0.5),
+            'p95': _percentil(valores, 0.95),
+            'max': valores[-1]
+        }
+    lentas = sorted(corridas, key=lambda r: r['tiempo_total'] or 0.0, reverse=True)[:5]
+    return {
+        'corridas': len(corridas),
+        'por_motor': por_motor,
+        'por_estado': por_estado,
+        'fases': resumen_fases,
+        'estadisticas': {nombre: sum(valores) / len(valores)
+                         for nombre, valores in estadisticas.items()},
+        'lentas': lentas
+    }
+
+
+def leer_log(ruta=RUTA_METRICAS):
+    """Generador de los registros de un log de metricas (omite lineas danadas)"""
+    with open(ruta, 'r') as f:
+        for linea in f:
+            try:
+                yield json.loads(linea)
+            except ValueError:
+                continue
+
+
+def formatear_resumen(resumen):
+    """Convierte una instantanea en texto para la consola o la GUI"""
+    lineas = [f"Corridas: {resumen['corridas']}"]
+    if resumen['por_motor']:
+        lineas.append("Por motor: " + ", ".join(f"{motor} {cantidad}"
+                                                for motor, cantidad in resumen['por_motor'].items()))
+        lineas.append("Por estado: " + ", ".join(f"{estado} {cantidad}"
+                                                 for estado, cantidad in resumen['por_estado'].items()))
+    if resumen['fases']:
+        lineas.append("")
+        lineas.append(f"  {'fase':<20}{'n':>6}{'media':>11}{'p50':>11}{'p95':>11}{'max':>11}")
+        for nombre, fase in sorted(resumen['fases'].items(), key=lambda t: -t[1]['media']):
+            lineas.append(f"  {nombre:<20}{fase['n']:>6}" +
+                          "".join(f"{fase[llave] * 1000:>9.1f}ms"
+                                  for llave in ('media', 'p50', 'p95', 'max')))
+    if resumen['estadisticas']:
+        lineas.append("")
+        lineas.append("Estadisticas del solver (media):")
+        for nombre, valor in resumen['estadisticas'].items():
+            lineas.append(f"  {nombre}: {valor:.4g}")
+    if resumen['lentas']:
+        lineas.append("")
+        lineas.append("Corridas mas lentas:")
+        for registro in resumen['lentas']:
+            partes = [registro['fecha'], registro['motor']]
+            if registro['n'] is not None:
+                partes.append(f"n={registro['n']} m={registro['m']}")
+            partes += [str(registro['estado']), f"{(registro['tiempo_total'] or 0.0):.3f}s"]
+            if registro['origen']:
+                partes.append(registro['origen'])
+            lineas.append("  " + " ".join(partes))
+    return "\n".join(lineas)
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import sys
+
+    ruta = sys.argv[1] if len(sys.argv) > 1 else RUTA_METRICAS
+    if not os.path.exists(ruta):
+        print(f"No existe el log de metricas {ruta}")
+        sys.exit(1)
+    print(formatear_resumen(resumir(list(leer_log(ruta)))))
@@ -1,4 +1,372 @@
-def txt_to_dzn(input_txt, output_dzn):
+import os
+import time
+from array import array
+from dataclasses import dataclass
+
+
+def parsear_texto(texto):
+    """
+    Parsea el contenido de un .txt con el formato del proyecto MinPol
+    (ya cargado en memoria) y retorna sus datos como un diccionario
+    
+    Parametros:
+        texto: contenido completo de la instancia
+    
+    Retorna:
+        Diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        
+    Lanza IndexError o ValueError si el texto no tiene el formato esperado
+    """
+    
+    # Separar las lineas y eliminar espacios
+    lines = [line.strip() for line in texto.splitlines()]
+    
+    # Parsear los datos de las primeras lineas
+    n = int(lines[0])  # Numero total de personas
+    m = int(lines[1])  # Numero de opiniones posibles
+    
+    # Distribucion de personas por cada opinion (vector p)
+    # Separar por comas y convertir cada elemento a entero
+    p = [int(x.strip()) for x in lines[2].split(',')]
+    
+    # Valores asociados a cada opinion (vector v)
+    # Separar por comas y convertir cada elemento a flotante
+    v = [float(x.strip()) for x in lines[3].split(',')]
+    
+    # Matriz de resistencias (m filas x 3 columnas)
+    # Cada fila representa una opinion
+    # Cada columna representa un nivel de resistencia (baja, media, alta)
+    resistencias = []
+    for i in range(4, 4 + m):
+        fila = [int(x.strip()) for x in lines[i].split(',')]
+        resistencias.append(fila)
+    
+    # Costo total maximo permitido
+    ct = float(lines[4 + m])
+    
+    # Numero maximo de movimientos permitidos
+    maxMovs = int(lines[5 + m])
+    
+    return {
+        'n': n,
+        'm': m,
+        'p': p,
+        'v': v,
+        's': resistencias,
+        'ct': ct,
+        'maxMovs': maxMovs
+    }
+
+
+def leer_txt(input_txt):
+    """
+    Lee un archivo .txt con el formato del proyecto MinPol y retorna
+    sus datos como un diccionario
+    
+    Parametros:
+        input_txt: ruta del archivo .txt de entrada
+    
+    Retorna:
+        Diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        
+    Lanza FileNotFoundError, IndexError o ValueError si el archivo
+    no existe o no tiene el formato esperado
+    """
+    
+    with open(input_txt, 'r') as f:
+        return parsear_texto(f.read())
+
+
+def dzn_texto(datos):
+    """
+    Genera el contenido .dzn de una instancia para MiniZinc, sin escribir
+    ningun archivo
+    
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+    
+    Retorna:
+        Texto en formato MiniZinc
+    """
+    
+    m = datos['m']
+    
+    # Convertir matriz de resistencias a formato array2d de MiniZinc
+    # array2d(1..m, 1..3, [valores...])
+    # Aplanar la matriz (convertir de 2D a 1D) para el formato requerido
+    flat_resistencias = [val for fila in datos['s'] for val in fila]
+    
+    # Escribir cada parametro en formato MiniZinc
+    return (f"n = {datos['n']};\n"
+            f"m = {m};\n"
+            f"p = {datos['p']};\n"
+            f"v = {datos['v']};\n"
+            f"s = array2d(1..{m}, 1..3, {flat_resistencias});\n"
+            f"ct = {datos['ct']};\n"
+            f"maxMovs = {datos['maxMovs']};\n")
+
+
+def texto_txt(datos):
+    """
+    Genera el contenido .txt de una instancia (el formato que lee
+    parsear_texto)
+    
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+    
+    Retorna:
+        Texto con una linea por campo y una fila por opinion en s
+    """
+    
+    lineas = [str(datos['n']), str(datos['m']),
+              ",".join(str(x) for x in datos['p']),
+              ",".join(str(x) for x in datos['v'])]
+    lineas += [",".join(str(x) for x in fila) for fila in datos['s']]
+    lineas += [str(datos['ct']), str(datos['maxMovs'])]
+    return "\n".join(lineas) + "\n"
+
+
+def escribir_dzn(datos, output_dzn):
+    """
+    Escribe los datos de una instancia en un archivo .dzn para MiniZinc
+    
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        output_dzn: ruta del archivo .dzn de salida
+    """
+    
+    # Generar el archivo .dzn con formato MiniZinc
+    with open(output_dzn, 'w') as f:
+        f.write(dzn_texto(datos))
+
+
+@dataclass
+class Instancia:
+    """
+    Instancia de MinPol en memoria
+
+    Se construye desde el texto de un .txt (desde_texto) o con los valores
+    ya convertidos, como hace la GUI, y se serializa a .dzn (texto) sin
+    pasar por archivos intermedios
+    """
+
+    n: int
+    m: int
+    p: list
+    v: list
+    s: list
+    ct: float
+    maxMovs: float
+
+    # --------------------------------------------------
+    @classmethod
+    def desde_texto(cls, texto):
+        """Construye y valida la instancia a partir del contenido de un .txt"""
+        instancia = cls(**parsear_texto(texto))
+        instancia.validar()
+        return instancia
+
+    # --------------------------------------------------
+    def validar(self):
+        """
+        Lanza ValueError si la instancia no es consistente: n >= 0, m >= 1,
+        p, v y s con m elementos, 3 resistencias por fila que suman p[i],
+        sum(p) == n y p, s, ct y maxMovs sin valores negativos (las mismas
+        reglas que leer_txt_compacto)
+        """
+        if self.n < 0 or self.m < 1:
+            raise ValueError("n debe ser >= 0 y m >= 1")
+        if len(self.p) != self.m or len(self.v) != self.m or len(self.s) != self.m:
+            raise ValueError("p, v y s deben tener exactamente m elementos")
+        if min(self.p) < 0:
+            raise ValueError("p no puede tener valores negativos")
+        if sum(self.p) != self.n:
+            raise ValueError(f"La suma de p ({sum(self.p)}) no coincide con n = {self.n}")
+        for i, fila in enumerate(self.s, 1):
+            if len(fila) != 3:
+                raise ValueError(f"La fila {i} de resistencias debe tener 3 valores")
+            if min(fila) < 0 or sum(fila) != self.p[i - 1]:
+                raise ValueError(f"Las resistencias de la opinion {i} deben ser >= 0 "
+                                 f"y sumar p[{i}] = {self.p[i - 1]}")
+        if self.ct < 0 or self.maxMovs < 0:
+            raise ValueError("ct y maxMovs no pueden ser negativos")
+
+    # --------------------------------------------------
+    def a_datos(self):
+        """Retorna la instancia como el diccionario que usan los solvers"""
+        return {
+            'n': self.n,
+            'm': self.m,
+            'p': self.p,
+            'v': self.v,
+            's': self.s,
+            'ct': self.ct,
+            'maxMovs': self.maxMovs
+        }
+
+    # --------------------------------------------------
+    def a_dzn(self):
+        """Retorna la instancia en formato .dzn (texto)"""
+        return dzn_texto(self.a_datos())
+
+
+def _leer_valores(numero, linea, nombre, tipo, cantidad):
+    """
+    Convierte una linea separada por comas en un array compacto ('q' para
+    enteros, 'd' para flotantes) y revisa que tenga cantidad elementos
+
+    Lanza ValueError indicando la linea si el formato no es el esperado
+    """
+
+    convertir = int if tipo == 'q' else float
+    try:
+        valores = array(tipo, map(convertir, linea.split(',')))
+    except ValueError:
+        raise ValueError(f"Linea {numero}: {nombre} tiene valores no numericos")
+    if len(valores) != cantidad:
+        raise ValueError(f"Linea {numero}: {nombre} debe tener {cantidad} valores "
+                         f"y tiene {len(valores)}")
+    return valores
+
+
+def _escribir_valores(salida, valores, bloque=4096):
+    """Escribe los valores separados por comas en bloques, sin armar un solo texto"""
+    for inicio in range(0, len(valores), bloque):
+        if inicio:
+            salida.write(", ")
+        salida.write(", ".join(map(repr, valores[inicio:inicio + bloque])))
+
+
+def leer_txt_compacto(input_txt, salida=None):
+    """
+    Lee un .txt de MinPol linea por linea, sin cargar el archivo completo,
+    guardando p, v y s en arrays compactos y validando los tamanos a medida
+    que avanza
+    
+    Parametros:
+        input_txt: ruta del archivo .txt de entrada
+        salida: archivo abierto donde se va escribiendo el .dzn mientras se
+                lee (opcional); el texto es el mismo que genera dzn_texto
+    
+    Retorna:
+        Diccionario con las llaves n, m, ct y maxMovs, p (array 'q'), v
+        (array 'd') y s (array 'q' plano de 3 * m valores, fila por fila)
+        
+    Lanza FileNotFoundError si el archivo no existe y ValueError si el
+    formato o los tamanos no son los esperados (len(p) == m, sum(p) == n,
+    3 resistencias por fila que suman p[i])
+    """
+    
+    with open(input_txt, 'r') as f:
+        lineas = enumerate(f, 1)
+
+        def siguiente(nombre):
+            for numero, linea in lineas:
+                return numero, linea.strip()
+            raise ValueError(f"El archivo termina antes de {nombre}")
+
+        def entero(nombre):
+            numero, linea = siguiente(nombre)
+            try:
+                return int(linea)
+            except ValueError:
+                raise ValueError(f"Linea {numero}: {nombre} debe ser un entero")
+
+        n = entero("n")
+        m = entero("m")
+        if n < 0 or m < 1:
+            raise ValueError("n debe ser >= 0 y m >= 1")
+        if salida is not None:
+            salida.write(f"n = {n};\nm = {m};\n")
+
+        # Distribucion de personas por opinion (p)
+        p = _leer_valores(*siguiente("p"), "p", 'q', m)
+        if sum(p) != n:
+            raise ValueError(f"La suma de p ({sum(p)}) no coincide con n = {n}")
+        if min(p) < 0:
+            raise ValueError("p no puede tener valores negativos")
+        if salida is not None:
+            salida.write("p = [")
+            _escribir_valores(salida, p)
+            salida.write("];\n")
+
+        # Valores de las opiniones (v)
+        v = _leer_valores(*siguiente("v"), "v", 'd', m)
+        if salida is not None:
+            salida.write("v = [")
+            _escribir_valores(salida, v)
+            salida.write("];\n")
+
+        # Matriz de resistencias, una fila por opinion
+        s = array('q')
+        if salida is not None:
+            salida.write(f"s = array2d(1..{m}, 1..3, [")
+        for i in range(m):
+            numero, linea = siguiente(f"la fila {i + 1} de resistencias")
+            fila = _leer_valores(numero, linea, f"la fila {i + 1} de resistencias", 'q', 3)
+            if min(fila) < 0 or sum(fila) != p[i]:
+                raise ValueError(f"Linea {numero}: las resistencias de la opinion {i + 1} "
+                                 f"deben ser >= 0 y sumar p[{i + 1}] = {p[i]}")
+            s.extend(fila)
+            if salida is not None:
+                salida.write(", " if i else "")
+                _escribir_valores(salida, fila)
+        if salida is not None:
+            salida.write("]);\n")
+
+        numero, linea = siguiente("ct")
+        try:
+            ct = float(linea)
+        except ValueError:
+            raise ValueError(f"Linea {numero}: ct debe ser un numero")
+        maxMovs = entero("maxMovs")
+        if salida is not None:
+            salida.write(f"ct = {ct};\nmaxMovs = {maxMovs};\n")
+
+    return {
+        'n': n,
+        'm': m,
+        'p': p,
+        'v': v,
+        's': s,
+        'ct': ct,
+        'maxMovs': maxMovs
+    }
+
+
+def memoria_compacta(datos):
+    """Bytes que ocupan los arrays p, v y s de leer_txt_compacto"""
+    return sum(datos[llave].itemsize * len(datos[llave]) for llave in ('p', 'v', 's'))
+
+
+def convertir_streaming(input_txt, output_dzn):
+    """
+    Convierte un .txt a .dzn escribiendo el .dzn a medida que se lee; se
+    escribe en un archivo temporal que reemplaza a output_dzn solo si la
+    lectura termina sin errores
+    
+    Retorna:
+        Tupla (datos, estadisticas) con los datos de leer_txt_compacto y
+        las llaves tiempo (segundos) y memoria (bytes de los arrays)
+    """
+    
+    inicio = time.perf_counter()
+    temporal = f"{output_dzn}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, 'w') as salida:
+            datos = leer_txt_compacto(input_txt, salida)
+        os.replace(temporal, output_dzn)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    estadisticas = {
+        'tiempo': time.perf_counter() - inicio,
+        'memoria': memoria_compacta(datos)
+    }
+    return datos, estadisticas
+
+
+def txt_to_dzn(input_txt, output_dzn, verbose=False):
     """
     Convierte un archivo .txt con el formato del proyecto MinPol
     a un archivo .dzn para MiniZinc
@@ -15,71 +383,31 @@ def txt_to_dzn(input_txt, output_dzn):
     Parametros:
         input_txt: ruta del archivo .txt de entrada
         output_dzn: ruta del archivo .dzn de salida
+        verbose: imprimir tambien p, v y la matriz de resistencias
     
     Retorna:
         True si la conversion fue exitosa, False en caso contrario
     """
     
     try:
-        # Leer todas las lineas del archivo de entrada y eliminar espacios
-        with open(input_txt, 'r') as f:
-            lines = [line.strip() for line in f.readlines()]
-        
-        # Parsear los datos de las primeras lineas
-        n = int(lines[0])  # Numero total de personas
-        m = int(lines[1])  # Numero de opiniones posibles
-        
-        # Distribucion de personas por cada opinion (vector p)
-        # Separar por comas y convertir cada elemento a entero
-        p = [int(x.strip()) for x in lines[2].split(',')]
-        
-        # Valores asociados a cada opinion (vector v)
-        # Separar por comas y convertir cada elemento a flotante
-        v = [float(x.strip()) for x in lines[3].split(',')]
-        
-        # Matriz de resistencias (m filas x 3 columnas)
-        # Cada fila representa una opinion
-        # Cada columna representa un nivel de resistencia (baja, media, alta)
-        resistencias = []
-        for i in range(4, 4 + m):
-            fila = [int(x.strip()) for x in lines[i].split(',')]
-            resistencias.append(fila)
-        
-        # Costo total maximo permitido
-        ct = float(lines[4 + m])
-        
-        # Numero maximo de movimientos permitidos
-        maxMovs = int(lines[5 + m])
-        
-        # Generar el archivo .dzn con formato MiniZinc
-        with open(output_dzn, 'w') as f:
-            # Escribir cada parametro en formato MiniZinc
-            f.write(f"n = {n};\n")
-            f.write(f"m = {m};\n")
-            f.write(f"p = {p};\n")
-            f.write(f"v = {v};\n")
-            
-            # Convertir matriz de resistencias a formato array2d de MiniZinc
-            # array2d(1..m, 1..3, [valores...])
-            # Aplanar la matriz (convertir de 2D a 1D) para el formato requerido
-            flat_resistencias = [val for fila in resistencias for val in fila]
-            f.write(f"s = array2d(1..{m}, 1..3, {flat_resistencias});\n")
-            
-            f.write(f"ct = {ct};\n")
-            f.write(f"maxMovs = {maxMovs};\n")
+        # Leer el archivo y escribir el .dzn en una sola pasada
+        datos, estadisticas = convertir_streaming(input_txt, output_dzn)
         
         # Imprimir confirmacion y resumen de los datos convertidos
         print(f"Conversion exitosa: {output_dzn} creado")
-        print(f"\nDatos convertidos:")
-        print(f"  n (personas): {n}")
-        print(f"  m (opiniones): {m}")
-        print(f"  p (distribucion): {p}")
-        print(f"  v (valores opiniones): {v}")
-        print(f"  s (resistencias):")
-        for i, fila in enumerate(resistencias, 1):
-            print(f"    Opinion {i}: baja={fila[0]}, media={fila[1]}, alta={fila[2]}")
-        print(f"  ct (costo maximo): {ct}")
-        print(f"  maxMovs (movimientos maximos): {maxMovs}")
+        print(f"  n (personas): {datos['n']}")
+        print(f"  m (opiniones): {datos['m']}")
+        print(f"  ct (costo maximo): {datos['ct']}")
+        print(f"  maxMovs (movimientos maximos): {datos['maxMovs']}")
+        print(f"  Tiempo de lectura: {estadisticas['tiempo'] * 1000:.1f} ms, "
+              f"memoria de los datos: {estadisticas['memoria'] / 1024:.1f} KiB")
+        if verbose:
+            print(f"  p (distribucion): {datos['p'].tolist()}")
+            print(f"  v (valores opiniones): {datos['v'].tolist()}")
+            print(f"  s (resistencias):")
+            s = datos['s']
+            for i in range(datos['m']):
+                print(f"    Opinion {i + 1}: baja={s[3 * i]}, media={s[3 * i + 1]}, alta={s[3 * i + 2]}")
         
         return True
         
@@ -87,12 +415,8 @@ def txt_to_dzn(input_txt, output_dzn):
         # Error cuando no se encuentra el archivo de entrada
         print(f"Error: No se encontro el archivo '{input_txt}'")
         return False
-    except IndexError:
-        # Error cuando el archivo no tiene suficientes lineas
-        print("Error: El archivo no tiene el formato correcto")
-        return False
     except ValueError as e:
-        # Error cuando los datos no se pueden convertir al tipo esperado
+        # Error cuando faltan lineas o los datos no tienen el formato esperado
         print(f"Error al parsear los datos: {e}")
         return False
     except Exception as e:
@@ -129,7 +453,7 @@ def ejemplo_uso():
     print("="*50 + "\n")
     
     # Ejecutar la conversion
-    txt_to_dzn('entrada_ejemplo.txt', 'DatosProyecto.dzn')
+    txt_to_dzn('entrada_ejemplo.txt', 'DatosProyecto.dzn', verbose=True)
     
     # Mostrar el contenido del archivo generado
     print("\n" + "="*50)
@@ -144,21 +468,25 @@ def ejemplo_uso():
 if __name__ == "__main__":
     import sys
     
+    # -v / --verbose: imprimir tambien p, v y las resistencias
+    verbose = any(arg in ('-v', '--verbose') for arg in sys.argv[1:])
+    argumentos = [arg for arg in sys.argv[1:] if arg not in ('-v', '--verbose')]
+    
     # Verificar el numero de argumentos de linea de comandos
-    if len(sys.argv) == 3:
+    if len(argumentos) == 2:
         # Uso con dos argumentos: python parser.py input.txt output.dzn
-        input_file = sys.argv[1]
-        output_file = sys.argv[2]
-        txt_to_dzn(input_file, output_file)
-    elif len(sys.argv) == 2:
+        input_file = argumentos[0]
+        output_file = argumentos[1]
+        txt_to_dzn(input_file, output_file, verbose)
+    elif len(argumentos) == 1:
         # Uso con un argumento: python parser.py input.txt
         # (salida por defecto: DatosProyecto.dzn)
-        input_file = sys.argv[1]
-        txt_to_dzn(input_file, 'DatosProyecto.dzn')
+        input_file = argumentos[0]
+        txt_to_dzn(input_file, 'DatosProyecto.dzn', verbose)
     else:
         # Sin argumentos: mostrar ayuda y ejecutar ejemplo
         print("Uso:")
-        print("  python parser.py input.txt output.dzn")
-        print("  python parser.py input.txt")
+        print("  python parser.py input.txt output.dzn [-v]")
+        print("  python parser.py input.txt [-v]")
         print("\nEjecutando ejemplo de demostracion...\n")
         ejemplo_uso()
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Portafolio de solvers para el modelo MinPol (Proyecto.mzn)
+
+Lanza el mismo modelo con varios backends de MiniZinc al mismo tiempo y
+se queda con la primera respuesta que el solver declare optima (o
+insatisfacible). Los demas procesos se terminan en cuanto llega esa
+respuesta, de modo que el tiempo de cada instancia es el del backend mas
+rapido para ella.
+"""
+
+import os
+import queue
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Ejecutable de MiniZinc; se puede cambiar con la variable de entorno
+# MINIZINC (por ejemplo, para usar un ejecutable de prueba)
+MINIZINC = os.environ.get('MINIZINC', 'minizinc')
+
+# Backends que se lanzan por defecto en el portafolio
+SOLVERS_PORTAFOLIO = ['coin-bc', 'highs', 'gecode', 'chuffed']
+
+# Marcas que imprime MiniZinc cuando la busqueda termino por completo
+MARCA_OPTIMO = "=========="
+MARCA_INSATISFACIBLE = "=====UNSATISFIABLE====="
+
+# Prefijo de las lineas de estadisticas de MiniZinc (--statistics)
+MARCA_ESTADISTICA = "%%%mzn-stat"
+
+# Longitud maxima (caracteres) de los datos que se pasan con --cmdline-data;
+# los sistemas limitan el tamano de cada argumento de un proceso
+LIMITE_CMDLINE = 100000
+
+
+@contextmanager
+def argumentos_datos(ruta_dzn=None, texto_dzn=None):
+    """
+    Entrega los argumentos de MiniZinc para los datos de una instancia
+
+    Con texto_dzn (datos en memoria) se usa --cmdline-data, sin archivos
+    intermedios; solo si el texto supera LIMITE_CMDLINE se escribe en un
+    .dzn temporal propio de esta ejecucion, que se borra al salir. Sin
+    texto_dzn se usa ruta_dzn tal cual
+    """
+
+    if texto_dzn is None:
+        yield [ruta_dzn]
+    elif len(texto_dzn) <= LIMITE_CMDLINE:
+        yield ["--cmdline-data", texto_dzn]
+    else:
+        fd, ruta = tempfile.mkstemp(prefix="minpol_", suffix=".dzn")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(texto_dzn)
+            yield [ruta]
+        finally:
+            os.remove(ruta)
+
+
+def estado_salida(stdout):
+    """
+    Clasifica la salida de MiniZinc
+
+    Retorna:
+        'OPTIMO' si se probo la optimalidad, 'INSATISFACIBLE' si el modelo
+        no tiene solucion, 'SOLUCION' si hay una solucion sin probar que sea
+        optima, o 'DESCONOCIDO' si no hay ninguna
+    """
+
+    lineas = [linea.strip() for linea in stdout.splitlines()]
+    if MARCA_INSATISFACIBLE in lineas:
+        return 'INSATISFACIBLE'
+    if MARCA_OPTIMO in lineas:
+        return 'OPTIMO'
+    if "----------" in lineas:
+        return 'SOLUCION'
+    return 'DESCONOCIDO'
+
+
+def leer_estadistica(linea, estadisticas):
+    """
+    Si la linea es una estadistica de MiniZinc (%%%mzn-stat: clave=valor)
+    guarda el valor (int, float o texto) en estadisticas
+
+    Retorna:
+        True si la linea era de estadisticas (incluida %%%mzn-stat-end)
+    """
+
+    marca = linea.strip()
+    if not marca.startswith(MARCA_ESTADISTICA):
+        return False
+    clave, separador, valor = marca[len(MARCA_ESTADISTICA):].lstrip(":").strip().partition("=")
+    if separador:
+        for convertir in (int, float):
+            try:
+                estadisticas[clave] = convertir(valor)
+                break
+            except ValueError:
+                continue
+        else:
+            estadisticas[clave] = valor.strip('"')
+    return True
+
+
+def terminar_proceso(proceso):
+    """
+    Termina un proceso de MiniZinc junto con el backend que haya lanzado
+    (en POSIX cada proceso tiene su propio grupo)
+    """
+
+    try:
+        if os.name == 'posix':
+            os.killpg(proceso.pid, signal.SIGKILL)
+        else:
+            proceso.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _esperar_proceso(solver, proceso, cola):
+    """Espera a que termine un proceso y deja su resultado en la cola"""
+    stdout, stderr = proceso.communicate()
+    cola.put((solver, proceso.returncode, stdout, stderr))
+
+
+def resolver_portafolio(ruta_mzn, ruta_dzn=None, solvers=None, timeout=60, ejecutable=None,
+                        cancelar=None, texto_dzn=None):
+    """
+    Resuelve una instancia lanzando varios backends de MiniZinc en paralelo
+
+    Parametros:
+        ruta_mzn: ruta del modelo .mzn
+        ruta_dzn: ruta del archivo de datos .dzn (si no se da texto_dzn)
+        solvers: lista de identificadores de solver para --solver
+                 (por defecto SOLVERS_PORTAFOLIO)
+        timeout: segundos maximos de espera para toda la carrera
+        ejecutable: ejecutable de MiniZinc (por defecto MINIZINC)
+        cancelar: threading.Event opcional; si se activa, se terminan
+                  todos los solvers
+        texto_dzn: datos de la instancia en formato .dzn, en memoria
+
+    Retorna:
+        Diccionario con las llaves:
+        - estado: 'OPTIMO', 'INSATISFACIBLE', 'TIMEOUT', 'CANCELADO' o 'ERROR'
+        - ganador: solver que dio la respuesta (None si ninguno la dio)
+        - stdout: salida del solver ganador
+        - tiempo: segundos empleados
+        - errores: diccionario solver -> stderr de los solvers que fallaron
+
+    Lanza FileNotFoundError si no se encuentra el ejecutable de MiniZinc
+    """
+
+    # Un solver repetido no gana nada y su proceso quedaria sin terminar
+    solvers = list(dict.fromkeys(solvers or SOLVERS_PORTAFOLIO))
+    ejecutable = ejecutable or MINIZINC
+
+    inicio = time.perf_counter()
+    cola = queue.Queue()
+    procesos = {}
+    with argumentos_datos(ruta_dzn, texto_dzn) as datos:
+        try:
+            for solver in solvers:
+                proceso = subprocess.Popen(
+                    [ejecutable, "--solver", solver, ruta_mzn] + datos,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    start_new_session=(os.name == 'posix')
+                )
+                procesos[solver] = proceso
+                threading.Thread(target=_esperar_proceso,
+                                 args=(solver, proceso, cola),
+                                 daemon=True).start()
+
+            resultado = {'estado': 'TIMEOUT', 'ganador': None, 'stdout': "", 'errores': {}}
+            pendientes = len(procesos)
+            limite = inicio + timeout
+            while pendientes:
+                if cancelar is not None and cancelar.is_set():
+                    resultado['estado'] = 'CANCELADO'
+                    break
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    # Esperar en intervalos cortos para atender la cancelacion
+                    solver, codigo, stdout, stderr = cola.get(timeout=min(restante, 0.1))
+                except queue.Empty:
+                    continue
+                pendientes -= 1
+
+                estado = estado_salida(stdout) if codigo == 0 else 'ERROR'
+                if estado in ('OPTIMO', 'INSATISFACIBLE'):
+                    resultado.update(estado=estado, ganador=solver, stdout=stdout)
+                    break
+                resultado['errores'][solver] = stderr
+            else:
+                # Todos terminaron sin una respuesta definitiva
+                resultado['estado'] = 'ERROR'
+
+        finally:
+            # Terminar los solvers que siguen corriendo
+            for proceso in procesos.values():
+                if proceso.poll() is None:
+                    terminar_proceso(proceso)
+
+    resultado['tiempo'] = time.perf_counter() - inicio
+    return resultado
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) not in (3, 4):
+        print("Uso:")
+        print("  python portafolio.py modelo.mzn datos.dzn")
+        print("  python portafolio.py modelo.mzn datos.dzn coin-bc,highs,gecode")
+        sys.exit(1)
+
+    solvers = sys.argv[3].split(',') if len(sys.argv) == 4 else None
+    resultado = resolver_portafolio(sys.argv[1], sys.argv[2], solvers)
+    print(resultado['stdout'], end="")
+    print(f"Estado: {resultado['estado']}")
+    print(f"Ganador: {resultado['ganador']}")
+    print(f"Tiempo: {resultado['tiempo']:.4f}s")
@@ -0,0 +1,170 @@
+"""
+Presolve de instancias MinPol antes de enviarlas a MiniZinc
+
+Proyecto.mzn declara las 3*m*m variables x[k, i, j] aunque la mayoria no
+puedan tomar otro valor que cero:
+- los grupos (i, k) sin personas (s[i][k] = 0)
+- los movimientos i -> i
+- los pares cuyo costo |v[i] - v[j]| * res_cost[k] supera ct
+- los pares cuya distancia |i - j| supera maxMovs
+El presolve deja solo los arcos (k, i, j) alcanzables, cada uno con la
+cantidad maxima de personas que lo pueden usar, y genera los datos para
+ProyectoReducido.mzn. Ese modelo no arma la matriz completa x: su salida
+trae las personas y[t] de cada arco, que Resultado.desde_json convierte en
+movimientos con la misma lista de arcos.
+
+ProyectoParametrico.mzn es el mismo modelo con solo la estructura (n, m,
+v y los arcos sin capacidad) como datos; p, s, ct, maxMovs y arc_cap se
+fijan en el FlatZinc ya aplanado (ver compilacion.py), asi que instancias
+con la misma estructura comparten el modelo aplanado.
+"""
+
+import math
+import os
+
+from parser import dzn_texto
+from solver_nativo import RES_COST, EPS
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUTA_MZN_REDUCIDO = os.path.join(BASE_DIR, "..", "ProyectoReducido.mzn")
+RUTA_MZN_PARAMETRICO = os.path.join(BASE_DIR, "..", "ProyectoParametrico.mzn")
+
+
+def arcos_alcanzables(datos):
+    """
+    Calcula los movimientos que pueden ser distintos de cero
+
+    Retorna:
+        Lista de tuplas (k, i, j, capacidad) con indices base 0, donde
+        capacidad es el maximo de personas que pueden usar el arco sin
+        exceder s, ct ni maxMovs
+    """
+
+    m = datos['m']
+    v = datos['v']
+    s = datos['s']
+    ct = datos['ct']
+    max_movs = datos['maxMovs']
+
+    arcos = []
+    for k in range(3):
+        for i in range(m):
+            if s[i][k] == 0:
+                continue
+            for j in range(m):
+                distancia = abs(i - j)
+                if distancia == 0 or distancia > max_movs + EPS:
+                    continue
+                costo = abs(v[i] - v[j]) * RES_COST[k]
+                if costo > ct + EPS:
+                    continue
+                capacidad = min(s[i][k], int(math.floor(max_movs / distancia + EPS)))
+                if costo > 0:
+                    capacidad = min(capacidad, int(math.floor(ct / costo + EPS)))
+                if capacidad > 0:
+                    arcos.append((k, i, j, capacidad))
+    return arcos
+
+
+def presolve(datos):
+    """
+    Reduce una instancia a sus arcos alcanzables
+
+    Retorna:
+        Diccionario con las llaves arcos (lista de arcos_alcanzables),
+        variables (3*m*m del modelo completo) y restantes (len(arcos))
+    """
+
+    arcos = arcos_alcanzables(datos)
+    return {
+        'arcos': arcos,
+        'variables': 3 * datos['m'] * datos['m'],
+        'restantes': len(arcos)
+    }
+
+
+def dzn_reducido(datos, arcos=None):
+    """
+    Genera el contenido .dzn para ProyectoReducido.mzn
+
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        arcos: arcos alcanzables (por defecto se calculan)
+
+    Retorna:
+        Texto en formato MiniZinc
+    """
+
+    if arcos is None:
+        arcos = arcos_alcanzables(datos)
+    return (dzn_texto(datos) +
+            f"a = {len(arcos)};\n"
+            f"arc_k = {[k + 1 for k, _, _, _ in arcos]};\n"
+            f"arc_i = {[i + 1 for _, i, _, _ in arcos]};\n"
+            f"arc_j = {[j + 1 for _, _, j, _ in arcos]};\n"
+            f"arc_cap = {[c for _, _, _, c in arcos]};\n")
+
+
+def dzn_parametrico(datos, arcos=None):
+    """
+    Genera el contenido .dzn para ProyectoParametrico.mzn: solo n, m, v y
+    los arcos (k, i, j), los datos que cambian el modelo aplanado
+
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        arcos: arcos alcanzables (por defecto se calculan)
+
+    Retorna:
+        Texto en formato MiniZinc
+    """
+
+    if arcos is None:
+        arcos = arcos_alcanzables(datos)
+    return (f"n = {datos['n']};\n"
+            f"m = {datos['m']};\n"
+            f"v = {datos['v']};\n"
+            f"a = {len(arcos)};\n"
+            f"arc_k = {[k + 1 for k, _, _, _ in arcos]};\n"
+            f"arc_i = {[i + 1 for _, i, _, _ in arcos]};\n"
+            f"arc_j = {[j + 1 for _, _, j, _ in arcos]};\n")
+
+
+def parametros_parametrico(datos, arcos=None):
+    """
+    Valores que ProyectoParametrico.mzn recibe como variables fijadas en el
+    FlatZinc (el argumento parametros de resolver_anytime)
+
+    Retorna:
+        Diccionario con las llaves p, s (aplanada por filas), ct, maxMovs y
+        arc_cap
+    """
+
+    if arcos is None:
+        arcos = arcos_alcanzables(datos)
+    return {
+        'p': list(datos['p']),
+        's': [valor for fila in datos['s'] for valor in fila],
+        'ct': float(datos['ct']),
+        'maxMovs': float(datos['maxMovs']),
+        'arc_cap': [c for _, _, _, c in arcos]
+    }
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import sys
+    from parser import leer_txt
+
+    if len(sys.argv) not in (2, 3):
+        print("Uso:")
+        print("  python presolve.py input.txt [salida.dzn]")
+        sys.exit(1)
+
+    datos = leer_txt(sys.argv[1])
+    reduccion = presolve(datos)
+    print(f"Variables de movimiento: {reduccion['variables']} -> {reduccion['restantes']}")
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], 'w') as f:
+            f.write(dzn_reducido(datos, reduccion['arcos']))
+        print(f"Datos reducidos guardados en {sys.argv[2]} (modelo ProyectoReducido.mzn)")
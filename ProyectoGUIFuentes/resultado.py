@@ -0,0 +1,108 @@
+"""
+Resultado estructurado de una solucion de MinPol
+
+Representa una solucion con la polarizacion, la mediana, la distribucion
+final y los movimientos en forma dispersa (solo los x[k, i, j] distintos
+de cero), sin importar el valor de m. Se puede construir a partir de la
+salida JSON de MiniZinc (--output-mode json) o del motor nativo.
+"""
+
+import json
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Resultado:
+    """
+    Solucion de una instancia de MinPol
+
+    Atributos:
+        estado: 'OPTIMO', 'SOLUCION', 'INSATISFACIBLE', ...
+        polarizacion: valor de total_polarization (None si no hay solucion)
+        med_pos: indice (1..m) de la mediana
+        p_prime: distribucion final de personas por opinion
+        movimientos: diccionario disperso (k, i, j) -> personas, con
+                     indices base 0 como en solver_nativo
+    """
+
+    estado: str
+    polarizacion: float = None
+    med_pos: int = None
+    p_prime: list = field(default_factory=list)
+    movimientos: dict = field(default_factory=dict)
+
+    # --------------------------------------------------
+    @classmethod
+    def desde_json(cls, solucion, estado='SOLUCION', arcos=None):
+        """
+        Construye el resultado a partir de una solucion de MiniZinc en modo
+        --output-mode json (texto o diccionario ya decodificado)
+
+        Con la matriz x (Proyecto.mzn) los movimientos salen de ella; con
+        ProyectoReducido.mzn la solucion trae y, las personas de cada arco,
+        y arcos es la lista (k, i, j, capacidad) de presolve con la que se
+        generaron los datos
+        """
+
+        if isinstance(solucion, str):
+            solucion = json.loads(solucion)
+
+        movimientos = {}
+        if 'x' in solucion:
+            for k, matriz in enumerate(solucion['x']):
+                for i, fila in enumerate(matriz):
+                    for j, personas in enumerate(fila):
+                        if personas:
+                            movimientos[(k, i, j)] = personas
+        else:
+            if arcos is None or len(arcos) != len(solucion['y']):
+                raise ValueError("La solucion trae y pero no coincide con la lista de arcos")
+            for (k, i, j, _), personas in zip(arcos, solucion['y']):
+                if personas:
+                    movimientos[(k, i, j)] = personas
+
+        return cls(estado=estado,
+                   polarizacion=float(solucion['total_polarization']),
+                   med_pos=solucion['med_pos'],
+                   p_prime=list(solucion['p_prime']),
+                   movimientos=movimientos)
+
+    # --------------------------------------------------
+    @classmethod
+    def desde_nativo(cls, resultado):
+        """Construye el resultado a partir del diccionario de resolver_nativo"""
+        if resultado['estado'] not in ('OPTIMO', 'SOLUCION'):
+            return cls(estado=resultado['estado'])
+
+        movimientos = {}
+        for k, matriz in enumerate(resultado['x']):
+            for i, fila in enumerate(matriz):
+                for j, personas in enumerate(fila):
+                    if personas:
+                        movimientos[(k, i, j)] = personas
+
+        return cls(estado=resultado['estado'],
+                   polarizacion=resultado['polarizacion'],
+                   med_pos=resultado['med_pos'],
+                   p_prime=list(resultado['p_prime']),
+                   movimientos=movimientos)
+
+    # --------------------------------------------------
+    def matriz(self, m):
+        """Retorna los movimientos como matriz densa x[k][i][j] (base 0)"""
+        x = [[[0] * m for _ in range(m)] for _ in range(3)]
+        for (k, i, j), personas in self.movimientos.items():
+            x[k][i][j] = personas
+        return x
+
+    # --------------------------------------------------
+    def a_dict(self):
+        """Retorna el resultado como diccionario serializable a JSON"""
+        return {
+            'estado': self.estado,
+            'polarizacion': self.polarizacion,
+            'med_pos': self.med_pos,
+            'p_prime': self.p_prime,
+            'movimientos': [[k, i, j, personas]
+                            for (k, i, j), personas in sorted(self.movimientos.items())]
+        }
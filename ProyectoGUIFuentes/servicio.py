@@ -0,0 +1,567 @@
+"""
+Servicio local de MinPol: un proceso de larga duracion con cola de trabajos
+
+Evita pagar en cada solicitud el arranque de Python, la importacion de los
+modulos y la preparacion de los modelos: el servicio mantiene un pool de
+procesos ya iniciados (cada uno con los modulos cargados y su cache del
+modelo aplanado) y recibe instancias como JSON por TCP en localhost o por
+un socket Unix.
+
+Protocolo: cada mensaje es un objeto JSON en una linea y cada respuesta
+tambien; una conexion puede enviar varios mensajes. La llave op indica la
+operacion:
+- enviar: encola una instancia (llave instancia con n, m, p, v, s, ct y
+  maxMovs, o llave texto con el contenido de un .txt) con motor,
+  prioridad (mayor se atiende antes), timeout y verificar opcionales;
+  responde de inmediato con el id del trabajo
+- estado: estado de un trabajo (EN_COLA, EN_CURSO, TERMINADO, ERROR o
+  CANCELADO) y su resultado si ya termino
+- esperar: como estado, pero espera a que el trabajo termine (con
+  timeout opcional en segundos)
+- resolver: enviar y esperar en un solo mensaje
+- cancelar: quita de la cola un trabajo que aun no empieza, o detiene
+  uno en curso (el motor termina con su mejor solucion, que queda en el
+  resultado del trabajo CANCELADO)
+- estadisticas: trabajos en cola, en curso y terminados
+- detener: apaga el servicio
+Las respuestas traen ok (true o false) y, si ok es false, error.
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from cache import RUTA_CACHE
+from escenarios import datos_registro
+from heuristica import resolver_heuristico
+from lote import COLUMNAS, resolver_datos
+from parser import Instancia
+
+
+# Direccion por defecto del servicio; la variable de entorno MINPOL_SERVICIO
+# la reemplaza (host:puerto o la ruta de un socket Unix)
+DIRECCION = "127.0.0.1:8765"
+
+# Motores que acepta el servicio
+MOTORES = ('nativo', 'heuristico', 'minizinc')
+
+# Trabajos terminados que se conservan para consultar su resultado
+MAX_TERMINADOS = 1000
+
+# Instancia minima para calentar cada proceso del pool
+_INSTANCIA_CALENTAMIENTO = {'n': 2, 'm': 2, 'p': [1, 1], 'v': [0.0, 1.0],
+                            's': [[1, 0, 0], [1, 0, 0]], 'ct': 1.0, 'maxMovs': 1}
+
+
+def direccion_servicio():
+    """Direccion configurada en MINPOL_SERVICIO, o None si no hay ninguna"""
+    return os.environ.get('MINPOL_SERVICIO') or None
+
+
+def parsear_direccion(direccion):
+    """
+    Convierte una direccion en la tupla (host, puerto) de TCP o en la ruta
+    de un socket Unix (cualquier texto que no termine en :puerto)
+    """
+
+    host, separador, puerto = direccion.rpartition(':')
+    if separador and puerto.isdigit():
+        return host or "127.0.0.1", int(puerto)
+    return direccion
+
+
+def _iniciar_proceso():
+    """Calienta un proceso del pool: carga los modulos y ejercita el motor"""
+    resolver_heuristico(_INSTANCIA_CALENTAMIENTO)
+
+
+def _publico(trabajo):
+    """Estado publico de un trabajo (sin los datos de entrada)"""
+    return {llave: trabajo[llave] for llave in
+            ('id', 'estado', 'motor', 'prioridad', 'tiempo_cola', 'fila', 'resultado', 'error')}
+
+
+def _opciones_trabajo(mensaje):
+    """
+    Lee y convierte las opciones de un mensaje enviar o resolver
+
+    Retorna:
+        Tupla (motor, prioridad, timeout, verificar)
+
+    Lanza ValueError si prioridad no es un entero o timeout no es un
+    numero positivo
+    """
+
+    prioridad = mensaje.get('prioridad', 0)
+    timeout = mensaje.get('timeout', 60)
+    if isinstance(prioridad, bool) or not isinstance(prioridad, (int, str)):
+        raise ValueError(f"prioridad debe ser un entero: {prioridad!r}")
+    try:
+        prioridad = int(prioridad)
+    except ValueError:
+        raise ValueError(f"prioridad debe ser un entero: {prioridad!r}") from None
+    if isinstance(timeout, bool):
+        raise ValueError(f"timeout debe ser un numero positivo: {timeout!r}")
+    try:
+        timeout = float(timeout)
+    except (TypeError, ValueError):
+        raise ValueError(f"timeout debe ser un numero positivo: {timeout!r}") from None
+    if not timeout > 0:
+        raise ValueError(f"timeout debe ser un numero positivo: {timeout!r}")
+    return mensaje.get('motor', 'nativo'), prioridad, timeout, bool(mensaje.get('verificar', False))
+
+
+def _resolver_trabajo(datos, motor, timeout, ruta_cache, verificacion, cancelar=None):
+    """
+    Resuelve un trabajo en un proceso del pool; cancelar es el Event (proxy
+    del Manager del servicio) con el que se detiene un trabajo en curso
+
+    Retorna:
+        Tupla (fila, resultado) con las columnas de lote.COLUMNAS y el
+        resultado del motor
+    """
+
+    fila = dict.fromkeys(COLUMNAS)
+    fila['motor'] = motor
+    inicio = time.perf_counter()
+    resultado = resolver_datos(fila, datos, motor, timeout, ruta_cache, verificacion,
+                               cancelar=cancelar)
+    fila['tiempo_total'] = time.perf_counter() - inicio
+    return fila, resultado
+
+
+class Servicio:
+    """Cola de trabajos con prioridad atendida por un pool de procesos"""
+
+    def __init__(self, procesos=None, ruta_cache=None, max_terminados=MAX_TERMINADOS):
+        self.procesos = procesos or os.cpu_count()
+        self.ruta_cache = ruta_cache
+        self.max_terminados = max_terminados
+        self.pool = self._nuevo_pool()
+        # Los eventos de cancelacion de los trabajos en curso viven en un
+        # Manager para que los procesos del pool los puedan consultar
+        self.gestor = multiprocessing.Manager()
+
+        self.trabajos = {}
+        self.terminados = OrderedDict()
+        self.cola = []
+        self.secuencia = itertools.count()
+        self.condicion = threading.Condition()
+        self.activo = True
+
+        # Un despachador por proceso: cada uno toma el trabajo de mayor
+        # prioridad, asi el orden de la cola se respeta aunque el pool
+        # tenga su propia cola interna
+        self.despachadores = [threading.Thread(target=self._despachar, daemon=True)
+                              for _ in range(self.procesos)]
+        for hilo in self.despachadores:
+            hilo.start()
+
+    # --------------------------------------------------
+    def enviar(self, datos, motor='nativo', prioridad=0, timeout=60, verificacion=False):
+        """
+        Encola una instancia
+
+        Retorna:
+            Id del trabajo
+
+        Lanza ValueError si el motor no existe o el servicio se detuvo
+        """
+
+        if motor not in MOTORES:
+            raise ValueError(f"Motor desconocido: {motor}")
+        with self.condicion:
+            if not self.activo:
+                raise ValueError("El servicio se esta deteniendo")
+            numero = next(self.secuencia)
+            # Primero la entrada de la cola: si prioridad no se puede
+            # comparar falla aqui, antes de registrar el trabajo
+            heapq.heappush(self.cola, (-prioridad, numero, str(numero)))
+            trabajo = {
+                'id': str(numero),
+                'estado': 'EN_COLA',
+                'motor': motor,
+                'prioridad': prioridad,
+                'datos': datos,
+                'timeout': timeout,
+                'verificacion': verificacion,
+                'enviado': time.time(),
+                'tiempo_cola': None,
+                'fila': None,
+                'resultado': None,
+                'error': None,
+                'evento': None,
+                'cancelado': False,
+                'listo': threading.Event()
+            }
+            self.trabajos[trabajo['id']] = trabajo
+            self.condicion.notify()
+        return trabajo['id']
+
+    # --------------------------------------------------
+    def _despachar(self):
+        """Toma trabajos de la cola y los resuelve en el pool (un hilo por proceso)"""
+        while True:
+            with self.condicion:
+                while self.activo and not self.cola:
+                    self.condicion.wait()
+                if not self.cola:
+                    return
+                _, _, id_trabajo = heapq.heappop(self.cola)
+                trabajo = self.trabajos.get(id_trabajo)
+                if trabajo is None or trabajo['estado'] != 'EN_COLA':
+                    continue
+                trabajo['estado'] = 'EN_CURSO'
+                trabajo['tiempo_cola'] = time.time() - trabajo['enviado']
+                trabajo['evento'] = self.gestor.Event()
+                pool = self.pool
+
+            try:
+                futuro = pool.submit(_resolver_trabajo, trabajo['datos'], trabajo['motor'],
+                                     trabajo['timeout'], self.ruta_cache,
+                                     trabajo['verificacion'], trabajo['evento'])
+                fila, resultado = futuro.result()
+                trabajo.update(estado='CANCELADO' if trabajo['cancelado'] else 'TERMINADO',
+                               fila=fila, resultado=resultado)
+            except BrokenProcessPool:
+                # Un proceso murio (falta de memoria, senal): el pool ya no
+                # acepta trabajos, asi que se reemplaza para los siguientes
+                self._reemplazar_pool(pool)
+                trabajo.update(estado='ERROR',
+                               error="El proceso que resolvia el trabajo termino inesperadamente")
+            except Exception as e:
+                trabajo.update(estado='ERROR', error=str(e))
+            self._terminar(trabajo)
+
+    # --------------------------------------------------
+    def _nuevo_pool(self):
+        """Crea el pool de procesos con cada proceso ya calentado"""
+        return ProcessPoolExecutor(max_workers=self.procesos, initializer=_iniciar_proceso)
+
+    # --------------------------------------------------
+    def _reemplazar_pool(self, roto):
+        """Reemplaza el pool roto por uno nuevo (solo una vez aunque varios despachadores lo vean)"""
+        with self.condicion:
+            if self.pool is not roto or not self.activo:
+                return
+            self.pool = self._nuevo_pool()
+        roto.shutdown(wait=False)
+
+    # --------------------------------------------------
+    def _terminar(self, trabajo):
+        """Marca un trabajo como terminado y libera los mas antiguos"""
+        with self.condicion:
+            trabajo['datos'] = None
+            trabajo['evento'] = None
+            self.terminados[trabajo['id']] = True
+            while len(self.terminados) > self.max_terminados:
+                id_antiguo, _ = self.terminados.popitem(last=False)
+                self.trabajos.pop(id_antiguo, None)
+        trabajo['listo'].set()
+
+    # --------------------------------------------------
+    def estado(self, id_trabajo):
+        """
+        Retorna el estado publico de un trabajo (sin los datos de entrada)
+
+        Lanza KeyError si el id no existe o ya se libero
+        """
+
+        return _publico(self.trabajos[id_trabajo])
+
+    # --------------------------------------------------
+    def esperar(self, id_trabajo, timeout=None):
+        """
+        Espera a que un trabajo termine (o se agote timeout) y retorna su
+        estado; el trabajo puede liberarse mientras tanto, asi que se lee
+        del registro tomado antes de esperar
+
+        Lanza KeyError si el id no existe o ya se libero
+        """
+
+        trabajo = self.trabajos[id_trabajo]
+        trabajo['listo'].wait(timeout)
+        return _publico(trabajo)
+
+    # --------------------------------------------------
+    def cancelar(self, id_trabajo):
+        """
+        Cancela un trabajo: si esta en la cola lo quita, y si esta en curso
+        avisa al motor, que termina con su mejor solucion (el trabajo queda
+        CANCELADO con ese resultado)
+
+        Retorna:
+            True si se cancelo, False si ya habia terminado
+        """
+
+        with self.condicion:
+            trabajo = self.trabajos[id_trabajo]
+            if trabajo['estado'] == 'EN_CURSO':
+                # Sigue EN_CURSO hasta que el motor entregue su resultado
+                trabajo['cancelado'] = True
+                trabajo['evento'].set()
+                return True
+            if trabajo['estado'] != 'EN_COLA':
+                return False
+            trabajo['estado'] = 'CANCELADO'
+        self._terminar(trabajo)
+        return True
+
+    # --------------------------------------------------
+    def estadisticas(self):
+        """Retorna el numero de trabajos por estado y el tamano del pool"""
+        with self.condicion:
+            conteo = {}
+            for trabajo in self.trabajos.values():
+                conteo[trabajo['estado']] = conteo.get(trabajo['estado'], 0) + 1
+        return {'procesos': self.procesos, 'trabajos': conteo}
+
+    # --------------------------------------------------
+    def detener(self):
+        """Deja de aceptar trabajos, cancela los que estan en cola y cierra el pool"""
+        with self.condicion:
+            self.activo = False
+            pendientes = [self.trabajos[id_trabajo] for _, _, id_trabajo in self.cola
+                          if id_trabajo in self.trabajos]
+            self.cola.clear()
+            self.condicion.notify_all()
+        for trabajo in pendientes:
+            if trabajo['estado'] == 'EN_COLA':
+                trabajo['estado'] = 'CANCELADO'
+                self._terminar(trabajo)
+        for hilo in self.despachadores:
+            hilo.join()
+        self.pool.shutdown(wait=True)
+        self.gestor.shutdown()
+
+    # --------------------------------------------------
+    def atender(self, mensaje):
+        """
+        Atiende un mensaje del protocolo (ya decodificado)
+
+        Retorna:
+            Diccionario de respuesta con la llave ok
+        """
+
+        op = mensaje.get('op')
+        try:
+            if op in ('enviar', 'resolver'):
+                if 'texto' in mensaje:
+                    datos = Instancia.desde_texto(mensaje['texto']).a_datos()
+                else:
+                    datos = datos_registro(mensaje.get('instancia'))
+                id_trabajo = self.enviar(datos, *_opciones_trabajo(mensaje))
+                if op == 'enviar':
+                    return {'ok': True, 'id': id_trabajo}
+                return {'ok': True, **self.esperar(id_trabajo)}
+            if op == 'estado':
+                return {'ok': True, **self.estado(str(mensaje['id']))}
+            if op == 'esperar':
+                return {'ok': True, **self.esperar(str(mensaje['id']), mensaje.get('timeout'))}
+            if op == 'cancelar':
+                return {'ok': True, 'cancelado': self.cancelar(str(mensaje['id']))}
+            if op == 'estadisticas':
+                return {'ok': True, **self.estadisticas()}
+            return {'ok': False, 'error': f"Operacion desconocida: {op}"}
+        except KeyError as e:
+            return {'ok': False, 'error': f"No existe el trabajo o falta la llave {e}"}
+        except (ValueError, IndexError, TypeError) as e:
+            return {'ok': False, 'error': str(e)}
+
+
+class _Manejador(socketserver.StreamRequestHandler):
+    """Lee mensajes JSON linea por linea de una conexion y responde a cada uno"""
+
+    def handle(self):
+        for linea in self.rfile:
+            if not linea.strip():
+                continue
+            try:
+                mensaje = json.loads(linea)
+            except json.JSONDecodeError as e:
+                respuesta = {'ok': False, 'error': f"JSON invalido: {e}"}
+            else:
+                if isinstance(mensaje, dict) and mensaje.get('op') == 'detener':
+                    self._responder({'ok': True})
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                if not isinstance(mensaje, dict):
+                    respuesta = {'ok': False, 'error': "Cada mensaje debe ser un objeto JSON"}
+                else:
+                    respuesta = self.server.servicio.atender(mensaje)
+            self._responder(respuesta)
+
+    def _responder(self, respuesta):
+        self.wfile.write((json.dumps(respuesta) + "\n").encode())
+        self.wfile.flush()
+
+
+class _ServidorTCP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _ServidorUnix(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def crear_servidor(servicio, direccion=DIRECCION):
+    """
+    Crea el servidor (TCP o socket Unix segun la direccion) que atiende el
+    protocolo con el servicio indicado; se inicia con serve_forever()
+    """
+
+    destino = parsear_direccion(direccion)
+    if isinstance(destino, tuple):
+        servidor = _ServidorTCP(destino, _Manejador)
+    else:
+        if os.path.exists(destino):
+            os.remove(destino)
+        servidor = _ServidorUnix(destino, _Manejador)
+    servidor.servicio = servicio
+    return servidor
+
+
+class ClienteServicio:
+    """
+    Cliente del servicio; mantiene una conexion abierta para varios mensajes
+
+    Lanza OSError (por ejemplo ConnectionRefusedError) si el servicio no
+    esta corriendo, y RuntimeError si el servicio responde con un error
+    """
+
+    def __init__(self, direccion=None, timeout=None):
+        destino = parsear_direccion(direccion or direccion_servicio() or DIRECCION)
+        familia = socket.AF_INET if isinstance(destino, tuple) else socket.AF_UNIX
+        self.conexion = socket.socket(familia, socket.SOCK_STREAM)
+        self.conexion.settimeout(timeout)
+        self.conexion.connect(destino)
+        self.archivo = self.conexion.makefile('rwb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """Cierra la conexion"""
+        self.archivo.close()
+        self.conexion.close()
+
+    def pedir(self, mensaje):
+        """Envia un mensaje y retorna la respuesta (lanza RuntimeError si ok es false)"""
+        self.archivo.write((json.dumps(mensaje) + "\n").encode())
+        self.archivo.flush()
+        linea = self.archivo.readline()
+        if not linea:
+            raise RuntimeError("El servicio cerro la conexion")
+        respuesta = json.loads(linea)
+        if not respuesta.get('ok'):
+            raise RuntimeError(respuesta.get('error', "Error del servicio"))
+        return respuesta
+
+    def enviar(self, datos, motor='nativo', prioridad=0, timeout=60, verificar=False):
+        """Encola una instancia (diccionario de datos) y retorna el id del trabajo"""
+        return self.pedir({'op': 'enviar', 'instancia': datos, 'motor': motor,
+                           'prioridad': prioridad, 'timeout': timeout,
+                           'verificar': verificar})['id']
+
+    def esperar(self, id_trabajo, timeout=None):
+        """Espera a que un trabajo termine y retorna su estado"""
+        return self.pedir({'op': 'esperar', 'id': id_trabajo, 'timeout': timeout})
+
+    def resolver(self, datos, motor='nativo', prioridad=0, timeout=60, verificar=False):
+        """Encola una instancia y espera su resultado"""
+        return self.pedir({'op': 'resolver', 'instancia': datos, 'motor': motor,
+                           'prioridad': prioridad, 'timeout': timeout,
+                           'verificar': verificar})
+
+    def cancelar(self, id_trabajo):
+        """Quita de la cola un trabajo que aun no empieza; retorna True si se cancelo"""
+        return self.pedir({'op': 'cancelar', 'id': id_trabajo})['cancelado']
+
+    def estadisticas(self):
+        """Retorna las estadisticas del servicio"""
+        return self.pedir({'op': 'estadisticas'})
+
+    def detener(self):
+        """Apaga el servicio"""
+        return self.pedir({'op': 'detener'})
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    from parser import leer_txt
+    from solver_nativo import formatear_salida
+
+    argumentos = argparse.ArgumentParser(description="Servicio local de MinPol")
+    argumentos.add_argument("--direccion", default=None,
+                            help=f"host:puerto o ruta de un socket Unix (por defecto "
+                                 f"MINPOL_SERVICIO o {DIRECCION})")
+    comandos = argumentos.add_subparsers(dest="comando", required=True)
+
+    iniciar = comandos.add_parser("iniciar", help="iniciar el servicio")
+    iniciar.add_argument("--procesos", type=int, default=None,
+                         help="procesos del pool (por defecto, uno por nucleo)")
+    iniciar.add_argument("--cache", nargs="?", const=RUTA_CACHE, default=None,
+                         help="usar la cache de resultados (directorio opcional)")
+
+    resolver = comandos.add_parser("resolver", help="resolver instancias con el servicio")
+    resolver.add_argument("instancias", nargs="+", help="archivos .txt")
+    resolver.add_argument("--motor", choices=MOTORES, default='nativo')
+    resolver.add_argument("--prioridad", type=int, default=0)
+    resolver.add_argument("--timeout", type=float, default=60)
+
+    comandos.add_parser("estadisticas", help="mostrar los trabajos del servicio")
+    comandos.add_parser("detener", help="apagar el servicio")
+    args = argumentos.parse_args()
+    direccion = args.direccion or direccion_servicio() or DIRECCION
+
+    if args.comando == "iniciar":
+        servicio = Servicio(args.procesos, args.cache)
+        servidor = crear_servidor(servicio, direccion)
+        print(f"Servicio MinPol escuchando en {direccion} con {servicio.procesos} procesos")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+            servicio.detener()
+            print("Servicio detenido")
+        raise SystemExit(0)
+
+    with ClienteServicio(direccion) as cliente:
+        if args.comando == "resolver":
+            # Encolar todas las instancias primero y luego recoger los resultados
+            ids = [(archivo, cliente.enviar(leer_txt(archivo), args.motor, args.prioridad,
+                                            args.timeout))
+                   for archivo in args.instancias]
+            for archivo, id_trabajo in ids:
+                trabajo = cliente.esperar(id_trabajo)
+                print(f"{os.path.basename(archivo)}: {trabajo['estado']}")
+                if trabajo['estado'] == 'TERMINADO':
+                    resultado = trabajo['resultado']
+                    if resultado.get('x') is not None:
+                        print(formatear_salida(resultado), end="")
+                    else:
+                        print(f"{resultado['estado']} {resultado.get('polarizacion')}")
+                else:
+                    print(trabajo['error'] or "")
+        elif args.comando == "estadisticas":
+            print(json.dumps(cliente.estadisticas(), indent=2))
+        else:
+            cliente.detener()
+            print("Servicio detenido")
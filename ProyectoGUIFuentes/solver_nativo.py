@@ -0,0 +1,1007 @@
+"""
+Motor nativo de solucion para el modelo MinPol (Proyecto.mzn)
+
+Resuelve exactamente el mismo problema que el modelo MiniZinc sin lanzar
+ningun proceso externo. La idea es enumerar la posicion de la mediana
+(med_pos): una vez fijada, las dos restricciones de la mediana se vuelven
+lineales y el subproblema es una mochila entera con dos presupuestos
+(ct y maxMovs). Cada subproblema se resuelve con programacion dinamica
+sobre los movimientos usados, guardando para cada estado el frente de
+Pareto (costo, ganancia) y podando con la mejor solucion conocida.
+
+Con dos presupuestos el subproblema sigue siendo NP-dificil y la
+programacion dinamica crece rapido con n, asi que la busqueda acepta un
+tiempo maximo y un evento de cancelacion (ver Limite): al agotarse retorna
+la mejor solucion conocida con estado 'SOLUCION' y su gap respecto a las
+cotas inferiores de las posiciones que no se terminaron.
+"""
+
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+
+# costos unitarios por nivel de resistencia (1:baja, 2:media, 3:alta)
+RES_COST = [1.0, 1.5, 2.0]
+
+# tolerancia para comparaciones entre flotantes
+EPS = 1e-9
+
+# Segundos entre consultas al evento de cancelacion durante la busqueda
+INTERVALO_CANCELAR = 0.05
+
+# Con mas multiplicadores candidatos que este numero se buscan los mejores
+# sobre cada eje en lugar de evaluarlos todos
+MAX_MULTIPLICADORES = 200
+
+
+class Limite:
+    """
+    Presupuesto de una busqueda: tiempo maximo y cancelacion
+
+    agotado() se consulta muy seguido dentro de la programacion dinamica,
+    asi que el evento se revisa a lo sumo cada INTERVALO_CANCELAR segundos
+    (puede ser un proxy de otro proceso). Una vez agotado sigue agotado y
+    motivo indica 'TIMEOUT' o 'CANCELADO'.
+    """
+
+    def __init__(self, tiempo_max=None, cancelar=None):
+        self.fin = time.perf_counter() + tiempo_max if tiempo_max is not None else math.inf
+        self.cancelar = cancelar
+        self.motivo = None
+        self._revision = 0.0
+
+    # --------------------------------------------------
+    def agotado(self):
+        """Indica si se acabo el tiempo o se pidio cancelar"""
+        if self.motivo is not None:
+            return True
+        ahora = time.perf_counter()
+        if ahora > self.fin:
+            self.motivo = 'TIMEOUT'
+        elif self.cancelar is not None and ahora - self._revision >= INTERVALO_CANCELAR:
+            self._revision = ahora
+            if self.cancelar.is_set():
+                self.motivo = 'CANCELADO'
+        return self.motivo is not None
+
+
+def validar_datos(datos):
+    """
+    Verifica que los datos de una instancia sean consistentes con el modelo
+
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+
+    Lanza ValueError si algun vector no tiene tamano m o si las resistencias
+    de alguna opinion no suman exactamente p[i] (igual que parser.py y la GUI)
+    """
+
+    m = datos['m']
+    if len(datos['p']) != m or len(datos['v']) != m or len(datos['s']) != m:
+        raise ValueError("p, v y s deben tener exactamente m elementos")
+
+    for i, fila in enumerate(datos['s']):
+        if len(fila) != 3:
+            raise ValueError(f"La fila {i + 1} de resistencias debe tener 3 valores")
+        if min(fila) < 0:
+            raise ValueError(f"La fila {i + 1} de resistencias tiene valores negativos")
+        if sum(fila) != datos['p'][i]:
+            raise ValueError(f"Las resistencias de la opinion {i + 1} deben sumar "
+                             f"p[{i + 1}] = {datos['p'][i]}")
+
+
+def mediana_inicial(datos):
+    """
+    Retorna el indice (base 0) de la mediana de la distribucion inicial p,
+    es decir, la unica posicion que cumple las restricciones de la mediana
+    sin mover a nadie
+    """
+
+    n = datos['n']
+    izquierda = 0
+    for j, personas in enumerate(datos['p']):
+        derecha = n - izquierda - personas
+        if izquierda < n / 2 and derecha <= n / 2:
+            return j
+        izquierda += personas
+    return None
+
+
+def _rutas_utiles(datos, q, max_movs):
+    """
+    Construye los movimientos candidatos cuando la mediana esta en q
+
+    Cada grupo corresponde a un par (opinion origen i, resistencia k) y
+    contiene las rutas i -> j que pueden aparecer en un plan optimo. Se
+    descartan las rutas que nunca mejoran (no reducen la polarizacion ni
+    ayudan a cumplir la mediana) y las dominadas por otra ruta del mismo
+    grupo que es igual o mejor en todos los criterios.
+
+    Retorna:
+        Lista de grupos (i, k, oferta, rutas) donde cada ruta es una tupla
+        (j, movs, costo, ganancia, delta_izq, delta_der)
+    """
+
+    m = datos['m']
+    v = datos['v']
+    s = datos['s']
+    ct = datos['ct']
+    d = [abs(v[j] - v[q]) for j in range(m)]
+
+    grupos = []
+    for i in range(m):
+        for k in range(3):
+            if s[i][k] == 0:
+                continue
+
+            candidatas = []
+            for j in range(m):
+                movs = abs(i - j)
+                if j == i or movs > max_movs:
+                    continue
+                costo = abs(v[i] - v[j]) * RES_COST[k]
+                if costo > ct + EPS:
+                    continue
+                ganancia = d[i] - d[j]
+                delta_izq = (1 if j < q else 0) - (1 if i < q else 0)
+                delta_der = (1 if j > q else 0) - (1 if i > q else 0)
+                # Un movimiento que no reduce la polarizacion y no ayuda
+                # a cumplir la mediana se puede eliminar de cualquier plan
+                if ganancia <= 0 and delta_izq >= 0 and delta_der >= 0:
+                    continue
+                candidatas.append((j, movs, costo, ganancia, delta_izq, delta_der))
+
+            # Una ruta que domina a otra va antes en este orden, asi que
+            # basta compararla con las ya conservadas: por cada par de
+            # deltas de la mediana un frente (costo, ganancia)
+            candidatas.sort(key=lambda r: (r[1], r[2], -r[3], r[4], r[5], r[0]))
+            frentes = {}
+            rutas = []
+            for ruta in candidatas:
+                if any(_domina(frente, ruta[2], ruta[3])
+                       for (d_izq, d_der), frente in frentes.items()
+                       if d_izq <= ruta[4] and d_der <= ruta[5]):
+                    continue
+                rutas.append(ruta)
+                _agregar_pareto(frentes.setdefault(ruta[4:6], []), ruta[2], ruta[3], None)
+            rutas.sort()
+
+            if rutas:
+                grupos.append((i, k, s[i][k], rutas))
+
+    return grupos
+
+
+def _agregar_pareto(frente, costo, ganancia, traza):
+    """
+    Inserta una etiqueta (costo, ganancia) en un frente de Pareto ordenado
+    por costo creciente con ganancia estrictamente creciente
+    """
+
+    # Buscar la posicion de insercion por costo
+    lo, hi = 0, len(frente)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if frente[mid][0] <= costo:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    # Si una etiqueta con costo menor o igual tiene mayor o igual ganancia,
+    # la nueva esta dominada
+    if lo > 0 and frente[lo - 1][1] >= ganancia:
+        return
+
+    # Eliminar las etiquetas con costo mayor o igual que quedan dominadas
+    fin = lo
+    while fin < len(frente) and frente[fin][1] <= ganancia:
+        fin += 1
+    if lo > 0 and frente[lo - 1][0] == costo:
+        lo -= 1
+    frente[lo:fin] = [(costo, ganancia, traza)]
+
+
+def _bloques_binarios(total):
+    """Parte total en bloques 1, 2, 4, ... y un resto, que suman total"""
+    bloques = []
+    bloque = 1
+    while total > 0:
+        tomar = min(bloque, total)
+        bloques.append(tomar)
+        total -= tomar
+        bloque *= 2
+    return bloques
+
+
+def _domina(frente, costo, ganancia):
+    """Indica si alguna etiqueta del frente tiene costo <= y ganancia >="""
+    lo, hi = 0, len(frente)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if frente[mid][0] <= costo:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo > 0 and frente[lo - 1][1] >= ganancia
+
+
+def _podar_por_movimientos(estados):
+    """
+    Elimina las etiquetas dominadas por otra del mismo exceso que usa menos
+    movimientos con menor o igual costo y mayor o igual ganancia
+    """
+
+    por_exceso = {}
+    for clave in estados:
+        por_exceso.setdefault(clave[:2], []).append(clave[2])
+
+    podados = {}
+    for (exc_izq, exc_der), lista_movs in por_exceso.items():
+        acumulado = []
+        for movs in sorted(lista_movs):
+            clave = (exc_izq, exc_der, movs)
+            frente = [et for et in estados[clave] if not _domina(acumulado, et[0], et[1])]
+            if not frente:
+                continue
+            podados[clave] = frente
+            for costo, ganancia, _ in frente:
+                _agregar_pareto(acumulado, costo, ganancia, None)
+    return podados
+
+
+def _multiplicadores(grupos, max_movs, ct, cantidad=6):
+    """
+    Elige los multiplicadores (lam, mu) de maxMovs y ct que dan las cotas
+    lagrangianas mas ajustadas para el subproblema completo
+
+    Los candidatos son los vertices del dual de la relajacion lineal: cada
+    ruta define lam o mu por si sola, y cada par de rutas los dos a la vez.
+    Con muchos candidatos no se evaluan todos: la cota es convexa en
+    (lam, mu), asi que se busca su minimo sobre el eje lam, sobre el eje mu
+    y sobre mu con el mejor lam fijo (ver _multiplicadores_convexos).
+
+    Retorna:
+        Lista con los mejores pares (lam, mu), el mejor primero
+    """
+
+    rutas = [r for grupo in grupos for r in grupo[3] if r[3] > 0]
+    candidatos = {(0.0, 0.0)}
+    for r in rutas:
+        candidatos.add((r[3] / r[1], 0.0))
+        if r[2] > EPS:
+            candidatos.add((0.0, r[3] / r[2]))
+    if len(rutas) <= 40:
+        for a in rutas:
+            for b in rutas:
+                det = a[1] * b[2] - a[2] * b[1]
+                if abs(det) <= EPS:
+                    continue
+                lam = (a[3] * b[2] - a[2] * b[3]) / det
+                mu = (a[1] * b[3] - a[3] * b[1]) / det
+                if lam >= 0 and mu >= 0:
+                    candidatos.add((lam, mu))
+
+    if len(candidatos) > MAX_MULTIPLICADORES:
+        return _multiplicadores_convexos(grupos, max_movs, ct, cantidad)
+
+    def cota(par):
+        lam, mu = par
+        total = lam * max_movs + mu * max(ct, 0.0)
+        for _, _, oferta, rutas_grupo in grupos:
+            total += oferta * max(0.0, max(r[3] - lam * r[1] - mu * r[2] for r in rutas_grupo))
+        return total
+
+    # Quitar candidatos repetidos por errores de redondeo
+    unicos = {(round(lam, 12), round(mu, 12)) for lam, mu in candidatos}
+    return sorted(unicos, key=cota)[:cantidad]
+
+
+def _multiplicadores_convexos(grupos, max_movs, ct, cantidad):
+    """
+    Version de _multiplicadores para muchas rutas: evalua la cota con NumPy
+    sobre todas las rutas a la vez y, como es convexa, busca por biseccion
+    el mejor candidato de cada eje en lugar de probarlos todos
+
+    Retorna:
+        Lista con los mejores pares (lam, mu) evaluados, el mejor primero
+    """
+
+    rutas = [r for grupo in grupos for r in grupo[3]]
+    ganancia = np.array([r[3] for r in rutas])
+    movs = np.array([r[1] for r in rutas], dtype=float)
+    costo = np.array([r[2] for r in rutas])
+    oferta = np.array([grupo[2] for grupo in grupos], dtype=float)
+    inicios = np.cumsum([0] + [len(grupo[3]) for grupo in grupos[:-1]])
+
+    evaluados = {}
+
+    def cota(lam, mu):
+        par = (round(lam, 12), round(mu, 12))
+        if par not in evaluados:
+            mejores = np.maximum.reduceat(ganancia - lam * movs - mu * costo, inicios)
+            evaluados[par] = (lam * max_movs + mu * max(ct, 0.0)
+                              + float(oferta @ np.maximum(mejores, 0.0)))
+        return evaluados[par]
+
+    def minimo(valores, evaluar):
+        # Biseccion sobre una secuencia unimodal (muestras de una funcion convexa)
+        valores = np.unique(valores[valores >= 0])
+        lo, hi = 0, len(valores) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if evaluar(valores[mid]) <= evaluar(valores[mid + 1]):
+                hi = mid
+            else:
+                lo = mid + 1
+        return float(valores[lo]) if len(valores) else 0.0
+
+    cota(0.0, 0.0)
+    positivas = ganancia > 0
+    lam = minimo(ganancia[positivas] / movs[positivas], lambda lam: cota(lam, 0.0))
+    con_costo = positivas & (costo > EPS)
+    minimo(ganancia[con_costo] / costo[con_costo], lambda mu: cota(0.0, mu))
+    reducida = ganancia - lam * movs
+    con_costo = (reducida > 0) & (costo > EPS)
+    minimo(reducida[con_costo] / costo[con_costo], lambda mu: cota(lam, mu))
+
+    return sorted(evaluados, key=evaluados.get)[:cantidad]
+
+
+def _plan_voraz(datos, q, grupos, max_movs, exceso_izq, exceso_der, precios):
+    """
+    Construye rapidamente un plan factible con la mediana en q para usarlo
+    como primera cota del subproblema
+
+    Primero cubre el exceso de cada lado con las rutas que menos recursos
+    consumen. Luego reparte el presupuesto como en la mochila de eleccion
+    multiple: cada grupo ofrece incrementos (no moverse -> ruta corta ->
+    ruta larga) sobre su envolvente convexa y se aplican en orden de
+    ganancia por recurso. Los recursos se valoran con los precios (lam, mu)
+    de la cota lagrangiana.
+
+    Retorna:
+        La matriz x[k][i][j] del plan, o None si no logra cumplir la mediana
+    """
+
+    m = datos['m']
+    ct = datos['ct']
+    lam, mu = precios
+    if lam <= EPS and mu <= EPS:
+        lam, mu = 1.0 / max(max_movs, 1), 1.0 / max(ct, EPS)
+
+    def recurso(ruta):
+        return lam * ruta[1] + mu * ruta[2]
+
+    x = [[[0] * m for _ in range(m)] for _ in range(3)]
+    restante = [oferta for _, _, oferta, _ in grupos]
+    movs_libres = max_movs
+    costo_libre = ct
+    exceso = [exceso_izq, exceso_der]
+
+    def cabe(movs, costo, limite):
+        c = limite
+        if movs > 0:
+            c = min(c, movs_libres // movs)
+        if costo > EPS:
+            c = min(c, int((costo_libre + EPS) // costo))
+        return c
+
+    def aplicar(g, ruta, c, signo=1):
+        nonlocal movs_libres, costo_libre
+        j, movs, costo, _, d_izq, d_der = ruta
+        i, k = grupos[g][0], grupos[g][1]
+        x[k][i][j] += signo * c
+        movs_libres -= signo * c * movs
+        costo_libre -= signo * c * costo
+        exceso[0] += signo * c * d_izq
+        exceso[1] += signo * c * d_der
+
+    rutas = [(g, ruta) for g, grupo in enumerate(grupos) for ruta in grupo[3]]
+
+    # Cubrir el exceso de cada lado de la mediana
+    for lado in (0, 1):
+        for g, ruta in sorted(rutas, key=lambda gr: recurso(gr[1])):
+            if exceso[lado] <= 0:
+                break
+            if ruta[4 + lado] >= 0 or ruta[5 - lado] > 0:
+                continue
+            c = cabe(ruta[1], ruta[2], min(restante[g], exceso[lado]))
+            if c > 0:
+                aplicar(g, ruta, c)
+                restante[g] -= c
+        if exceso[lado] > 0:
+            return None
+
+    # Incrementos de la envolvente convexa (recurso, ganancia) de cada grupo
+    incrementos = []
+    for g, (_, _, _, rutas_grupo) in enumerate(grupos):
+        puntos = sorted((r for r in rutas_grupo
+                         if r[3] > 0 and r[4] <= 0 and r[5] <= 0),
+                        key=lambda r: (recurso(r), -r[3]))
+        envolvente = []
+        for ruta in puntos:
+            if envolvente and ruta[3] <= envolvente[-1][3]:
+                continue
+            # Quitar el ultimo punto si queda por debajo del segmento
+            # que une al penultimo (o al origen) con la nueva ruta
+            while envolvente:
+                ult = envolvente[-1]
+                if len(envolvente) > 1:
+                    r_ant, g_ant = recurso(envolvente[-2]), envolvente[-2][3]
+                else:
+                    r_ant, g_ant = 0.0, 0.0
+                izq = (ult[3] - g_ant) * (recurso(ruta) - recurso(ult))
+                der = (ruta[3] - ult[3]) * (recurso(ult) - r_ant)
+                if izq <= der:
+                    envolvente.pop()
+                else:
+                    break
+            envolvente.append(ruta)
+
+        previa = None
+        for ruta in envolvente:
+            delta_r = recurso(ruta) - (recurso(previa) if previa else 0.0)
+            delta_g = ruta[3] - (previa[3] if previa else 0.0)
+            eficiencia = delta_g / delta_r if delta_r > EPS else math.inf
+            incrementos.append((eficiencia, g, previa, ruta))
+            previa = ruta
+
+    # Aplicar los incrementos en orden de eficiencia; cada grupo avanza en
+    # orden porque su envolvente tiene eficiencias decrecientes
+    en_ruta = {}
+    incrementos.sort(key=lambda inc: -inc[0])
+    for _, g, previa, ruta in incrementos:
+        if previa is None:
+            c = restante[g]
+            anterior = (0, 0.0, 0, 0)
+        else:
+            c = en_ruta.get((g, previa[0]), 0)
+            anterior = previa[1:3] + previa[4:6]
+        c = cabe(ruta[1] - anterior[0], ruta[2] - anterior[1], c)
+        # No deshacer lo ya conseguido en las restricciones de la mediana
+        for lado in (0, 1):
+            delta = ruta[4 + lado] - anterior[2 + lado]
+            if delta > 0:
+                c = min(c, max(0, -exceso[lado]) // delta)
+        if c <= 0:
+            continue
+        if previa is None:
+            restante[g] -= c
+        else:
+            en_ruta[(g, previa[0])] -= c
+            aplicar(g, previa, c, -1)
+        aplicar(g, ruta, c)
+        en_ruta[(g, ruta[0])] = en_ruta.get((g, ruta[0]), 0) + c
+
+    return x
+
+
+def plan_voraz(datos, q):
+    """
+    Construye rapidamente un plan factible con la mediana fija en la
+    opinion q (base 0), sin garantia de optimalidad
+
+    Retorna:
+        La matriz x[k][i][j] del plan, o None si no se encontro uno factible
+    """
+
+    n = datos['n']
+    p = datos['p']
+    ct = datos['ct']
+    max_movs = int(math.floor(datos['maxMovs'] + EPS))
+    if max_movs < 0 or ct < -EPS:
+        return None
+
+    exceso_izq = sum(p[:q]) - (math.ceil(n / 2) - 1)
+    exceso_der = sum(p[q + 1:]) - n // 2
+    grupos = _rutas_utiles(datos, q, max_movs)
+    precios = _multiplicadores(grupos, max_movs, ct, 1)[0]
+    return _plan_voraz(datos, q, grupos, max_movs, exceso_izq, exceso_der, precios)
+
+
+def cota_inferior(datos, q):
+    """
+    Calcula una cota inferior de total_polarization con la mediana fija en
+    la opinion q (base 0), sin resolver el subproblema
+
+    Retorna:
+        La cota, o math.inf si el subproblema es claramente infactible
+    """
+
+    n = datos['n']
+    m = datos['m']
+    p = datos['p']
+    v = datos['v']
+    ct = datos['ct']
+    max_movs = int(math.floor(datos['maxMovs'] + EPS))
+    if max_movs < 0 or ct < -EPS:
+        return math.inf
+
+    base = sum(p[j] * abs(v[j] - v[q]) for j in range(m))
+    exceso_izq = sum(p[:q]) - (math.ceil(n / 2) - 1)
+    exceso_der = sum(p[q + 1:]) - n // 2
+    grupos = _rutas_utiles(datos, q, max_movs)
+
+    # Personas que podrian cruzar hacia la mediana desde cada lado
+    reduce_izq = sum(oferta for _, _, oferta, rutas in grupos if any(r[4] < 0 for r in rutas))
+    reduce_der = sum(oferta for _, _, oferta, rutas in grupos if any(r[5] < 0 for r in rutas))
+    if exceso_izq > min(reduce_izq, max_movs) or exceso_der > min(reduce_der, max_movs):
+        return math.inf
+
+    lam, mu = _multiplicadores(grupos, max_movs, ct, 1)[0]
+    ganancia_max = lam * max_movs + mu * ct
+    for _, _, oferta, rutas in grupos:
+        ganancia_max += oferta * max(0.0, max(r[3] - lam * r[1] - mu * r[2] for r in rutas))
+    return max(0.0, base - ganancia_max)
+
+
+def _resolver_mediana(datos, q, cota=math.inf, cota_externa=None, detener=None):
+    """
+    Resuelve el subproblema con la mediana fija en la opinion q (base 0)
+
+    Parametros:
+        datos: diccionario con la instancia
+        q: indice de la mediana
+        cota: polarizacion de la mejor solucion conocida; solo se buscan
+              planes estrictamente mejores
+        cota_externa: funcion opcional que retorna la mejor polarizacion
+                      encontrada por otros procesos; se consulta al cerrar
+                      cada grupo para abandonar la busqueda cuanto antes
+        detener: funcion opcional (por ejemplo Limite.agotado) que se
+                 consulta en cada paso; si retorna True la busqueda se
+                 abandona y se retorna el plan voraz si mejoraba la cota
+
+    Retorna:
+        Tupla (polarizacion, x) con el mejor plan encontrado, o None si no
+        existe un plan factible que mejore la cota. Si detener corto la
+        busqueda el plan no es necesariamente el optimo de q
+    """
+
+    n = datos['n']
+    m = datos['m']
+    p = datos['p']
+    v = datos['v']
+    ct = datos['ct']
+    max_movs = int(math.floor(datos['maxMovs'] + EPS))
+    if max_movs < 0 or ct < -EPS:
+        return None
+
+    d = [abs(v[j] - v[q]) for j in range(m)]
+    base = sum(p[j] * d[j] for j in range(m))
+
+    # Exceso de personas a cada lado de la mediana:
+    # sum(p_prime[1..q-1]) < n/2  y  sum(p_prime[q+1..m]) <= n/2
+    exceso_izq = sum(p[:q]) - (math.ceil(n / 2) - 1)
+    exceso_der = sum(p[q + 1:]) - n // 2
+
+    grupos = _rutas_utiles(datos, q, max_movs)
+
+    # Ordenar los grupos por su mejor ganancia por movimiento para encontrar
+    # buenos planes temprano y podar mas
+    grupos.sort(key=lambda g: -max(r[3] / r[1] for r in g[3]))
+
+    # Si el presupuesto ct nunca se alcanza, el costo deja de ser criterio
+    costo_max = 0.0
+    razon_costo = 0.0
+    for _, _, oferta, rutas in grupos:
+        costo_max += oferta * max(r[2] for r in rutas)
+        razon_costo = max(razon_costo, max(r[2] / r[1] for r in rutas))
+    costo_activo = min(costo_max, razon_costo * max_movs) > ct + EPS
+
+    # Limites para recortar los contadores de exceso: si ningun movimiento
+    # aumenta un lado, basta con saber cuanto falta por reducir
+    sube_izq = any(r[4] > 0 for g in grupos for r in g[3])
+    sube_der = any(r[5] > 0 for g in grupos for r in g[3])
+    piso_izq = -max_movs if sube_izq else 0
+    piso_der = -max_movs if sube_der else 0
+
+    # Cotas lagrangianas sobre lo que aun pueden aportar los grupos
+    # restantes: para cada par (lam, mu) la suma lam * movs libres +
+    # mu * costo libre + ganancias reducidas positivas acota la ganancia
+    multiplicadores = _multiplicadores(grupos, max_movs, ct)
+    G = len(grupos)
+    reducidas = [[0.0] * (G + 1) for _ in multiplicadores]
+    reduce_izq = [0] * (G + 1)
+    reduce_der = [0] * (G + 1)
+    for g in range(G - 1, -1, -1):
+        _, _, oferta, rutas = grupos[g]
+        for t, (lam, mu) in enumerate(multiplicadores):
+            mejor_ruta = max(r[3] - lam * r[1] - mu * r[2] for r in rutas)
+            reducidas[t][g] = reducidas[t][g + 1] + oferta * max(0.0, mejor_ruta)
+        reduce_izq[g] = reduce_izq[g + 1] + (oferta if any(r[4] < 0 for r in rutas) else 0)
+        reduce_der[g] = reduce_der[g + 1] + (oferta if any(r[5] < 0 for r in rutas) else 0)
+
+    def viable(g, movs, costo, exc_izq, exc_der, ganancia):
+        libres = max_movs - movs
+        if exc_izq > min(reduce_izq[g], libres) or exc_der > min(reduce_der[g], libres):
+            return False
+        limite = base - ganancia - cota + EPS
+        costo_libre = ct - costo
+        for t, (lam, mu) in enumerate(multiplicadores):
+            if lam * libres + mu * costo_libre + reducidas[t][g] <= limite:
+                return False
+        return True
+
+    # Un plan voraz da una primera cota para podar la busqueda
+    voraz = _plan_voraz(datos, q, grupos, max_movs, exceso_izq, exceso_der,
+                        multiplicadores[0])
+    pol_voraz = polarizacion_de(datos, voraz, q) if voraz is not None else math.inf
+    if pol_voraz < cota - EPS:
+        cota = pol_voraz
+    else:
+        voraz = None
+
+    # Estados: (exceso_izq, exceso_der, movs) -> frente de Pareto (costo, ganancia)
+    inicial = (max(exceso_izq, piso_izq), max(exceso_der, piso_der), 0)
+    if not viable(0, 0, 0.0, inicial[0], inicial[1], 0.0):
+        return (pol_voraz, voraz) if voraz is not None else None
+    estados = {inicial: [(0.0, 0.0, None)]}
+
+    for g, (i, k, oferta, rutas) in enumerate(grupos):
+        if cota_externa is not None:
+            cota = min(cota, cota_externa())
+        if detener is not None and detener():
+            return (pol_voraz, voraz) if voraz is not None else None
+
+        # Dentro del grupo se lleva la cuenta de cuantas personas ya se
+        # movieron, porque todas las rutas comparten la oferta s[i, k]
+        parciales = {(clave, 0): frente for clave, frente in estados.items()}
+
+        if len(rutas) == 1:
+            # Con una sola ruta la oferta se parte en bloques 1, 2, 4, ...
+            # (division binaria) y cada bloque se toma o no; asi no hace
+            # falta probar todas las cantidades posibles
+            tope = min(oferta, max_movs // rutas[0][1])
+            pasos = [(rutas[0], bloque) for bloque in _bloques_binarios(tope)]
+        else:
+            pasos = [(ruta, None) for ruta in rutas]
+
+        for (j, movs, costo, ganancia, d_izq, d_der), bloque in pasos:
+            if detener is not None and detener():
+                return (pol_voraz, voraz) if voraz is not None else None
+            nuevos = {}
+            for (clave, usados), frente in parciales.items():
+                if detener is not None and detener():
+                    return (pol_voraz, voraz) if voraz is not None else None
+                exc_izq, exc_der, mov_base = clave
+                libres = max_movs - mov_base
+                if bloque is None:
+                    cantidades = range(min(oferta - usados, libres // movs) + 1)
+                else:
+                    cantidades = (0, bloque) if bloque * movs <= libres else (0,)
+                for c in cantidades:
+                    nueva_clave = (max(exc_izq + c * d_izq, piso_izq),
+                                   max(exc_der + c * d_der, piso_der),
+                                   mov_base + c * movs)
+                    nuevos_usados = usados + c if bloque is None else usados
+                    destino = nuevos.setdefault((nueva_clave, nuevos_usados), [])
+                    for costo_base, gan_base, traza in frente:
+                        nuevo_costo = costo_base + c * costo if costo_activo else 0.0
+                        if nuevo_costo > ct + EPS:
+                            break
+                        nueva_gan = gan_base + c * ganancia
+                        if c and not viable(g, nueva_clave[2], nuevo_costo, nueva_clave[0],
+                                            nueva_clave[1], nueva_gan):
+                            continue
+                        nueva_traza = (traza, i, j, k, c) if c else traza
+                        _agregar_pareto(destino, nuevo_costo, nueva_gan, nueva_traza)
+            parciales = nuevos
+
+        # Cerrar el grupo: olvidar el contador de usados y podar
+        estados = {}
+        for (clave, _), frente in parciales.items():
+            exc_izq, exc_der, movs = clave
+            destino = None
+            for costo_base, gan_base, traza in frente:
+                if not viable(g + 1, movs, costo_base, exc_izq, exc_der, gan_base):
+                    continue
+                if destino is None:
+                    destino = estados.setdefault(clave, [])
+                _agregar_pareto(destino, costo_base, gan_base, traza)
+        estados = _podar_por_movimientos(estados)
+
+    # Elegir el mejor estado final que cumple las restricciones de la mediana
+    mejor = None
+    for (exc_izq, exc_der, _), frente in estados.items():
+        if exc_izq > 0 or exc_der > 0:
+            continue
+        etiqueta = frente[-1]
+        if mejor is None or etiqueta[1] > mejor[1]:
+            mejor = etiqueta
+    if mejor is None:
+        return (pol_voraz, voraz) if voraz is not None else None
+
+    # Reconstruir la matriz de movimientos a partir de la traza
+    x = [[[0] * m for _ in range(m)] for _ in range(3)]
+    traza = mejor[2]
+    while traza is not None:
+        traza, i, j, k, c = traza
+        x[k][i][j] += c
+
+    polarizacion = polarizacion_de(datos, x, q)
+    if polarizacion >= cota - EPS:
+        return (pol_voraz, voraz) if voraz is not None else None
+    return polarizacion, x
+
+
+def distribucion_final(datos, x):
+    """Calcula p_prime a partir de la matriz de movimientos x[k][i][j]"""
+    m = datos['m']
+    p_prime = list(datos['p'])
+    for k in range(3):
+        for i in range(m):
+            for j in range(m):
+                p_prime[j] += x[k][i][j]
+                p_prime[i] -= x[k][i][j]
+    return p_prime
+
+
+def polarizacion_de(datos, x, q):
+    """Calcula total_polarization para el plan x con la mediana en q (base 0)"""
+    v = datos['v']
+    p_prime = distribucion_final(datos, x)
+    return sum(p_prime[j] * abs(v[j] - v[q]) for j in range(datos['m']))
+
+
+def _solucion_inicial(inicial):
+    """
+    Convierte un resultado factible conocido en la tupla (polarizacion, x, q)
+    que usan los resolvedores como primera cota, o None si no sirve
+    """
+
+    if inicial is None or inicial['estado'] not in ('OPTIMO', 'SOLUCION'):
+        return None
+    return (inicial['polarizacion'], inicial['x'], inicial['med_pos'] - 1)
+
+
+def resultado_interrumpido(datos, mejor, pendientes, motivo, tiempo):
+    """
+    Arma el resultado de una busqueda que se detuvo antes de terminar
+
+    Parametros:
+        mejor: tupla (polarizacion, x, q) de la mejor solucion, o None
+        pendientes: posiciones de la mediana (base 0) que no se terminaron
+        motivo: 'TIMEOUT' o 'CANCELADO'
+
+    Retorna:
+        Diccionario como el de resolver_nativo con estado 'SOLUCION' (o el
+        motivo si no hay solucion), interrupcion, gap y cota_inferior; la
+        cota es la menor entre la solucion y cota_inferior de las
+        posiciones pendientes
+    """
+
+    if mejor is None:
+        return {'estado': motivo, 'interrupcion': motivo, 'polarizacion': None,
+                'gap': None, 'cota_inferior': None, 'tiempo': tiempo}
+
+    polarizacion, x, q = mejor
+    inferior = min([polarizacion] + [cota_inferior(datos, r) for r in pendientes])
+    return {
+        'estado': 'SOLUCION',
+        'interrupcion': motivo,
+        'polarizacion': polarizacion,
+        'med_pos': q + 1,
+        'p_prime': distribucion_final(datos, x),
+        'x': x,
+        'gap': (polarizacion - inferior) / polarizacion if polarizacion > EPS else 0.0,
+        'cota_inferior': inferior,
+        'tiempo': tiempo
+    }
+
+
+def resolver_nativo(datos, inicial=None, tiempo_max=None, cancelar=None):
+    """
+    Resuelve una instancia de MinPol sin usar MiniZinc
+
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+               (el mismo que retorna parser.leer_txt)
+        inicial: resultado factible opcional (por ejemplo, el de
+                 heuristica.resolver_heuristico) que sirve de primera cota
+        tiempo_max: segundos maximos de busqueda (None para no limitar)
+        cancelar: threading.Event opcional para detener la busqueda
+
+    Retorna:
+        Diccionario con las llaves:
+        - estado: 'OPTIMO' o 'INSATISFACIBLE'; si se agoto el tiempo o se
+          cancelo, 'SOLUCION' con la mejor solucion encontrada (o 'TIMEOUT'
+          / 'CANCELADO' si no habia ninguna), ver resultado_interrumpido
+        - polarizacion: valor de total_polarization
+        - med_pos: indice (1..m) de la mediana
+        - p_prime: distribucion final
+        - x: matriz de movimientos x[k][i][j] (indices base 0)
+        - tiempo: segundos empleados
+    """
+
+    inicio = time.perf_counter()
+    validar_datos(datos)
+    m = datos['m']
+    limite = Limite(tiempo_max, cancelar)
+
+    # Empezar por la mediana inicial: el plan vacio ya es factible y da
+    # una primera cota para podar las demas posiciones
+    q0 = mediana_inicial(datos)
+    orden = list(range(m))
+    if q0 is not None:
+        orden.remove(q0)
+        orden.insert(0, q0)
+
+    mejor = _solucion_inicial(inicial)
+    for t, q in enumerate(orden):
+        cota = mejor[0] if mejor else math.inf
+        sol = _resolver_mediana(datos, q, cota, detener=limite.agotado)
+        if sol is not None:
+            mejor = (sol[0], sol[1], q)
+        if limite.motivo is not None:
+            return resultado_interrumpido(datos, mejor, orden[t:], limite.motivo,
+                                          time.perf_counter() - inicio)
+
+    tiempo = time.perf_counter() - inicio
+    if mejor is None:
+        return {'estado': 'INSATISFACIBLE', 'tiempo': tiempo}
+
+    polarizacion, x, q = mejor
+    return {
+        'estado': 'OPTIMO',
+        'polarizacion': polarizacion,
+        'med_pos': q + 1,
+        'p_prime': distribucion_final(datos, x),
+        'x': x,
+        'tiempo': tiempo
+    }
+
+
+# Mejor polarizacion compartida entre los procesos del modo paralelo
+_mejor_compartida = None
+
+
+def _iniciar_trabajador(mejor_compartida):
+    """Guarda en cada proceso la referencia a la mejor polarizacion compartida"""
+    global _mejor_compartida
+    _mejor_compartida = mejor_compartida
+
+
+def _leer_mejor():
+    """Retorna la mejor polarizacion encontrada hasta ahora por cualquier proceso"""
+    return _mejor_compartida.value
+
+
+def _resolver_mediana_paralelo(datos, q, fin=None):
+    """
+    Resuelve el subproblema de la mediana q dentro de un proceso del pool
+    y publica su polarizacion si mejora la mejor compartida
+
+    fin es el instante (time.time()) en que se agota el tiempo, o None.
+    Retorna la tupla (q, solucion, completo)
+    """
+
+    limite = Limite(max(fin - time.time(), 0.0) if fin is not None else None)
+    sol = _resolver_mediana(datos, q, _leer_mejor(), _leer_mejor, limite.agotado)
+    if sol is not None:
+        with _mejor_compartida.get_lock():
+            if sol[0] < _mejor_compartida.value:
+                _mejor_compartida.value = sol[0]
+    return q, sol, limite.motivo is None
+
+
+def resolver_paralelo(datos, procesos=None, inicial=None, tiempo_max=None):
+    """
+    Resuelve una instancia de MinPol repartiendo entre varios procesos los
+    m subproblemas con la mediana fija
+
+    Los subproblemas se lanzan en orden de cota inferior creciente. Cada
+    proceso publica su mejor polarizacion en un valor compartido que los
+    demas consultan para podar; los subproblemas cuya cota inferior ya no
+    mejora la mejor solucion se cancelan antes de empezar.
+
+    Parametros:
+        datos: diccionario con las llaves n, m, p, v, s, ct y maxMovs
+        procesos: numero de procesos del pool (por defecto, uno por nucleo)
+        inicial: resultado factible opcional que sirve de primera cota
+        tiempo_max: segundos maximos de busqueda (None para no limitar)
+
+    Retorna:
+        El mismo diccionario que resolver_nativo
+    """
+
+    inicio = time.perf_counter()
+    fin = time.time() + tiempo_max if tiempo_max is not None else None
+    validar_datos(datos)
+    m = datos['m']
+
+    # El plan vacio con la mediana inicial es factible y da la primera cota
+    mejor = _solucion_inicial(inicial)
+    q0 = mediana_inicial(datos)
+    if q0 is not None:
+        vacio = [[[0] * m for _ in range(m)] for _ in range(3)]
+        pol_vacio = polarizacion_de(datos, vacio, q0)
+        if mejor is None or pol_vacio < mejor[0]:
+            mejor = (pol_vacio, vacio, q0)
+
+    cotas = {q: cota_inferior(datos, q) for q in range(m)}
+    orden = sorted((q for q in range(m) if cotas[q] < math.inf), key=lambda q: cotas[q])
+
+    mejor_compartida = multiprocessing.Value('d', mejor[0] if mejor else math.inf)
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count(),
+                             initializer=_iniciar_trabajador,
+                             initargs=(mejor_compartida,)) as pool:
+        pendientes = {pool.submit(_resolver_mediana_paralelo, datos, q, fin): q for q in orden}
+        incompletas = []
+        while pendientes:
+            listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                del pendientes[futuro]
+                if futuro.cancelled():
+                    continue
+                q, sol, completo = futuro.result()
+                if not completo:
+                    incompletas.append(q)
+                if sol is not None and (mejor is None or sol[0] < mejor[0] - EPS):
+                    mejor = (sol[0], sol[1], q)
+
+            # Cancelar los subproblemas que aun no empiezan y ya no pueden mejorar
+            if mejor is not None:
+                for futuro, q in list(pendientes.items()):
+                    if cotas[q] >= mejor[0] - EPS and futuro.cancel():
+                        del pendientes[futuro]
+
+    tiempo = time.perf_counter() - inicio
+    if incompletas:
+        return resultado_interrumpido(datos, mejor, incompletas, 'TIMEOUT', tiempo)
+    if mejor is None:
+        return {'estado': 'INSATISFACIBLE', 'tiempo': tiempo}
+
+    polarizacion, x, q = mejor
+    return {
+        'estado': 'OPTIMO',
+        'polarizacion': polarizacion,
+        'med_pos': q + 1,
+        'p_prime': distribucion_final(datos, x),
+        'x': x,
+        'tiempo': tiempo
+    }
+
+
+def formatear_salida(resultado):
+    """
+    Genera el mismo texto que imprime la seccion output de Proyecto.mzn:
+    la polarizacion multiplicada por 1000 y redondeada, y luego las
+    matrices de movimientos para cada nivel de resistencia
+    """
+
+    if resultado['estado'] == 'INSATISFACIBLE':
+        return "=====UNSATISFIABLE=====\n"
+    if resultado['estado'] not in ('OPTIMO', 'SOLUCION'):
+        return "=====UNKNOWN=====\n"
+
+    lineas = [str(int(math.floor(resultado['polarizacion'] * 1000.0 + 0.5)))]
+    for k, matriz in enumerate(resultado['x'], 1):
+        lineas.append(str(k))
+        for fila in matriz:
+            lineas.append(",".join(str(val) for val in fila))
+    return "\n".join(lineas) + "\n"
+
+
+# Bloque principal que se ejecuta cuando se corre el script directamente
+if __name__ == "__main__":
+    import sys
+    from parser import leer_txt
+
+    argumentos = [arg for arg in sys.argv[1:] if arg != '--paralelo']
+    if len(argumentos) != 1:
+        print("Uso:")
+        print("  python solver_nativo.py input.txt")
+        print("  python solver_nativo.py --paralelo input.txt")
+        sys.exit(1)
+
+    if '--paralelo' in sys.argv:
+        resultado = resolver_paralelo(leer_txt(argumentos[0]))
+    else:
+        resultado = resolver_nativo(leer_txt(argumentos[0]))
+    print(formatear_salida(resultado), end="")
+    print(f"Tiempo: {resultado['tiempo']:.4f}s")
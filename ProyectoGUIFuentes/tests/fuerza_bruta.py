@@ -0,0 +1,97 @@
+"""
+Resolucion por fuerza bruta de instancias pequenas de MinPol y generador
+de instancias aleatorias para comparar los motores contra ella
+"""
+
+import itertools
+import random
+
+from solver_nativo import RES_COST, EPS
+
+
+def instancia_aleatoria(rng, m_max=4, n_max=6, ordenada=False):
+    """
+    Genera una instancia pequena valida (cada fila de s suma p[i]); con
+    ordenada=False los valores de v pueden venir en cualquier orden
+    """
+
+    m = rng.randint(2, m_max)
+    n = rng.randint(1, n_max)
+    p = [0] * m
+    for _ in range(n):
+        p[rng.randrange(m)] += 1
+    v = [round(rng.random(), 3) for _ in range(m)]
+    if ordenada:
+        v.sort()
+    s = []
+    for personas in p:
+        fila = [0, 0, 0]
+        for _ in range(personas):
+            fila[rng.randrange(3)] += 1
+        s.append(fila)
+    return {'n': n, 'm': m, 'p': p, 'v': v, 's': s,
+            'ct': round(rng.uniform(0, 3), 2), 'maxMovs': rng.randint(0, 2 * m)}
+
+
+def _repartos(total, destinos):
+    """Formas de repartir a lo sumo total personas entre destinos"""
+    for cantidades in itertools.product(range(total + 1), repeat=len(destinos)):
+        if sum(cantidades) <= total:
+            yield cantidades
+
+
+def optimos_por_mediana(datos):
+    """
+    Menor total_polarization de los planes factibles con la mediana en cada
+    posicion q, o None en las posiciones que ningun plan alcanza
+    """
+
+    n, m, v = datos['n'], datos['m'], datos['v']
+    grupos = [(k, i) for i in range(m) for k in range(3) if datos['s'][i][k] > 0]
+    mejores = [None] * m
+
+    def evaluar(p_prime):
+        izquierda = 0
+        for q in range(m):
+            derecha = n - izquierda - p_prime[q]
+            if izquierda < n / 2 and derecha <= n / 2:
+                valor = sum(p_prime[j] * abs(v[j] - v[q]) for j in range(m))
+                if mejores[q] is None or valor < mejores[q]:
+                    mejores[q] = valor
+            izquierda += p_prime[q]
+
+    def explorar(indice, p_prime, costo, movs):
+        if indice == len(grupos):
+            evaluar(p_prime)
+            return
+        k, i = grupos[indice]
+        destinos = [j for j in range(m) if j != i]
+        for cantidades in _repartos(datos['s'][i][k], destinos):
+            costo_extra = sum(c * abs(v[i] - v[j]) * RES_COST[k] for c, j in zip(cantidades, destinos))
+            movs_extra = sum(c * abs(i - j) for c, j in zip(cantidades, destinos))
+            if costo + costo_extra > datos['ct'] + EPS or movs + movs_extra > datos['maxMovs'] + EPS:
+                continue
+            siguiente = list(p_prime)
+            for c, j in zip(cantidades, destinos):
+                siguiente[j] += c
+                siguiente[i] -= c
+            explorar(indice + 1, siguiente, costo + costo_extra, movs + movs_extra)
+
+    explorar(0, list(datos['p']), 0.0, 0)
+    return mejores
+
+
+def polarizacion_optima(datos):
+    """
+    Menor total_polarization sobre todos los planes factibles, o None si
+    ninguno cumple las restricciones
+    """
+
+    factibles = [valor for valor in optimos_por_mediana(datos) if valor is not None]
+    return min(factibles) if factibles else None
+
+
+def instancias(semilla, cantidad, **opciones):
+    """Lista reproducible de instancias aleatorias pequenas"""
+    rng = random.Random(semilla)
+    return [instancia_aleatoria(rng, **opciones) for _ in range(cantidad)]
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Ejecutable de prueba que imita a minizinc para los tests del portafolio y
+de anytime. El comportamiento sale del solver (--solver) o, si no hay,
+de la variable de entorno MINIZINC_FALSO (un numero al final del solver
+se ignora, para lanzar varios con el mismo comportamiento):
+- rapido: una solucion y la marca de optimo
+- insatisfacible: la marca de insatisfacible
+- falla: un error en stderr y codigo de salida 1
+- lento: no responde (hasta que lo terminen)
+- mejora: dos soluciones intermedias y luego no responde
+- mejora_optimo: dos soluciones intermedias y la marca de optimo
+Si MINIZINC_FALSO_PIDS es un directorio, deja ahi un archivo con su pid.
+"""
+
+import os
+import sys
+import time
+
+
+def solucion(polarizacion):
+    print(polarizacion)
+    for k in (1, 2, 3):
+        print(k)
+        print("0,0")
+        print("0,0")
+    print("----------", flush=True)
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    modo = os.environ.get('MINIZINC_FALSO', 'rapido')
+    if "--solver" in argumentos:
+        # lento2, lento3, ... se comportan como lento
+        modo = argumentos[argumentos.index("--solver") + 1].rstrip("0123456789")
+
+    directorio = os.environ.get('MINIZINC_FALSO_PIDS')
+    if directorio:
+        open(os.path.join(directorio, str(os.getpid())), 'w').close()
+
+    if modo == 'rapido':
+        time.sleep(0.05)
+        solucion(1250)
+        print("==========")
+    elif modo == 'insatisfacible':
+        print("=====UNSATISFIABLE=====")
+    elif modo == 'falla':
+        print("Error: modelo invalido", file=sys.stderr)
+        sys.exit(1)
+    elif modo in ('mejora', 'mejora_optimo'):
+        solucion(5000)
+        time.sleep(0.05)
+        solucion(3000)
+        if modo == 'mejora_optimo':
+            print("==========")
+        else:
+            time.sleep(60)
+    else:
+        time.sleep(60)
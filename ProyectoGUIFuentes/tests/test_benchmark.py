@@ -0,0 +1,38 @@
+import multiprocessing
+import os
+
+import pytest
+
+import benchmark
+from benchmark import medir_solucion
+from generador import generar_instancia
+
+
+DATOS = generar_instancia(50, 3, semilla=0)
+
+# Los parches de resolver_datos solo llegan al proceso hijo con fork
+con_fork = pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                              reason="el hijo no hereda los parches sin fork")
+
+
+@con_fork
+def test_hijo_que_muere_da_error_con_su_codigo(monkeypatch):
+    # El hijo muere sin enviar nada
+    monkeypatch.setattr(benchmark, 'resolver_datos', lambda *args: os._exit(9))
+    assert medir_solucion(DATOS, 'nativo', 5) == ('ERROR', None, None,
+                                                  "El proceso termino con codigo 9")
+
+
+@con_fork
+def test_excepcion_del_hijo_llega_por_la_tuberia(monkeypatch):
+    def fallar(*args):
+        raise MemoryError("sin memoria")
+
+    monkeypatch.setattr(benchmark, 'resolver_datos', fallar)
+    assert medir_solucion(DATOS, 'nativo', 5) == ('ERROR', None, None, "MemoryError: sin memoria")
+
+
+def test_medicion_normal():
+    estado, polarizacion, tiempo, error = medir_solucion(DATOS, 'nativo', 5)
+    assert estado == 'OPTIMO' and error is None
+    assert polarizacion is not None and tiempo is not None
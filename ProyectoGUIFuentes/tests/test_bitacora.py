@@ -0,0 +1,124 @@
+import os
+import time
+
+import pytest
+
+import lote
+from bitacora import Bitacora
+from lote import ejecutar_lote_reanudable, trabajar
+
+
+RUTA_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "DatosProyecto")
+
+
+def test_solo_un_trabajador_reclama(tmp_path):
+    a = Bitacora(str(tmp_path), trabajador="a")
+    b = Bitacora(str(tmp_path), trabajador="b")
+    assert a.reclamar("k")
+    assert not b.reclamar("k")
+    a.liberar("k")
+    assert b.reclamar("k")
+
+
+def test_reclamo_abandonado_lo_toma_un_solo_trabajador(tmp_path):
+    caido = Bitacora(str(tmp_path), arriendo=1, trabajador="caido")
+    assert caido.reclamar("k")
+    ruta = os.path.join(str(tmp_path), "reclamos", "k.0")
+    viejo = time.time() - 10
+    os.utime(ruta, (viejo, viejo))
+
+    # Los dos ven el reclamo vencido; solo uno crea la generacion siguiente
+    a = Bitacora(str(tmp_path), arriendo=1, trabajador="a")
+    b = Bitacora(str(tmp_path), arriendo=1, trabajador="b")
+    assert a.reclamar("k")
+    assert not b.reclamar("k")
+    # El reclamo nuevo de a sigue en pie
+    assert os.path.exists(os.path.join(str(tmp_path), "reclamos", "k.1"))
+    a.liberar("k")
+    assert os.listdir(os.path.join(str(tmp_path), "reclamos")) == []
+
+
+def test_terminado_no_se_reclama(tmp_path):
+    a = Bitacora(str(tmp_path), trabajador="a")
+    assert a.reclamar("k")
+    a.registrar('TERMINADO', "k", intento=1, fila={'estado': 'OPTIMO'})
+    a.liberar("k")
+    b = Bitacora(str(tmp_path), trabajador="b")
+    assert not b.pendiente("k")
+    assert not b.reclamar("k")
+
+
+def test_fallo_espera_su_reintento(tmp_path):
+    a = Bitacora(str(tmp_path), espera=60, trabajador="a")
+    a.iniciar("k", "archivo")
+    a.registrar('FALLO', "k", intento=1, fila={'estado': 'ERROR'})
+    assert a.pendiente("k")
+    assert not a.disponible("k")
+    assert a.proximo_intento("k") > time.time() + 50
+
+
+def test_lote_reanudable_salta_lo_resuelto(tmp_path):
+    archivos = sorted(os.path.join(RUTA_DATOS, nombre) for nombre in os.listdir(RUTA_DATOS)
+                      if nombre.endswith(".txt"))[:4]
+    ruta = str(tmp_path / "bitacora")
+    filas = ejecutar_lote_reanudable(archivos, ruta, procesos=2)
+    assert all(fila['estado'] == 'OPTIMO' for fila in filas)
+
+    # Una segunda ejecucion no agrega eventos
+    tamanos = {nombre: os.path.getsize(os.path.join(ruta, nombre)) for nombre in os.listdir(ruta)
+               if nombre.endswith(".jsonl")}
+    assert ejecutar_lote_reanudable(archivos, ruta, procesos=2) == filas
+    assert all(os.path.getsize(os.path.join(ruta, nombre)) == tamano
+               for nombre, tamano in tamanos.items())
+
+
+@pytest.fixture
+def sin_esperas(monkeypatch):
+    """Falla si el trabajador duerme o resuelve algo"""
+    def no_esperar(segundos):
+        raise AssertionError(f"el trabajador espero {segundos}s")
+
+    def no_resolver(*args, **kwargs):
+        raise AssertionError("el trabajador resolvio una instancia")
+
+    monkeypatch.setattr(lote.time, 'sleep', no_esperar)
+    monkeypatch.setattr(lote, 'resolver_archivo', no_resolver)
+
+
+def test_trabajador_sin_nada_que_reclamar_no_sondea(tmp_path, sin_esperas):
+    # Todo lo pendiente lo tiene otro trabajador y no hay fallos que esperar
+    otro = Bitacora(str(tmp_path), trabajador="otro")
+    for clave in ("a", "b"):
+        assert otro.reclamar(clave)
+    trabajar(str(tmp_path), [("a", "a.txt"), ("b", "b.txt")])
+
+
+def test_trabajador_termina_si_todo_esta_resuelto(tmp_path, sin_esperas):
+    otro = Bitacora(str(tmp_path), trabajador="otro")
+    assert otro.reclamar("a")
+    otro.registrar('TERMINADO', "a", intento=1, fila={'estado': 'OPTIMO'})
+    otro.liberar("a")
+    trabajar(str(tmp_path), [("a", "a.txt")])
+
+
+def test_trabajador_duerme_hasta_el_reintento(tmp_path, monkeypatch):
+    otro = Bitacora(str(tmp_path), trabajador="otro")
+    otro.iniciar("a", "a.txt")
+    otro.registrar('FALLO', "a", intento=1, fila={'estado': 'ERROR'})
+    reintento = otro.proximo_intento("a")
+    esperas = []
+
+    class Detener(Exception):
+        pass
+
+    def dormir(segundos):
+        esperas.append(segundos)
+        raise Detener
+
+    # Con el reloj fijo, la espera sale exacta y acotada por ESPERA_SONDEO
+    ahora = reintento - 2
+    monkeypatch.setattr(lote.time, 'time', lambda: ahora)
+    monkeypatch.setattr(lote.time, 'sleep', dormir)
+    with pytest.raises(Detener):
+        trabajar(str(tmp_path), [("a", "a.txt")])
+    assert esperas == [pytest.approx(min(2.01, lote.ESPERA_SONDEO))]
@@ -0,0 +1,27 @@
+import os
+
+from cache import CacheResultados
+
+
+def test_desalojo_deja_holgura_y_conserva_las_usadas(tmp_path):
+    cache = CacheResultados(str(tmp_path), max_entradas=10)
+    for i in range(10):
+        cache.guardar(f"c{i}", {'i': i})
+        os.utime(tmp_path / f"c{i}.json", (i, i))
+    assert cache.entradas == 10
+
+    # Reescribir una llave existente no cuenta como entrada nueva
+    cache.guardar("c9", {'i': 9})
+    assert len(os.listdir(tmp_path)) == 10
+
+    cache.guardar("c10", {'i': 10})
+    assert cache.entradas == 9
+    assert sorted(os.listdir(tmp_path)) == sorted(f"c{i}.json" for i in range(2, 11))
+    assert cache.obtener("c0") is None
+    assert cache.obtener("c10") == {'i': 10}
+
+
+def test_conteo_inicial_desde_el_directorio(tmp_path):
+    for i in range(3):
+        CacheResultados(str(tmp_path)).guardar(f"c{i}", i)
+    assert CacheResultados(str(tmp_path)).entradas == 3
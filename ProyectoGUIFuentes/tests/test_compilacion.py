@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import compilacion
+from compilacion import clave_compilacion, restringir_fzn
+from presolve import arcos_alcanzables, dzn_parametrico, parametros_parametrico, RUTA_MZN_PARAMETRICO
+
+
+FZN = """var 0..4: X_INTRODUCED_0_;
+var 0..4: X_INTRODUCED_1_;
+array [1..2] of var 0..4: p:: output_array([1..2]) = [X_INTRODUCED_0_,X_INTRODUCED_1_];
+var float: ct:: output_var;
+var float: total_polarization:: output_var;
+constraint int_lin_le([1,1],[X_INTRODUCED_0_,X_INTRODUCED_1_],4);
+solve  minimize total_polarization;
+"""
+
+DATOS = {'n': 4, 'm': 3, 'p': [2, 1, 1], 'v': [0.0, 0.5, 1.0],
+         's': [[1, 1, 0], [1, 0, 0], [0, 0, 1]], 'ct': 1.0, 'maxMovs': 2}
+
+
+def test_restringir_fzn_fija_las_variables_antes_del_solve(tmp_path):
+    ruta = tmp_path / "modelo.fzn"
+    ruta.write_text(FZN)
+    copia = restringir_fzn(str(ruta), [('p', '=', [3, 1]), ('ct', '=', 2),
+                                       ('total_polarization', '<=', 1.5)])
+    try:
+        with open(copia) as f:
+            lineas = f.read().splitlines()
+    finally:
+        os.remove(copia)
+
+    assert ruta.read_text() == FZN
+    nuevas = lineas[6:-1]
+    assert nuevas[:2] == ["constraint int_eq(X_INTRODUCED_0_, 3);",
+                          "constraint int_eq(X_INTRODUCED_1_, 1);"]
+    assert nuevas[2].startswith("constraint float_eq(ct, 2.0")
+    assert nuevas[3].startswith("constraint float_le(total_polarization, 1.5")
+    assert lineas[-1].startswith("solve")
+
+
+def test_restringir_fzn_rechaza_variables_desconocidas(tmp_path):
+    ruta = tmp_path / "modelo.fzn"
+    ruta.write_text(FZN)
+    with pytest.raises(RuntimeError):
+        restringir_fzn(str(ruta), [('maxMovs', '=', 2.0)])
+    with pytest.raises(RuntimeError):
+        restringir_fzn(str(ruta), [('p', '=', [1, 1, 2])])
+
+
+def test_llave_depende_de_la_version_de_minizinc(monkeypatch):
+    monkeypatch.setattr(compilacion, 'version_minizinc', lambda ejecutable=None: "2.8.0")
+    antes = clave_compilacion(RUTA_MZN_PARAMETRICO, texto_dzn="n = 1;")
+    monkeypatch.setattr(compilacion, 'version_minizinc', lambda ejecutable=None: "2.9.0")
+    assert clave_compilacion(RUTA_MZN_PARAMETRICO, texto_dzn="n = 1;") != antes
+
+
+def test_ct_y_p_no_cambian_la_llave_del_modelo_parametrico(monkeypatch):
+    monkeypatch.setattr(compilacion, 'version_minizinc', lambda ejecutable=None: "2.8.0")
+    otros = dict(DATOS, p=[1, 2, 1], ct=1.2)
+    arcos = arcos_alcanzables(DATOS)
+    otros_arcos = arcos_alcanzables(otros)
+    assert [a[:3] for a in arcos] == [a[:3] for a in otros_arcos]
+
+    assert (clave_compilacion(RUTA_MZN_PARAMETRICO, texto_dzn=dzn_parametrico(DATOS, arcos)) ==
+            clave_compilacion(RUTA_MZN_PARAMETRICO, texto_dzn=dzn_parametrico(otros, otros_arcos)))
+    parametros = parametros_parametrico(otros, otros_arcos)
+    assert parametros['p'] == [1, 2, 1] and parametros['ct'] == 1.2
+    assert parametros['arc_cap'] == [c for _, _, _, c in otros_arcos]
@@ -0,0 +1,111 @@
+import math
+import threading
+
+import numpy as np
+import pytest
+
+import cotas
+from cotas import cotas_medianas, resolver_acotado
+from evaluador import verificar
+from fuerza_bruta import instancias, optimos_por_mediana, polarizacion_optima
+from generador import generar_instancia
+from heuristica import resolver_heuristico
+
+
+# Instancia con v desordenado en la que la poda por NaN reportaba 0.219
+DESORDENADA = {'n': 5, 'm': 5, 'p': [0, 1, 0, 2, 2], 'v': [0.657, 0.35, 0.549, 0.131, 0.014],
+               's': [[0, 0, 0], [0, 0, 1], [0, 0, 0], [1, 0, 1], [1, 1, 0]],
+               'ct': 3.3, 'maxMovs': 3}
+
+
+def test_cotas_con_v_desordenado_no_son_nan():
+    cotas = cotas_medianas(DESORDENADA)
+    assert not np.isnan(cotas).any()
+
+
+def test_v_desordenado_da_el_optimo():
+    resultado = resolver_acotado(DESORDENADA)
+    assert resultado['estado'] == 'OPTIMO'
+    assert resultado['polarizacion'] == pytest.approx(0.117)
+
+
+@pytest.mark.parametrize('ordenada', [True, False])
+def test_cotas_no_superan_el_optimo(ordenada):
+    for datos in instancias(23, 60, ordenada=ordenada):
+        optimo = polarizacion_optima(datos)
+        cotas = cotas_medianas(datos)
+        if optimo is None:
+            continue
+        assert cotas.min() <= optimo + 1e-6
+
+
+@pytest.mark.parametrize('ordenada', [True, False])
+def test_cada_cota_no_supera_el_optimo_de_su_posicion(ordenada):
+    for datos in instancias(24, 60, ordenada=ordenada):
+        for q, (cota, optimo) in enumerate(zip(cotas_medianas(datos), optimos_por_mediana(datos))):
+            if optimo is None:
+                continue
+            assert cota <= optimo + 1e-6, f"posicion {q}"
+
+
+@pytest.mark.parametrize('ordenada', [True, False])
+def test_posiciones_podadas_no_tienen_un_plan_mejor(ordenada, monkeypatch):
+    resueltas = []
+    resolver_mediana = cotas._resolver_mediana
+
+    def registrar(datos, q, *args, **kwargs):
+        resueltas.append(q)
+        return resolver_mediana(datos, q, *args, **kwargs)
+
+    monkeypatch.setattr(cotas, '_resolver_mediana', registrar)
+    for datos in instancias(25, 60, ordenada=ordenada):
+        resueltas.clear()
+        resultado = resolver_acotado(datos)
+        optimos = optimos_por_mediana(datos)
+        for q in set(range(datos['m'])) - set(resueltas):
+            if optimos[q] is not None:
+                assert optimos[q] >= resultado['polarizacion'] - 1e-6, f"posicion {q}"
+        for q, cota in enumerate(resultado['cotas_finales']):
+            if optimos[q] is not None:
+                assert cota <= optimos[q] + 1e-6, f"posicion {q}"
+
+
+@pytest.mark.parametrize('ordenada', [True, False])
+def test_resolver_acotado_igual_a_fuerza_bruta(ordenada):
+    for datos in instancias(230, 80, ordenada=ordenada):
+        optimo = polarizacion_optima(datos)
+        resultado = resolver_acotado(datos)
+        if optimo is None:
+            assert resultado['estado'] == 'INSATISFACIBLE'
+        else:
+            assert resultado['estado'] == 'OPTIMO'
+            assert resultado['polarizacion'] == pytest.approx(optimo, abs=1e-6)
+            assert resultado['gap'] == 0.0
+
+
+def test_gap_detiene_con_cota_valida():
+    for datos in instancias(231, 30):
+        optimo = polarizacion_optima(datos)
+        resultado = resolver_acotado(datos, gap=0.5)
+        if optimo is not None and resultado['cota_inferior'] is not None:
+            assert resultado['cota_inferior'] <= optimo + 1e-6
+            assert resultado['polarizacion'] >= optimo - 1e-6
+            assert math.isfinite(resultado['gap'])
+
+
+def test_cancelar_interrumpe_el_subproblema_exacto():
+    # La primera posicion de esta instancia tarda minutos en el subproblema exacto
+    datos = generar_instancia(200, 8, semilla=0)
+    cancelar = threading.Event()
+    threading.Timer(0.3, cancelar.set).start()
+    resultado = resolver_acotado(datos, inicial=resolver_heuristico(datos), cancelar=cancelar)
+    assert resultado['estado'] == 'SOLUCION'
+    assert resultado['interrupcion'] == 'CANCELADO'
+    assert verificar(datos, resultado) == []
+    assert resultado['cota_inferior'] <= resultado['polarizacion']
+
+
+def test_tiempo_maximo_sin_solucion_inicial():
+    resultado = resolver_acotado(generar_instancia(200, 8, semilla=0), tiempo_max=0.3)
+    assert resultado['interrupcion'] == 'TIMEOUT'
+    assert resultado['estado'] in ('SOLUCION', 'TIMEOUT')
@@ -0,0 +1,27 @@
+import pytest
+
+from escalado import datos_enteros, dzn_entero, MAX_ENTERO
+
+
+def test_escala_minima():
+    datos = {'n': 3, 'm': 2, 'p': [1, 2], 'v': [0.1, 0.25], 's': [[1, 0, 0], [0, 2, 0]],
+             'ct': 1.5, 'maxMovs': 2.7}
+    enteros = datos_enteros(datos)
+    assert enteros['escala'] == 100
+    assert enteros['v_esc'] == [10, 25]
+    assert enteros['ct_esc'] == 300
+    assert enteros['maxMovs_esc'] == 2
+
+
+def test_rechaza_valores_fuera_de_32_bits():
+    datos = {'n': 1000, 'm': 2, 'p': [500, 500], 'v': [0.0, 0.987654321],
+             's': [[500, 0, 0], [500, 0, 0]], 'ct': 10, 'maxMovs': 3}
+    with pytest.raises(ValueError, match="32 bits"):
+        dzn_entero(datos)
+
+
+def test_acepta_instancias_pequenas_con_muchos_decimales():
+    datos = {'n': 1, 'm': 2, 'p': [1, 0], 'v': [0.0, 0.12345678], 's': [[1, 0, 0], [0, 0, 0]],
+             'ct': 1, 'maxMovs': 1}
+    enteros = datos_enteros(datos)
+    assert enteros['ct_esc'] < MAX_ENTERO
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from escenarios import datos_registro, resolver_linea
+
+REGISTRO = {"n": 10, "m": 3, "p": [3, 3, 4], "v": [0.297, 0.673, 0.809],
+            "s": [[1, 2, 0], [0, 3, 0], [2, 1, 1]], "ct": 25, "maxMovs": "5.5"}
+
+
+def test_convierte_maxmovs_a_flotante():
+    assert datos_registro(REGISTRO)['maxMovs'] == 5.5
+
+
+@pytest.mark.parametrize("llave, valor", [("maxMovs", "x"), ("ct", None), ("s", [[1, "a", 0]] * 3)])
+def test_campo_invalido_da_fila_de_error(llave, valor):
+    linea = json.dumps({**REGISTRO, llave: valor})
+    fila = resolver_linea("escenarios.jsonl", 1, linea)
+    assert fila['estado'] == 'ERROR'
+    assert fila['error'].startswith(f"Valor invalido en {llave}")
+
+
+@pytest.mark.parametrize("cambios, mensaje", [
+    ({"p": [3, 3, 3]}, "La suma de p"),
+    ({"s": [[1, 1, 0], [0, 3, 0], [2, 1, 1]]}, "Las resistencias de la opinion 1"),
+    ({"p": [4, 3, 3], "s": [[1, 2, 1], [0, 3, 0], [-1, 3, 1]]}, "Las resistencias de la opinion 3"),
+    ({"p": [-1, 7, 4]}, "p no puede tener valores negativos"),
+    ({"ct": -1}, "ct y maxMovs no pueden ser negativos"),
+])
+def test_instancia_inconsistente_se_rechaza(cambios, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        datos_registro({**REGISTRO, **cambios})
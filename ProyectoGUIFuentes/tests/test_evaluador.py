@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from evaluador import evaluar_lote, tensores_instancia, verificar
+from fuerza_bruta import instancias
+
+
+DATOS = {'n': 4, 'm': 3, 'p': [2, 1, 1], 'v': [0.0, 0.5, 1.0],
+         's': [[1, 1, 0], [1, 0, 0], [0, 0, 1]], 'ct': 1.0, 'maxMovs': 2}
+
+
+def plan(*movimientos):
+    x = np.zeros((3, 3, 3), dtype=np.int64)
+    for k, i, j, personas in movimientos:
+        x[k, i, j] = personas
+    return x
+
+
+def test_pila_con_cada_tipo_de_falla():
+    planes = np.stack([
+        plan((0, 0, 1, 1)),                      # factible: costo 0.5, 1 movimiento
+        plan((1, 0, 2, 1)),                      # costo 1.5 > ct
+        plan((0, 0, 1, 1), (0, 1, 2, 1)),        # justo en ct y en maxMovs
+        plan((0, 0, 2, 1), (1, 0, 2, 1)),        # costo 2.5 y 4 movimientos
+        plan((0, 0, 1, 2)),                      # sale mas de lo que hay en s
+        plan((0, 0, 0, 1)),                      # movimiento i -> i
+        plan((0, 0, 1, -1)),                     # valor negativo
+    ])
+    ev = evaluar_lote(DATOS, planes)
+    assert ev['costo'].tolist() == pytest.approx([0.5, 1.5, 1.0, 2.5, 1.0, 0.0, -0.5])
+    assert ev['movs'].tolist() == [1, 2, 2, 4, 2, 0, -1]
+    assert ev['estructura'].tolist() == [True, True, True, True, False, False, False]
+    assert ev['factible'].tolist() == [True, False, True, False, False, False, False]
+    assert ev['p_prime'][0].tolist() == [1, 2, 1]
+    assert ev['med_pos'][0] == 2
+    assert ev['polarizacion'][0] == pytest.approx(1.0)
+
+    # El mismo plan con maxMovs menor solo falla por movimientos
+    ev = evaluar_lote(dict(DATOS, maxMovs=1), planes[2])
+    assert ev['costo'][0] <= 1.0 and ev['estructura'][0]
+    assert not ev['factible'][0]
+
+
+def test_sin_mediana_valida():
+    # Con n = 0 ninguna posicion cumple izquierda < n/2
+    vacia = {'n': 0, 'm': 2, 'p': [0, 0], 'v': [0.0, 1.0], 's': [[0, 0, 0], [0, 0, 0]],
+             'ct': 1.0, 'maxMovs': 1}
+    ev = evaluar_lote(vacia, np.zeros((2, 3, 2, 2), dtype=np.int64))
+    assert ev['med_pos'].tolist() == [0, 0]
+    assert np.isinf(ev['polarizacion']).all()
+    assert not ev['factible'].any()
+
+
+def test_mensajes_de_verificar():
+    resultado = {'estado': 'SOLUCION', 'x': plan((0, 0, 2, 1), (1, 0, 2, 1)).tolist(),
+                 'med_pos': 1, 'polarizacion': 0.0}
+    errores = verificar(DATOS, resultado)
+    assert any("supera ct" in error for error in errores)
+    assert any("superan maxMovs" in error for error in errores)
+    assert any("med_pos = 1" in error for error in errores)
+
+
+def test_lote_igual_a_evaluar_cada_plan():
+    rng = np.random.default_rng(0)
+    for datos in instancias(16, 40):
+        m = datos['m']
+        s = np.asarray(datos['s']).T
+        # Planes aleatorios, algunos fuera de s o con costo y movimientos altos
+        planes = rng.integers(0, 3, size=(25, 3, m, m)) * (rng.random((25, 3, m, m)) < 0.3)
+        planes[:, :, np.arange(m), np.arange(m)] = 0
+        planes[::5] = np.minimum(planes[::5], s[None, :, :, None])
+        tensores = tensores_instancia(datos)
+        lote = evaluar_lote(datos, planes, tensores)
+        for b, x in enumerate(planes):
+            uno = evaluar_lote(datos, x)
+            # Los productos matriciales pueden redondear distinto por lote
+            for llave, valores in lote.items():
+                assert np.allclose(valores[b], uno[llave][0], rtol=0, atol=1e-9), llave
+            # Contra el calculo directo con la mediana reportada
+            if uno['med_pos'][0]:
+                q = uno['med_pos'][0] - 1
+                directo = sum(uno['p_prime'][0][j] * abs(datos['v'][j] - datos['v'][q])
+                              for j in range(m))
+                assert uno['polarizacion'][0] == pytest.approx(directo)
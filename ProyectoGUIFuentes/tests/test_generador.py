@@ -0,0 +1,19 @@
+from cotas import resolver_acotado
+from generador import generar_instancia
+
+
+def test_misma_semilla_misma_instancia():
+    assert generar_instancia(30, 5, semilla=7) == generar_instancia(30, 5, semilla=7)
+
+
+def test_instancia_valida():
+    datos = generar_instancia(50, 6, densidad=0.7, semilla=3)
+    assert sum(datos['p']) == datos['n']
+    assert all(sum(fila) == personas for fila, personas in zip(datos['s'], datos['p']))
+    assert datos['v'] == sorted(datos['v'])
+
+
+def test_holgura_uno_da_polarizacion_cero():
+    for semilla in range(40):
+        datos = generar_instancia(40, 4, holgura=1.0, semilla=semilla)
+        assert resolver_acotado(datos)['polarizacion'] < 1e-9
@@ -0,0 +1,62 @@
+import copy
+import random
+
+import pytest
+
+from incremental import ResolucionIncremental
+from fuerza_bruta import instancias, polarizacion_optima
+
+
+def editar(rng, datos):
+    """Cambia ct, maxMovs o mueve una persona de resistencia de nivel"""
+    nuevo = copy.deepcopy(datos)
+    cambio = rng.choice(['ct', 'maxMovs', 's'])
+    if cambio == 'ct':
+        nuevo['ct'] = round(max(0.0, nuevo['ct'] + rng.uniform(-1, 1)), 2)
+    elif cambio == 'maxMovs':
+        nuevo['maxMovs'] = max(0, nuevo['maxMovs'] + rng.choice([-2, -1, 1, 2]))
+    else:
+        i = rng.randrange(nuevo['m'])
+        fila = nuevo['s'][i]
+        origen = [k for k in range(3) if fila[k] > 0]
+        if origen:
+            k = rng.choice(origen)
+            fila[k] -= 1
+            fila[rng.randrange(3)] += 1
+    return nuevo
+
+
+@pytest.mark.parametrize('semilla', range(4))
+def test_secuencia_de_ediciones_igual_a_fuerza_bruta(semilla):
+    rng = random.Random(semilla)
+    for datos in instancias(100 + semilla, 10):
+        sesion = ResolucionIncremental()
+        for _ in range(6):
+            resultado = sesion.resolver(datos)
+            optimo = polarizacion_optima(datos)
+            if optimo is None:
+                assert resultado['estado'] == 'INSATISFACIBLE'
+            else:
+                assert resultado['estado'] == 'OPTIMO'
+                assert resultado['polarizacion'] == pytest.approx(optimo, abs=1e-6)
+            datos = editar(rng, datos)
+
+
+def test_sin_cambios_reutiliza_el_resultado():
+    datos = instancias(7, 1)[0]
+    sesion = ResolucionIncremental()
+    primero = sesion.resolver(datos)
+    segundo = sesion.resolver(copy.deepcopy(datos))
+    assert segundo['incremental']['plan_previo'] == 'REUTILIZADO'
+    assert segundo.get('polarizacion') == primero.get('polarizacion')
+
+
+def test_corrida_detenida_no_se_reutiliza():
+    datos = instancias(8, 1, m_max=4, n_max=6)[0]
+    sesion = ResolucionIncremental()
+    sesion.resolver(datos, al_progreso=lambda progreso: True)
+    resultado = sesion.resolver(datos)
+    optimo = polarizacion_optima(datos)
+    if optimo is not None:
+        assert resultado['estado'] == 'OPTIMO'
+        assert resultado['polarizacion'] == pytest.approx(optimo, abs=1e-6)
@@ -0,0 +1,35 @@
+import os
+import re
+
+import pytest
+
+from generador import generar_instancia
+from lote import ARCHIVOS_MOTOR, BASE_DIR, COLUMNAS, resolver_datos
+
+
+@pytest.mark.parametrize('motor', ['nativo', 'heuristico'])
+def test_timeout_limita_todos_los_motores(motor):
+    # El subproblema exacto de esta instancia tarda minutos sin limite
+    fila = dict.fromkeys(COLUMNAS)
+    resultado = resolver_datos(fila, generar_instancia(200, 8, semilla=0), motor, timeout=1)
+    assert fila['estado'] == 'SOLUCION'
+    assert fila['tiempo_solucion'] < 30
+    if motor == 'nativo':
+        assert resultado['interrupcion'] == 'TIMEOUT'
+        assert 0.0 <= fila['gap'] <= 1.0
+
+
+@pytest.mark.parametrize('motor', sorted(ARCHIVOS_MOTOR))
+def test_archivos_motor_incluyen_todos_los_modulos_importados(motor):
+    # Cambiar cualquier modulo que ejecuta un motor debe invalidar su cache;
+    # cache.py solo guarda y parser.py solo lee (los datos ya estan en la llave)
+    archivos = {os.path.abspath(ruta) for ruta in ARCHIVOS_MOTOR[motor]}
+    for ruta in list(archivos):
+        if not ruta.endswith(".py"):
+            continue
+        with open(ruta) as f:
+            importados = re.findall(r"^(?:from|import) (\w+)", f.read(), re.MULTILINE)
+        for modulo in importados:
+            local = os.path.join(BASE_DIR, modulo + ".py")
+            if os.path.exists(local) and modulo not in ('cache', 'parser'):
+                assert os.path.abspath(local) in archivos, f"{motor}: falta {modulo}.py"
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+import pytest
+
+from anytime import resolver_anytime
+from portafolio import resolver_portafolio
+
+
+MINIZINC_FALSO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "minizinc_falso.py")
+
+
+@pytest.fixture
+def pids(tmp_path, monkeypatch):
+    """Directorio donde cada proceso del minizinc falso deja su pid"""
+    os.chmod(MINIZINC_FALSO, 0o755)
+    monkeypatch.setenv('MINIZINC_FALSO_PIDS', str(tmp_path))
+    return tmp_path
+
+
+def sin_huerfanos(directorio):
+    """Espera a que todos los procesos lanzados hayan terminado"""
+    limite = time.time() + 5
+    vivos = [int(nombre) for nombre in os.listdir(directorio)]
+    while vivos and time.time() < limite:
+        vivos = [pid for pid in vivos if _vivo(pid)]
+        time.sleep(0.05)
+    return not vivos
+
+
+def _vivo(pid):
+    try:
+        # Un proceso zombi ya termino aunque el pid siga existiendo
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(") ")[1][0] != 'Z'
+    except (FileNotFoundError, IndexError):
+        return False
+
+
+def test_gana_el_primero_que_responde(pids):
+    resultado = resolver_portafolio("modelo.mzn", "datos.dzn", ['lento', 'rapido', 'lento2'],
+                                    timeout=10, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'OPTIMO'
+    assert resultado['ganador'] == 'rapido'
+    assert resultado['stdout'].splitlines()[0] == "1250"
+    assert resultado['tiempo'] < 5
+    assert sin_huerfanos(pids)
+
+
+def test_insatisfacible(pids):
+    resultado = resolver_portafolio("modelo.mzn", "datos.dzn", ['lento', 'insatisfacible'],
+                                    timeout=10, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'INSATISFACIBLE'
+    assert resultado['ganador'] == 'insatisfacible'
+    assert sin_huerfanos(pids)
+
+
+def test_todos_fallan(pids):
+    resultado = resolver_portafolio("modelo.mzn", "datos.dzn", ['falla', 'falla2'],
+                                    timeout=10, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'ERROR'
+    assert "modelo invalido" in resultado['errores']['falla']
+
+
+def test_un_fallo_no_detiene_la_carrera(pids):
+    resultado = resolver_portafolio("modelo.mzn", "datos.dzn", ['falla', 'rapido'],
+                                    timeout=10, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'OPTIMO'
+    assert resultado['ganador'] == 'rapido'
+
+
+def test_timeout_termina_los_procesos(pids):
+    resultado = resolver_portafolio("modelo.mzn", "datos.dzn", ['lento', 'lento2'],
+                                    timeout=0.5, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'TIMEOUT'
+    assert resultado['ganador'] is None
+    assert sin_huerfanos(pids)
+
+
+def test_cancelar_termina_los_procesos(pids):
+    cancelar = threading.Event()
+    threading.Timer(0.3, cancelar.set).start()
+    resultado = resolver_portafolio("modelo.mzn", "datos.dzn", ['lento', 'lento2'],
+                                    timeout=10, ejecutable=MINIZINC_FALSO, cancelar=cancelar)
+    assert resultado['estado'] == 'CANCELADO'
+    assert resultado['tiempo'] < 5
+    assert sin_huerfanos(pids)
+
+
+def test_datos_en_memoria(pids):
+    resultado = resolver_portafolio("modelo.mzn", solvers=['rapido'], texto_dzn="n = 1;\n",
+                                    timeout=10, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'OPTIMO'
+
+
+def test_anytime_conserva_la_mejor_al_agotar_el_tiempo(pids, monkeypatch):
+    monkeypatch.setenv('MINIZINC_FALSO', 'mejora')
+    mejoras = []
+    resultado = resolver_anytime("modelo.mzn", "datos.dzn", timeout=1, cota=2.0,
+                                 ejecutable=MINIZINC_FALSO,
+                                 al_mejorar=lambda t, pol: mejoras.append(pol))
+    assert resultado['estado'] == 'SOLUCION'
+    assert resultado['interrupcion'] == 'TIMEOUT'
+    assert resultado['polarizacion'] == 3.0
+    assert mejoras == [5.0, 3.0]
+    assert resultado['gap'] == pytest.approx(1 / 3)
+    assert sin_huerfanos(pids)
+
+
+def test_anytime_optimo(pids, monkeypatch):
+    monkeypatch.setenv('MINIZINC_FALSO', 'mejora_optimo')
+    resultado = resolver_anytime("modelo.mzn", "datos.dzn", timeout=10, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'OPTIMO'
+    assert resultado['interrupcion'] is None
+    assert resultado['gap'] == 0.0
+    assert [pol for _, pol in resultado['traza']] == [5.0, 3.0]
+
+
+def test_anytime_cancelado_sin_solucion(pids, monkeypatch):
+    monkeypatch.setenv('MINIZINC_FALSO', 'lento')
+    cancelar = threading.Event()
+    threading.Timer(0.3, cancelar.set).start()
+    resultado = resolver_anytime("modelo.mzn", "datos.dzn", timeout=10, ejecutable=MINIZINC_FALSO,
+                                 cancelar=cancelar)
+    assert resultado['estado'] == 'CANCELADO'
+    assert resultado['polarizacion'] is None
+    assert sin_huerfanos(pids)
+
+
+def test_anytime_error(pids, monkeypatch):
+    monkeypatch.setenv('MINIZINC_FALSO', 'falla')
+    resultado = resolver_anytime("modelo.mzn", "datos.dzn", timeout=10, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'ERROR'
+    assert "modelo invalido" in resultado['stderr']
+
+
+def test_solver_repetido_no_deja_procesos(pids):
+    resultado = resolver_portafolio("modelo.mzn", "datos.dzn", ['lento', 'rapido', 'lento'],
+                                    timeout=10, ejecutable=MINIZINC_FALSO)
+    assert resultado['estado'] == 'OPTIMO'
+    assert len(os.listdir(pids)) == 2
+    assert sin_huerfanos(pids)
+
+
+def test_sin_ejecutable():
+    with pytest.raises(FileNotFoundError):
+        resolver_portafolio("modelo.mzn", "datos.dzn", ['rapido'],
+                            ejecutable="/no/existe/minizinc")
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from presolve import arcos_alcanzables, dzn_reducido
+from resultado import Resultado
+from fuerza_bruta import instancias
+
+
+DATOS = {'n': 4, 'm': 3, 'p': [2, 1, 1], 'v': [0.0, 0.5, 1.0],
+         's': [[1, 1, 0], [1, 0, 0], [0, 0, 1]], 'ct': 1.0, 'maxMovs': 2}
+
+
+def test_datos_reducidos_sin_arreglos_densos():
+    texto = dzn_reducido(DATOS)
+    assert "idx" not in texto
+    assert f"a = {len(arcos_alcanzables(DATOS))};" in texto
+
+
+def test_arcos_respetan_ct_y_maxmovs():
+    for datos in instancias(5, 40):
+        for k, i, j, capacidad in arcos_alcanzables(datos):
+            assert datos['s'][i][k] >= capacidad > 0
+            assert abs(i - j) * capacidad <= datos['maxMovs']
+            assert abs(datos['v'][i] - datos['v'][j]) * [1.0, 1.5, 2.0][k] <= datos['ct'] + 1e-9
+
+
+def test_resultado_desde_y_y_arcos():
+    arcos = arcos_alcanzables(DATOS)
+    y = [0] * len(arcos)
+    y[0] = 1
+    solucion = json.dumps({'y': y, 'p_prime': [1, 2, 1], 'med_pos': 2,
+                           'total_polarization': 1.0})
+    resultado = Resultado.desde_json(solucion, arcos=arcos)
+    k, i, j, _ = arcos[0]
+    assert resultado.movimientos == {(k, i, j): 1}
+    assert resultado.med_pos == 2
+
+
+def test_resultado_desde_y_sin_arcos():
+    with pytest.raises(ValueError):
+        Resultado.desde_json({'y': [1], 'p_prime': [1], 'med_pos': 1, 'total_polarization': 0.0})
@@ -0,0 +1,88 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from generador import generar_instancia
+from servicio import Servicio
+
+
+INSTANCIA = {'n': 2, 'm': 2, 'p': [1, 1], 'v': [0.0, 1.0], 's': [[1, 0, 0], [1, 0, 0]],
+             'ct': 1.0, 'maxMovs': 1}
+
+# Su subproblema exacto tarda minutos sin limite de tiempo
+DIFICIL = generar_instancia(200, 8, semilla=0)
+
+
+@pytest.fixture
+def servicio():
+    servicio = Servicio(procesos=1)
+    yield servicio
+    servicio.detener()
+
+
+@pytest.mark.parametrize('opciones', [{'prioridad': 'x'}, {'prioridad': 1.5},
+                                      {'timeout': 'x'}, {'timeout': 0}])
+def test_opciones_invalidas_no_dejan_trabajos(servicio, opciones):
+    respuesta = servicio.atender({'op': 'enviar', 'instancia': INSTANCIA, **opciones})
+    assert not respuesta['ok']
+    assert servicio.estadisticas()['trabajos'] == {}
+
+
+def test_resolver_convierte_la_prioridad(servicio):
+    respuesta = servicio.atender({'op': 'resolver', 'instancia': INSTANCIA, 'prioridad': '3'})
+    assert respuesta['ok']
+    assert respuesta['estado'] == 'TERMINADO'
+    assert respuesta['prioridad'] == 3
+    assert respuesta['resultado']['polarizacion'] == pytest.approx(0.0)
+
+
+def test_esperar_no_falla_si_el_trabajo_se_libera(servicio):
+    id_trabajo = servicio.enviar(INSTANCIA)
+    trabajo = servicio.trabajos[id_trabajo]
+    assert trabajo['listo'].wait(30)
+
+    class Liberado(threading.Event):
+        # Simula que el trabajo sale de terminados mientras se espera
+        def wait(self, timeout=None):
+            servicio.trabajos.pop(id_trabajo, None)
+            return super().wait(timeout)
+
+    trabajo['listo'] = Liberado()
+    trabajo['listo'].set()
+    assert servicio.esperar(id_trabajo)['estado'] == 'TERMINADO'
+
+
+def esperar_en_curso(servicio, id_trabajo):
+    while servicio.estado(id_trabajo)['estado'] == 'EN_COLA':
+        time.sleep(0.05)
+
+
+def test_timeout_limita_al_motor_nativo(servicio):
+    respuesta = servicio.atender({'op': 'resolver', 'instancia': DIFICIL, 'timeout': 1})
+    assert respuesta['estado'] == 'TERMINADO'
+    assert respuesta['resultado']['interrupcion'] == 'TIMEOUT'
+
+
+def test_cancelar_un_trabajo_en_curso(servicio):
+    id_trabajo = servicio.enviar(DIFICIL, timeout=600)
+    esperar_en_curso(servicio, id_trabajo)
+    assert servicio.cancelar(id_trabajo)
+    trabajo = servicio.esperar(id_trabajo, 60)
+    assert trabajo['estado'] == 'CANCELADO'
+    assert trabajo['resultado']['interrupcion'] == 'CANCELADO'
+    assert trabajo['resultado']['polarizacion'] is not None
+
+
+def test_pool_roto_se_reemplaza(servicio):
+    id_trabajo = servicio.enviar(DIFICIL, timeout=600)
+    esperar_en_curso(servicio, id_trabajo)
+    # Matar el proceso que resuelve el trabajo, como lo haria el OOM killer
+    while not servicio.pool._processes:
+        time.sleep(0.05)
+    for proceso in list(servicio.pool._processes.values()):
+        os.kill(proceso.pid, signal.SIGKILL)
+    assert servicio.esperar(id_trabajo, 60)['estado'] == 'ERROR'
+    assert servicio.atender({'op': 'resolver', 'instancia': INSTANCIA})['estado'] == 'TERMINADO'
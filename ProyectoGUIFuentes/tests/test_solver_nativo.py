@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from evaluador import verificar
+from generador import generar_instancia
+from heuristica import resolver_heuristico
+from solver_nativo import resolver_nativo, resolver_paralelo, validar_datos
+from fuerza_bruta import instancias, polarizacion_optima
+
+
+def comparar(resultado, optimo):
+    if optimo is None:
+        assert resultado['estado'] == 'INSATISFACIBLE'
+    else:
+        assert resultado['estado'] == 'OPTIMO'
+        assert resultado['polarizacion'] == pytest.approx(optimo, abs=1e-6)
+
+
+@pytest.mark.parametrize('ordenada', [True, False])
+def test_resolver_nativo_igual_a_fuerza_bruta(ordenada):
+    for datos in instancias(1, 80, ordenada=ordenada):
+        resultado = resolver_nativo(datos)
+        comparar(resultado, polarizacion_optima(datos))
+        if resultado['estado'] == 'OPTIMO':
+            assert verificar(datos, resultado) == []
+
+
+def test_resolver_paralelo_igual_a_fuerza_bruta():
+    for datos in instancias(3, 8):
+        comparar(resolver_paralelo(datos, procesos=2), polarizacion_optima(datos))
+
+
+def test_resolver_nativo_con_solucion_inicial():
+    for datos in instancias(2, 40):
+        comparar(resolver_nativo(datos, inicial=resolver_heuristico(datos)),
+                 polarizacion_optima(datos))
+
+
+def test_heuristica_es_factible_y_no_mejora_el_optimo():
+    for datos in instancias(4, 40):
+        resultado = resolver_heuristico(datos)
+        optimo = polarizacion_optima(datos)
+        if resultado['estado'] == 'SOLUCION':
+            assert verificar(datos, resultado) == []
+            assert resultado['polarizacion'] >= optimo - 1e-6
+
+
+def test_resistencias_deben_sumar_p():
+    datos = {'n': 10, 'm': 3, 'p': [3, 3, 4], 'v': [0.297, 0.673, 0.809],
+             's': [[1, 2, 0], [0, 3, 0], [2, 1, 0]], 'ct': 25, 'maxMovs': 5}
+    with pytest.raises(ValueError, match="opinion 3 deben sumar"):
+        validar_datos(datos)
+    datos['s'][2] = [2, 1, 1]
+    validar_datos(datos)
+
+
+@pytest.mark.parametrize('resolver', [resolver_nativo, resolver_paralelo])
+def test_tiempo_maximo_retorna_la_mejor_solucion(resolver):
+    datos = generar_instancia(200, 8, semilla=0)
+    inicio = time.perf_counter()
+    resultado = resolver(datos, tiempo_max=0.5)
+    assert time.perf_counter() - inicio < 30
+    assert resultado['interrupcion'] == 'TIMEOUT'
+    assert resultado['estado'] in ('SOLUCION', 'TIMEOUT')
+    if resultado['estado'] == 'SOLUCION':
+        assert verificar(datos, resultado) == []
+        assert 0.0 <= resultado['gap'] <= 1.0
+        assert resultado['cota_inferior'] <= resultado['polarizacion'] + 1e-9
+
+
+def test_cancelar_detiene_la_busqueda():
+    cancelar = threading.Event()
+    cancelar.set()
+    resultado = resolver_nativo(generar_instancia(200, 8, semilla=0), cancelar=cancelar)
+    assert resultado['interrupcion'] == 'CANCELADO'
+
+
+def test_heuristica_respeta_el_tiempo_con_muchas_opiniones():
+    datos = generar_instancia(10000, 100, semilla=0)
+    inicio = time.perf_counter()
+    resultado = resolver_heuristico(datos, tiempo_max=0.5)
+    assert time.perf_counter() - inicio < 5
+    assert resultado['estado'] == 'SOLUCION'
+    assert verificar(datos, resultado) == []